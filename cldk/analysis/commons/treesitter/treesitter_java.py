@@ -31,6 +31,11 @@ logger = logging.getLogger(__name__)
 LANGUAGE: Language = Language(tsjava.language())
 PARSER: Parser = Parser(LANGUAGE)
 
+# The names of the constructors and methods called in a method body; compiled once and shared by all parses.
+CALLING_LINES_QUERY: Query = LANGUAGE.query(
+    "(object_creation_expression (type_identifier) @object_name) (object_creation_expression type: (scoped_type_identifier (type_identifier) @type_name)) (method_invocation name: (identifier) @method_name)"
+)
+
 
 # pylint: disable=too-many-public-methods
 class TreesitterJava:
@@ -253,29 +258,42 @@ class TreesitterJava:
             target_method_name (str): Target method signature or name.
 
         Returns:
-            list[int]: Line numbers within the source method.
+            list[int]: Line numbers within the source method, in ascending order.
         """
-        if not source_method_code:
-            return []
-        query = "(object_creation_expression (type_identifier) @object_name) (object_creation_expression type: (scoped_type_identifier (type_identifier) @type_name)) (method_invocation name: (identifier) @method_name)"
-
         # if target_method_name is a method signature, get the method name
         # if it is not a signature, we will just keep the passed method name
 
         target_method_name = target_method_name.split("(")[0]  # remove the arguments from the constructor name
+        return self.get_calling_lines_by_name(source_method_code).get(target_method_name, [])
+
+    def get_calling_lines_by_name(self, source_method_code: str) -> Dict[str, List[int]]:
+        """Return the line numbers of all calls in the source method, keyed by the called method or constructor name.
+
+        The method is parsed once, so callers that need the calling lines of many targets in the same method
+        should use this instead of :meth:`get_calling_lines`.
+
+        Args:
+            source_method_code (str): Source method code.
+
+        Returns:
+            dict[str, list[int]]: Line numbers within the source method in ascending order, keyed by method name.
+        """
+        if not source_method_code:
+            return {}
         try:
-            captures: Captures = self.frame_query_and_capture_output(query, source_method_code)
-            # Find the line numbers where target method calls happen in source method
-            target_call_lines = []
+            tree = PARSER.parse(bytes(source_method_code, "utf-8"))
+            captures = Captures(CALLING_LINES_QUERY.captures(tree.root_node))
+            # Find the line numbers where calls happen in source method
+            calling_lines: Dict[str, List[int]] = {}
             for c in captures:
-                method_name = c.node.text.decode()
-                if method_name == target_method_name:
-                    target_call_lines.append(c.node.start_point[0])
+                calling_lines.setdefault(c.node.text.decode(), []).append(c.node.start_point[0])
         except Exception:
-            logger.warning(f"Unable to get calling lines for {target_method_name} in {source_method_code}.")
-            return []
+            logger.warning(f"Unable to get calling lines in {source_method_code}.")
+            return {}
 
-        return target_call_lines
+        for lines in calling_lines.values():
+            lines.sort()
+        return calling_lines
 
     def get_test_methods(self, source_class_code: str) -> Dict[str, str]:
         """Return methods annotated with @Test in a class.
@@ -0,0 +1,121 @@
+/*
+ * Copyright IBM Corporation 2024
+ *
+ * Licensed under the Apache License, Version 2.0 (the "License");
+ * you may not use this file except in compliance with the License.
+ * You may obtain a copy of the License at
+ *
+ *       http://www.apache.org/licenses/LICENSE-2.0
+ *
+ * Unless required by applicable law or agreed to in writing, software
+ * distributed under the License is distributed on an "AS IS" BASIS,
+ * WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+ * See the License for the specific language governing permissions and
+ * limitations under the License.
+ */
+
+import java.io.BufferedReader;
+import java.io.ByteArrayOutputStream;
+import java.io.File;
+import java.io.FileDescriptor;
+import java.io.FileOutputStream;
+import java.io.InputStreamReader;
+import java.io.OutputStream;
+import java.io.PrintStream;
+import java.io.PrintWriter;
+import java.io.StringWriter;
+import java.lang.reflect.InvocationTargetException;
+import java.net.URL;
+import java.net.URLClassLoader;
+import java.nio.charset.StandardCharsets;
+import java.util.Base64;
+import java.util.jar.JarFile;
+
+/**
+ * Long-lived codeanalyzer worker used by cldk's CodeanalyzerDaemon.
+ *
+ * <p>Launched as {@code java -cp cldk-worker.jar CodeanalyzerWorker codeanalyzer.jar}. It runs
+ * codeanalyzer's picocli command in-process for every request, so JVM startup and the warm-up of the
+ * JDK classes are paid once. Every request loads codeanalyzer in a fresh class loader over the jar, so
+ * static state of codeanalyzer (options, caches, WALA singletons) never leaks from one request into the
+ * next. Requests are read from stdin and responses written to stdout:
+ *
+ * <pre>
+ *   PING                          -> PONG
+ *   RUN &lt;n&gt; + n base64 args lines -> OK &lt;exit code&gt; &lt;byte count&gt; + the captured stdout bytes
+ *   EXIT                          -> (the worker exits)
+ * </pre>
+ *
+ * Failures are reported as {@code ERR <byte count>} followed by the error message bytes.
+ */
+public class CodeanalyzerWorker {
+
+    public static void main(String[] argv) throws Exception {
+        String mainClassName;
+        try (JarFile jar = new JarFile(argv[0])) {
+            mainClassName = jar.getManifest().getMainAttributes().getValue("Main-Class");
+        }
+        URL[] classpath = {new File(argv[0]).toURI().toURL()};
+
+        OutputStream protocolOut = new FileOutputStream(FileDescriptor.out);
+        BufferedReader in = new BufferedReader(new InputStreamReader(System.in, StandardCharsets.UTF_8));
+        // Anything codeanalyzer prints outside of a request must not corrupt the protocol stream.
+        System.setOut(System.err);
+
+        write(protocolOut, "READY\n".getBytes(StandardCharsets.UTF_8));
+        String line;
+        while ((line = in.readLine()) != null) {
+            if (line.equals("PING")) {
+                write(protocolOut, "PONG\n".getBytes(StandardCharsets.UTF_8));
+            } else if (line.equals("EXIT")) {
+                return;
+            } else if (line.startsWith("RUN ")) {
+                int argc = Integer.parseInt(line.substring(4).trim());
+                String[] args = new String[argc];
+                for (int i = 0; i < argc; i++) {
+                    args[i] = new String(Base64.getDecoder().decode(in.readLine()), StandardCharsets.UTF_8);
+                }
+                ByteArrayOutputStream captured = new ByteArrayOutputStream();
+                PrintStream capture = new PrintStream(captured, true, "UTF-8");
+                System.setOut(capture);
+                Thread thread = Thread.currentThread();
+                ClassLoader contextClassLoader = thread.getContextClassLoader();
+                // The loader's parent is the platform class loader, so that no codeanalyzer class is shared
+                // with the worker or with an earlier request.
+                try (URLClassLoader loader = new URLClassLoader(classpath, ClassLoader.getPlatformClassLoader())) {
+                    thread.setContextClassLoader(loader);
+                    Class<?> mainClass = Class.forName(mainClassName, true, loader);
+                    Class<?> commandLineClass = Class.forName("picocli.CommandLine", true, loader);
+                    Object command = commandLineClass.getConstructor(Object.class).newInstance(mainClass.getDeclaredConstructor().newInstance());
+                    int exitCode = (Integer) commandLineClass.getMethod("execute", String[].class).invoke(command, (Object) args);
+                    capture.flush();
+                    byte[] payload = captured.toByteArray();
+                    write(protocolOut, ("OK " + exitCode + " " + payload.length + "\n").getBytes(StandardCharsets.UTF_8), payload);
+                } catch (InvocationTargetException e) {
+                    error(protocolOut, e.getCause() != null ? e.getCause() : e);
+                } catch (Exception e) {
+                    error(protocolOut, e);
+                } finally {
+                    thread.setContextClassLoader(contextClassLoader);
+                    System.setOut(System.err);
+                }
+            } else {
+                error(protocolOut, new IllegalArgumentException("Unknown request: " + line));
+            }
+        }
+    }
+
+    private static void error(OutputStream out, Throwable t) throws Exception {
+        StringWriter trace = new StringWriter();
+        t.printStackTrace(new PrintWriter(trace));
+        byte[] payload = trace.toString().getBytes(StandardCharsets.UTF_8);
+        write(out, ("ERR " + payload.length + "\n").getBytes(StandardCharsets.UTF_8), payload);
+    }
+
+    private static void write(OutputStream out, byte[]... parts) throws Exception {
+        for (byte[] part : parts) {
+            out.write(part);
+        }
+        out.flush();
+    }
+}
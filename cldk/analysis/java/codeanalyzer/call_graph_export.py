@@ -0,0 +1,84 @@
+################################################################################
+# Copyright IBM Corporation 2024
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+################################################################################
+
+"""Call graph export module
+
+Streams a :class:`CompactCallGraph` as newline-delimited JSON (NDJSON). Every
+method is written once, as a node record with its ID, and every edge refers to
+its endpoints by ID, so method bodies are not repeated per edge. Records are
+produced one at a time, and memory use does not grow with the size of the
+graph.
+
+Node records come first, in ID order::
+
+    {"kind": "node", "id": 0, "method_signature": "...", "class": "...", "method_body": "..."}
+
+followed by one record per edge::
+
+    {"kind": "edge", "source": 0, "target": 1, "type": "CALL_DEP", "weight": "1", "calling_lines": [12]}
+"""
+
+import json
+from pathlib import Path
+from typing import Iterator
+
+from cldk.analysis.java.codeanalyzer.compact_call_graph import CompactCallGraph
+
+
+def iter_call_graph_ndjson(call_graph: CompactCallGraph, include_code: bool = True) -> Iterator[str]:
+    """Yield the NDJSON records of a call graph, one line (with its newline) at a time.
+
+    Args:
+        call_graph (CompactCallGraph): The call graph to export.
+        include_code (bool): If True, node records include the method body. Defaults to True.
+
+    Yields:
+        str: The node records, then the edge records.
+    """
+    for method_id in range(call_graph.number_of_methods()):
+        method_signature, class_name = call_graph.method_key(method_id)
+        node = {"kind": "node", "id": method_id, "method_signature": method_signature, "class": class_name}
+        if include_code:
+            node["method_body"] = call_graph.method_detail(method_id).method.code
+        yield json.dumps(node) + "\n"
+    for edge_id, source, target in call_graph.edges():
+        edge = {
+            "kind": "edge",
+            "source": source,
+            "target": target,
+            "type": call_graph.edge_type(edge_id),
+            "weight": call_graph.edge_weight(edge_id),
+            "calling_lines": call_graph.calling_lines(edge_id),
+        }
+        yield json.dumps(edge) + "\n"
+
+
+def write_call_graph_ndjson(call_graph: CompactCallGraph, path: str | Path, include_code: bool = True) -> Path:
+    """Write the NDJSON records of a call graph to a file.
+
+    Args:
+        call_graph (CompactCallGraph): The call graph to export.
+        path (str | Path): The file to write; its parent directory is created if needed.
+        include_code (bool): If True, node records include the method body. Defaults to True.
+
+    Returns:
+        Path: The written file.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("w", encoding="utf-8") as ndjson_file:
+        ndjson_file.writelines(iter_call_graph_ndjson(call_graph, include_code=include_code))
+    return path
@@ -0,0 +1,95 @@
+################################################################################
+# Copyright IBM Corporation 2024
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+################################################################################
+
+"""Call site index module
+
+Groups the call sites of an application by the receiver type and signature
+they call, so that the callers of a method are found without walking every
+call site of every method.
+"""
+
+from itertools import chain
+from typing import Dict, List, Mapping, Tuple
+
+from cldk.analysis.java.codeanalyzer.dispatch_table import DispatchTable
+from cldk.analysis.java.codeanalyzer.signatures import callee_declaration
+from cldk.analysis.java.codeanalyzer.type_hierarchy import TypeHierarchy
+from cldk.models.java.models import JType
+
+# A calling method: the qualified name of the declaring type and the signature of the method.
+CallingMethod = Tuple[str, str]
+
+
+class CallSiteIndex:
+    """A reverse index from called (receiver type, signature) pairs to the methods that call them.
+
+    A call site without a receiver type is a call on the type that declares the calling method, and is
+    indexed under that type.
+
+    Args:
+        types (Mapping[str, JType]): The types of the application, keyed by qualified name.
+        type_hierarchy (TypeHierarchy): The type hierarchy of the same types.
+        dispatch_table (DispatchTable): The dispatch table of the same types.
+    """
+
+    def __init__(self, types: Mapping[str, JType], type_hierarchy: TypeHierarchy, dispatch_table: DispatchTable) -> None:
+        self._type_hierarchy = type_hierarchy
+        self._dispatch_table = dispatch_table
+        # The calling methods of every key, as the keys of a dictionary to drop repeated calls from one method.
+        self._callers: Dict[Tuple[str, str], Dict[CallingMethod, None]] = {}
+        for type_name, type_declaration in types.items():
+            for signature, callable in type_declaration.callable_declarations.items():
+                for call_site in callable.call_sites:
+                    if call_site.callee_signature == "":
+                        continue
+                    receiver_type = call_site.receiver_type if call_site.receiver_type != "" else type_name
+                    callee_signature = callee_declaration(call_site.callee_signature, call_site.is_constructor_call)
+                    self._callers.setdefault((receiver_type, callee_signature), {})[(type_name, signature)] = None
+
+    def callers(self, receiver_type: str, callee_signature: str) -> List[CallingMethod]:
+        """Return the methods with a call site of the given signature on the given receiver type.
+
+        Args:
+            receiver_type (str): The qualified name of the declared type of the receiver.
+            callee_signature (str): The signature of the called method.
+
+        Returns:
+            List[CallingMethod]: The (declaring type, signature) pairs of the calling methods.
+        """
+        return list(self._callers.get((receiver_type, callee_signature), ()))
+
+    def dispatching_callers(self, qualified_class_name: str, signature: str) -> List[CallingMethod]:
+        """Return the methods with a call site that may dispatch to the given method.
+
+        Only calls on the declaring type itself, on one of its supertypes, or on one of its subtypes can
+        dispatch to a method, so only those receiver types are looked up.
+
+        Args:
+            qualified_class_name (str): The qualified name of the type that declares the method.
+            signature (str): The signature of the method.
+
+        Returns:
+            List[CallingMethod]: The (declaring type, signature) pairs of the calling methods.
+        """
+        callers: Dict[CallingMethod, None] = {}
+        receiver_types = chain(
+            (qualified_class_name,), self._type_hierarchy.all_supertypes(qualified_class_name), self._type_hierarchy.all_subtypes(qualified_class_name)
+        )
+        for receiver_type in receiver_types:
+            calling_methods = self._callers.get((receiver_type, signature))
+            if calling_methods and any(target_type == qualified_class_name for target_type, _ in self._dispatch_table.targets(receiver_type, signature)):
+                callers.update(calling_methods)
+        return list(callers)
@@ -15,20 +15,45 @@
 ################################################################################
 import json
 import logging
+import os
+import queue
 import re
 import shlex
 import subprocess
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from importlib import resources
 from itertools import chain, groupby
 from pathlib import Path
 from subprocess import CompletedProcess
-from typing import Any, Dict, List, Tuple
+from typing import Any, Callable, Dict, Iterator, List, TextIO, Tuple
 from typing import Union
 
 import networkx as nx
 
 from cldk.analysis import AnalysisLevel
 from cldk.analysis.commons.treesitter import TreesitterJava
+from cldk.analysis.java.codeanalyzer.call_graph_export import iter_call_graph_ndjson, write_call_graph_ndjson
+from cldk.analysis.java.codeanalyzer.compact_call_graph import CompactCallGraph, CompactCallGraphBuilder
+from cldk.analysis.java.codeanalyzer.daemon import get_daemon
+from cldk.analysis.java.codeanalyzer.incremental import declarations_changed, diff_file_hashes, hash_source_files, merge_analysis
+from cldk.analysis.java.codeanalyzer.loader import load_japplication
+from cldk.analysis.java.codeanalyzer.manifest import MANIFEST_FILE_NAME, AnalysisManifest, load_manifest, write_manifest
+from cldk.analysis.java.codeanalyzer.reachability import Reachability
+from cldk.analysis.java.codeanalyzer.sharding import discover_modules, merge_shards
+from cldk.analysis.java.codeanalyzer.signatures import call_graph_signature, callee_declaration, symbol_table_signature
+from cldk.analysis.java.codeanalyzer.snapshot import (
+    CALL_GRAPH_SNAPSHOT_FILE_NAME,
+    SNAPSHOT_FILE_NAME,
+    file_sha256,
+    call_graph_snapshot_key,
+    load_call_graph_snapshot,
+    load_snapshot,
+    save_call_graph_snapshot,
+    save_snapshot,
+    snapshot_key,
+)
+from cldk.analysis.java.codeanalyzer.symbol_index import SymbolIndex
 from cldk.models.java import JGraphEdges
 from cldk.models.java.enums import CRUDOperationType
 from cldk.models.java.models import JApplication, JCRUDOperation, JCallable, JCallableParameter, JComment, JField, JMethodDetail, JType, JCompilationUnit, JGraphEdgesST
@@ -48,6 +73,32 @@ class JCodeanalyzer:
             If None, the analysis will be read from the pipe.
         analysis_level (str): The level of analysis ('symbol_table' or 'call_graph').
         eager_analysis (bool): If True, the analysis will be performed every time the object is created.
+        target_files (List[str], optional): The files to constrain the analysis to.
+        lazy_symbol_table (bool): If True, compilation units are validated the first time they are accessed
+            instead of when the analysis is loaded, and call graph edges the first time the call graph is queried.
+            Defaults to False.
+        snapshot_cache (bool): If True and analysis_json_path is set, the validated analysis is cached as a binary
+            snapshot next to analysis.json and reused while analysis.json, the analysis level and the backend
+            version are unchanged. Ignored with lazy_symbol_table. The built call graph is cached the same way,
+            with or without lazy_symbol_table. Defaults to False.
+        use_daemon (bool): If True, codeanalyzer runs in a persistent JVM worker that is shared by all analyses
+            using the same jar, instead of a new JVM per run. Defaults to False.
+        incremental (bool): If True and analysis_json_path is set, the content hash of every source file is recorded
+            next to analysis.json, and on later runs only changed and added files are re-analyzed and merged into it.
+            Defaults to False.
+        shard_modules (bool): If True and the project is a multi-module Maven or Gradle build, every module is
+            analyzed by its own codeanalyzer process and the results are merged, including the call edges between
+            modules. Defaults to False.
+        max_shard_workers (int, optional): The maximum number of codeanalyzer processes that run at a time with
+            shard_modules. With use_daemon, up to this many persistent workers are started for the shards.
+            Defaults to the number of CPUs.
+        trusted_input (bool): If True, the output of a codeanalyzer release whose major version the models were
+            written for is built into models without pydantic validation. Output of other versions is validated.
+            Defaults to False.
+        externalize_code (bool): If True, the code of callables and initialization blocks is not kept in memory; only
+            their line spans are, and their code attribute is read from the source file on access through a small LRU
+            of memory-mapped files. Requires the analyzed sources to stay in place. Ignored for single file analysis.
+            Defaults to False.
     """
 
     def __init__(
@@ -59,6 +110,14 @@ class JCodeanalyzer:
         analysis_level: str,
         eager_analysis: bool,
         target_files: List[str] | None,
+        lazy_symbol_table: bool = False,
+        snapshot_cache: bool = False,
+        use_daemon: bool = False,
+        incremental: bool = False,
+        shard_modules: bool = False,
+        max_shard_workers: int | None = None,
+        trusted_input: bool = False,
+        externalize_code: bool = False,
     ) -> None:
         self.project_dir = project_dir
         self.source_code = source_code
@@ -67,15 +126,29 @@ class JCodeanalyzer:
         self.eager_analysis = eager_analysis
         self.analysis_level = analysis_level
         self.target_files = target_files
+        self.lazy_symbol_table = lazy_symbol_table
+        self.snapshot_cache = snapshot_cache
+        self.use_daemon = use_daemon
+        self.incremental = incremental
+        self.shard_modules = shard_modules
+        self.max_shard_workers = max_shard_workers
+        self.trusted_input = trusted_input
+        self.externalize_code = externalize_code
+        self._symbol_index: SymbolIndex | None = None
+        self._compact_call_graph: CompactCallGraph | None = None
+        self._reachability: Reachability | None = None
+        # The SHA-256 of analysis.json, with the (path, size, modification time) it was computed for
+        self._analysis_json_sha256: Tuple[Tuple[str, int, int], str] | None = None
         if self.source_code is None:
             self.application = self._init_codeanalyzer(analysis_level=1 if analysis_level == AnalysisLevel.symbol_table else 2)
         else:
             self.application = self._codeanalyzer_single_file()
         # Attributes related the Java code analysis...
-        if analysis_level == AnalysisLevel.call_graph:
-            self.call_graph: nx.DiGraph = self._generate_call_graph(using_symbol_table=False)
-        else:
-            self.call_graph: nx.DiGraph | None = None
+        # The networkx view of the call graph is only built when it is asked for.
+        self.call_graph: nx.DiGraph | None = None
+        # With lazy_symbol_table, the call graph is only built (and its compilation units validated) when it is first queried.
+        if analysis_level == AnalysisLevel.call_graph and not lazy_symbol_table:
+            self._compact_call_graph = self._init_compact_call_graph(using_symbol_table=False)
 
     def _get_application(self) -> JApplication:
         """Should return  the application view of the Java code.
@@ -87,6 +160,54 @@ class JCodeanalyzer:
             self.application = self._init_codeanalyzer()
         return self.application
 
+    def close(self) -> None:
+        """Should release the analysis results, including the callable registry of the application.
+
+        Queries made after closing load the analysis again.
+        """
+        if self.application is not None:
+            self.application.release_callables()
+        self.application = None
+        self.call_graph = None
+        self._compact_call_graph = None
+        self._reachability = None
+        self._symbol_index = None
+
+    def _get_codeanalyzer_jar(self) -> Path | None:
+        """Should return the path to the codeanalyzer jar.
+
+        Returns:
+            Path | None: The codeanalyzer jar, or None if the bundled jar is missing.
+
+        Raises:
+            CodeanalyzerExecutionException: If analysis_backend_path is provided but has no codeanalyzer jar.
+        """
+        return self._find_codeanalyzer_jar(self.analysis_backend_path)
+
+    @staticmethod
+    def _find_codeanalyzer_jar(analysis_backend_path: Union[str, Path, None]) -> Path | None:
+        """Should return the codeanalyzer jar in analysis_backend_path, or the bundled one if it is not set.
+
+        Args:
+            analysis_backend_path (str or Path, optional): The path to the analysis backend.
+
+        Returns:
+            Path | None: The codeanalyzer jar, or None if the bundled jar is missing.
+
+        Raises:
+            CodeanalyzerExecutionException: If analysis_backend_path is provided but has no codeanalyzer jar.
+        """
+        if analysis_backend_path:
+            analysis_backend_path = Path(analysis_backend_path)
+            logger.info(f"Using codeanalyzer jar from {analysis_backend_path}")
+            codeanalyzer_jar_file = next(analysis_backend_path.rglob("codeanalyzer-*.jar"), None)
+            if codeanalyzer_jar_file is None:
+                raise CodeanalyzerExecutionException("Codeanalyzer jar not found in the provided path.")
+            return codeanalyzer_jar_file
+        # Since the path to codeanalyzer.jar we will use the default jar from the cldk/analysis/java/codeanalyzer/jar folder
+        with resources.as_file(resources.files("cldk.analysis.java.codeanalyzer.jar")) as codeanalyzer_jar_path:
+            return next(codeanalyzer_jar_path.rglob("codeanalyzer-*.jar"), None)
+
     def _get_codeanalyzer_exec(self) -> List[str]:
         """Should return  the executable command for codeanalyzer.
 
@@ -97,36 +218,137 @@ class JCodeanalyzer:
             - If the analysis_backend_path is provided, the codeanalyzer jar from that path will be used.
             - If not provided, the latest codeanalyzer jar from GitHub will be downloaded.
         """
+        return shlex.split(f"java -jar {self._get_codeanalyzer_jar()}")
 
-        if self.analysis_backend_path:
-            analysis_backend_path = Path(self.analysis_backend_path)
-            logger.info(f"Using codeanalyzer jar from {analysis_backend_path}")
-            codeanalyzer_jar_file = next(analysis_backend_path.rglob("codeanalyzer-*.jar"), None)
-            if codeanalyzer_jar_file is None:
-                raise CodeanalyzerExecutionException("Codeanalyzer jar not found in the provided path.")
-            codeanalyzer_exec = shlex.split(f"java -jar {codeanalyzer_jar_file}")
-        else:
-            # Since the path to codeanalyzer.jar we will use the default jar from the cldk/analysis/java/codeanalyzer/jar folder
-            with resources.as_file(resources.files("cldk.analysis.java.codeanalyzer.jar")) as codeanalyzer_jar_path:
-                codeanalyzer_jar_file = next(codeanalyzer_jar_path.rglob("codeanalyzer-*.jar"), None)
-                codeanalyzer_exec = shlex.split(f"java -jar {codeanalyzer_jar_file}")
-        return codeanalyzer_exec
+    def _get_backend_version(self) -> str:
+        """Should return the version of the codeanalyzer backend.
+
+        The jar is named codeanalyzer-<version>.jar, where <version> is the codeanalyzer-java version pinned
+        under [tool.backend-versions] in pyproject.toml when the jar is bundled.
+
+        Returns:
+            str: The backend version, or "unknown" if it cannot be determined.
+        """
+        try:
+            codeanalyzer_jar_file = self._get_codeanalyzer_jar()
+        except CodeanalyzerExecutionException:
+            return "unknown"
+        match = re.fullmatch(r"codeanalyzer-(.+)\.jar", codeanalyzer_jar_file.name) if codeanalyzer_jar_file else None
+        return match.group(1) if match else "unknown"
+
+    def _run_codeanalyzer(self, codeanalyzer_args: List[str], daemon_worker: int = 0) -> CompletedProcess[str]:
+        """Should run codeanalyzer with the given arguments.
+
+        With use_daemon, the run is served by a shared codeanalyzer worker of the jar; otherwise a new
+        JVM is started for it.
+
+        Args:
+            codeanalyzer_args (List[str]): The codeanalyzer command line arguments.
+            daemon_worker (int): The number of the codeanalyzer worker that serves the run with use_daemon. Defaults to 0.
+
+        Returns:
+            CompletedProcess[str]: The completed run with its captured stdout.
+        """
+        return self._execute_codeanalyzer(codeanalyzer_args, self.analysis_backend_path, self.use_daemon, daemon_worker)
+
+    @staticmethod
+    def _execute_codeanalyzer(
+        codeanalyzer_args: List[str], analysis_backend_path: Union[str, Path, None], use_daemon: bool, daemon_worker: int = 0
+    ) -> CompletedProcess[str]:
+        """Should run the codeanalyzer jar of analysis_backend_path with the given arguments.
+
+        Args:
+            codeanalyzer_args (List[str]): The codeanalyzer command line arguments.
+            analysis_backend_path (str or Path, optional): The path to the analysis backend.
+            use_daemon (bool): If True, the run is served by a shared codeanalyzer worker of the jar.
+            daemon_worker (int): The number of the worker that serves the run with use_daemon. Defaults to 0.
+
+        Returns:
+            CompletedProcess[str]: The completed run with its captured stdout.
+        """
+        codeanalyzer_jar = JCodeanalyzer._find_codeanalyzer_jar(analysis_backend_path)
+        if use_daemon:
+            logger.info(f"Running codeanalyzer worker {daemon_worker} with args {codeanalyzer_args}")
+            return get_daemon(codeanalyzer_jar, daemon_worker).run(codeanalyzer_args)
+        codeanalyzer_cmd = shlex.split(f"java -jar {codeanalyzer_jar}") + codeanalyzer_args
+        logger.info(f"Running codeanalyzer: {' '.join(codeanalyzer_cmd)}")
+        return subprocess.run(codeanalyzer_cmd, capture_output=True, text=True, check=True)
+
+    @staticmethod
+    def analyze_snippets(snippets: List[str], analysis_backend_path: Union[str, Path, None] = None, use_daemon: bool = False) -> List[JApplication]:
+        """Should analyze many Java source snippets with a single codeanalyzer run.
+
+        Every snippet is written to its own directory of a temporary workspace, the workspace is analyzed
+        as one project, and the resulting symbol table is split back per snippet. Unlike single file mode,
+        this starts one JVM for all snippets and does not pass sources on the command line.
+
+        Args:
+            snippets (List[str]): The Java source code of the snippets.
+            analysis_backend_path (str or Path, optional): The path to the analysis backend. Defaults to None.
+            use_daemon (bool): If True, the run is served by the shared codeanalyzer worker. Defaults to False.
+
+        Returns:
+            List[JApplication]: One application per snippet, in the order of snippets. The symbol table of a
+            snippet that could not be parsed is empty.
+
+        Raises:
+            CodeanalyzerExecutionException: If there is an error running Codeanalyzer.
+        """
+        if not snippets:
+            return []
+        with tempfile.TemporaryDirectory() as workspace:
+            for index, snippet in enumerate(snippets):
+                # The file is named after the first public type, as javac requires.
+                public_type = re.search(r"\bpublic\s+(?:(?:abstract|final|sealed|non-sealed|static|strictfp)\s+)*(?:class|interface|enum|record|@interface)\s+(\w+)", snippet)
+                snippet_file = Path(workspace, f"snippet_{index}", f"{public_type.group(1) if public_type else 'Snippet'}.java")
+                snippet_file.parent.mkdir()
+                snippet_file.write_text(snippet, encoding="utf-8")
+            try:
+                console_out: CompletedProcess[str] = JCodeanalyzer._execute_codeanalyzer(["-i", workspace, "--analysis-level=1"], analysis_backend_path, use_daemon)
+                application = load_japplication(console_out.stdout)
+            except Exception as e:
+                raise CodeanalyzerExecutionException(str(e)) from e
+        symbol_tables: List[Dict[str, JCompilationUnit]] = [{} for _ in snippets]
+        for file_path, compilation_unit in application.symbol_table.items():
+            snippet_dir = Path(file_path).parent.name
+            if snippet_dir.startswith("snippet_") and snippet_dir[len("snippet_") :].isdigit():
+                symbol_tables[int(snippet_dir[len("snippet_") :])][file_path] = compilation_unit
+        # The compilation units are already validated; this only gives every snippet its own callable registry.
+        return [JApplication(symbol_table=symbol_table) for symbol_table in symbol_tables]
 
     @staticmethod
-    def _init_japplication(data: str) -> JApplication:
-        """Should return JApplication giving the stringified JSON as input.
+    def _init_japplication(data: str | TextIO, lazy: bool = False, trusted: bool = False, externalize_code: bool = False) -> JApplication:
+        """Should return JApplication giving the stringified JSON (or a stream of it) as input.
+
+        The JSON is parsed in a single streaming pass; see :func:`load_japplication`. If lazy is True,
+        the symbol table validates each compilation unit the first time it is accessed. If trusted is
+        True, the output of a supported codeanalyzer version is constructed without validation. If
+        externalize_code is True, code bodies are read from the source files on access.
+
         Returns
         -------
         JApplication
             The application view of the Java code with the analysis results.
         """
-        # from ipdb import set_trace
-
-        # set_trace()
-        return JApplication(**json.loads(data))
+        return load_japplication(data, lazy=lazy, trusted=trusted, externalize_code=externalize_code)
     
     @staticmethod
     def check_exisiting_analysis_file_level(analysis_json_path_file: Path, analysis_level: int) -> bool:
+        """Should check whether an existing analysis.json holds the results of the given analysis level.
+
+        The check is answered from the manifest next to analysis.json when it describes the current file;
+        otherwise analysis.json itself is parsed.
+
+        Args:
+            analysis_json_path_file (Path): The analysis.json file.
+            analysis_level (int): The level of analysis (1 for symbol table, 2 for call graph).
+
+        Returns:
+            bool: True if analysis.json exists and can be reused for the analysis level.
+        """
+        manifest = load_manifest(analysis_json_path_file.with_name(MANIFEST_FILE_NAME))
+        if manifest is not None and manifest.describes(analysis_json_path_file):
+            return manifest.analysis_level >= analysis_level
         analysis_file_compatible = True
         if not analysis_json_path_file.exists():
             analysis_file_compatible = False
@@ -139,8 +361,6 @@ class JCodeanalyzer:
                     analysis_file_compatible = False
         return analysis_file_compatible
 
-
-
     def _init_codeanalyzer(self, analysis_level=1) -> JApplication:
         """Should initialize the Codeanalyzer.
 
@@ -153,64 +373,233 @@ class JCodeanalyzer:
         Raises:
             CodeanalyzerExecutionException: If there is an error running Codeanalyzer.
         """
-        codeanalyzer_exec = self._get_codeanalyzer_exec()
-        codeanalyzer_args = ""
+        codeanalyzer_args = []
         if self.analysis_json_path is None:
             logger.info("Reading analysis from the pipe.")
             # If target file is provided, the input is merged into a single string and passed to codeanalyzer
             if self.target_files:
                 target_file_options = " -t ".join([s.strip() for s in self.target_files])
-                codeanalyzer_args = codeanalyzer_exec + shlex.split(f"-i {Path(self.project_dir)} --analysis-level={analysis_level} -t {target_file_options}")
+                codeanalyzer_args = shlex.split(f"-i {Path(self.project_dir)} --analysis-level={analysis_level} -t {target_file_options}")
             else:
-                codeanalyzer_args = codeanalyzer_exec + shlex.split(f"-i {Path(self.project_dir)} --analysis-level={analysis_level}")
+                codeanalyzer_args = shlex.split(f"-i {Path(self.project_dir)} --analysis-level={analysis_level}")
+            shard_modules = self._get_shard_modules()
             try:
-                logger.info(f"Running codeanalyzer: {' '.join(codeanalyzer_args)}")
-                console_out: CompletedProcess[str] = subprocess.run(
-                    codeanalyzer_args,
-                    capture_output=True,
-                    text=True,
-                    check=True,
-                )
-                return self._init_japplication(console_out.stdout)
+                if shard_modules:
+                    with tempfile.TemporaryDirectory() as output_dir:
+                        analysis_json_file = Path(output_dir).joinpath("analysis.json")
+                        self._run_codeanalyzer_shards(shard_modules, analysis_level, analysis_json_file)
+                        with open(analysis_json_file, encoding="utf-8") as f:
+                            return self._init_japplication(f, lazy=self.lazy_symbol_table, trusted=self.trusted_input, externalize_code=self.externalize_code)
+                console_out: CompletedProcess[str] = self._run_codeanalyzer(codeanalyzer_args)
+                return self._init_japplication(console_out.stdout, lazy=self.lazy_symbol_table, trusted=self.trusted_input, externalize_code=self.externalize_code)
             except Exception as e:
                 raise CodeanalyzerExecutionException(str(e)) from e
         else:
             # Check if the code analyzer needs to be run
             is_run_code_analyzer = False
             analysis_json_path_file = Path(self.analysis_json_path).joinpath("analysis.json")
+            manifest = load_manifest(analysis_json_path_file.with_name(MANIFEST_FILE_NAME))
+            file_hashes = None
             # If target file is provided, the input is merged into a single string and passed to codeanalyzer
             if self.target_files:
                 target_file_options = " -t ".join([s.strip() for s in self.target_files])
-                codeanalyzer_args = codeanalyzer_exec + shlex.split(
+                codeanalyzer_args = shlex.split(
                     f"-i {Path(self.project_dir)} --analysis-level={analysis_level}" f" -o {self.analysis_json_path} -t {target_file_options}"
                 )
                 is_run_code_analyzer = True
             else:
-                if not self.check_exisiting_analysis_file_level(analysis_json_path_file, analysis_level) or self.eager_analysis:
+                if (
+                    not self.check_exisiting_analysis_file_level(analysis_json_path_file, analysis_level)
+                    or self.eager_analysis
+                    or (self.incremental and (manifest is None or manifest.file_hashes is None or not manifest.describes(analysis_json_path_file)))
+                ):
                     # If the analysis file does not exist, we'll run the analysis. Alternately, if the eager_analysis
                     # flag is set, we'll run the analysis every time the object is created. This will happen regradless
-                    # of the existence of the analysis file.
+                    # of the existence of the analysis file. An incremental analysis also needs a full run to start from.
                     # Create the executable command for codeanalyzer.
-                    codeanalyzer_args = codeanalyzer_exec + shlex.split(f"-i {Path(self.project_dir)} --analysis-level={analysis_level} -o {self.analysis_json_path} -v")
+                    codeanalyzer_args = self._full_analysis_args(analysis_level)
                     is_run_code_analyzer = True
+                elif self.incremental:
+                    file_hashes = self._reanalyze_changed_files(analysis_json_path_file, manifest)
 
             if is_run_code_analyzer:
+                # Sources are hashed before the run, so that files edited while it runs are re-analyzed next time.
+                file_hashes = hash_source_files(self.project_dir) if self.incremental and not self.target_files else None
+                self._run_codeanalyzer_into(codeanalyzer_args, analysis_level, analysis_json_path_file)
+            if self.snapshot_cache and not self.lazy_symbol_table:
+                application = self._init_japplication_from_snapshot(analysis_json_path_file, analysis_level)
+            else:
+                with open(analysis_json_path_file, encoding="utf-8") as f:
+                    application = self._init_japplication(f, lazy=self.lazy_symbol_table, trusted=self.trusted_input, externalize_code=self.externalize_code)
+            if is_run_code_analyzer:
+                write_manifest(analysis_json_path_file, self._get_backend_version(), application, file_hashes)
+            elif file_hashes is not None:
+                write_manifest(analysis_json_path_file, manifest.backend_version, application, file_hashes, previous=manifest)
+            return application
+
+    def _full_analysis_args(self, analysis_level: int) -> List[str]:
+        """Should return the codeanalyzer arguments that analyze the whole project into analysis_json_path."""
+        return shlex.split(f"-i {Path(self.project_dir)} --analysis-level={analysis_level} -o {self.analysis_json_path} -v")
+
+    def _run_codeanalyzer_into(self, codeanalyzer_args: List[str], analysis_level: int, analysis_json_path_file: Path) -> None:
+        """Should run codeanalyzer, or analyze the modules of the project as shards, and check that it wrote analysis_json_path_file.
+
+        Args:
+            codeanalyzer_args (List[str]): The codeanalyzer command line arguments, when the project is not sharded.
+            analysis_level (int): The level of analysis (1 for symbol table, 2 for call graph).
+            analysis_json_path_file (Path): The analysis.json file that the run writes.
+
+        Raises:
+            CodeanalyzerExecutionException: If there is an error running Codeanalyzer.
+        """
+        shard_modules = self._get_shard_modules()
+        try:
+            if shard_modules:
+                analysis_json_path_file.parent.mkdir(parents=True, exist_ok=True)
+                self._run_codeanalyzer_shards(shard_modules, analysis_level, analysis_json_path_file)
+            else:
+                self._run_codeanalyzer(codeanalyzer_args)
+            if not analysis_json_path_file.exists():
+                raise CodeanalyzerExecutionException("Codeanalyzer did not generate the analysis file.")
+
+        except Exception as e:
+            raise CodeanalyzerExecutionException(str(e)) from e
+
+    def _get_shard_modules(self) -> List[Path]:
+        """Should return the modules to analyze as separate shards.
+
+        Returns:
+            List[Path]: The modules of the project if shard_modules is set, the analysis is not constrained to
+            target files and the project has at least two independent modules; otherwise an empty list.
+        """
+        if not self.shard_modules or self.target_files:
+            return []
+        return discover_modules(self.project_dir)
+
+    def _run_codeanalyzer_shards(self, modules: List[Path], analysis_level: int, analysis_json_file: Path) -> None:
+        """Should analyze every module in its own codeanalyzer process and merge the shards into analysis_json_file.
+
+        At most max_shard_workers codeanalyzer processes run at a time. With use_daemon, each of them is a
+        codeanalyzer worker of its own, as a worker serves one run at a time; the workers are kept for later
+        sharded analyses.
+
+        Args:
+            modules (List[Path]): The modules to analyze.
+            analysis_level (int): The level of analysis (1 for symbol table, 2 for call graph).
+            analysis_json_file (Path): The file to write the merged analysis to.
+
+        Raises:
+            CodeanalyzerExecutionException: If the analysis of a module fails.
+        """
+        logger.info(f"Analyzing {len(modules)} modules in parallel.")
+        with tempfile.TemporaryDirectory() as shards_dir:
+            shard_dirs = [Path(shards_dir).joinpath(str(index)) for index in range(len(modules))]
+            max_workers = self.max_shard_workers or os.cpu_count()
+            # No more shards run at a time than there are workers, so a free worker is always available
+            daemon_workers = queue.SimpleQueue()
+            for daemon_worker in range(max_workers):
+                daemon_workers.put(daemon_worker)
+
+            def run_shard(module: Path, shard_dir: Path) -> CompletedProcess[str]:
+                daemon_worker = daemon_workers.get()
                 try:
-                    logger.info(f"Running codeanalyzer subprocess with args {codeanalyzer_args}")
-                    subprocess.run(
-                        codeanalyzer_args,
-                        capture_output=True,
-                        text=True,
-                        check=True,
-                    )
-                    if not analysis_json_path_file.exists():
-                        raise CodeanalyzerExecutionException("Codeanalyzer did not generate the analysis file.")
+                    return self._run_codeanalyzer(["-i", str(module), f"--analysis-level={analysis_level}", "-o", str(shard_dir)], daemon_worker)
+                finally:
+                    daemon_workers.put(daemon_worker)
+
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                runs = [executor.submit(run_shard, module, shard_dir) for module, shard_dir in zip(modules, shard_dirs)]
+                for module, run in zip(modules, runs):
+                    try:
+                        run.result()
+                    except Exception as e:
+                        raise CodeanalyzerExecutionException(f"Analysis of module {module} failed: {e}") from e
+            shard_files = [shard_dir.joinpath("analysis.json") for shard_dir in shard_dirs]
+            for module, shard_file in zip(modules, shard_files):
+                if not shard_file.exists():
+                    raise CodeanalyzerExecutionException(f"Codeanalyzer did not generate the analysis file for module {module}.")
+            merge_shards(shard_files, analysis_json_file)
+
+    def _reanalyze_changed_files(self, analysis_json_path_file: Path, manifest: AnalysisManifest) -> Dict[str, str] | None:
+        """Should bring analysis.json up to date by re-analyzing only the files that changed since it was written.
+
+        Files are compared by content hash with the hashes recorded in the manifest. Changed and added files
+        are analyzed with codeanalyzer's target file mode into a temporary directory and merged into
+        analysis.json; deleted files are dropped from it. Files are re-analyzed at the analysis level of
+        analysis.json. If analysis.json has a call graph and the changed, added or deleted files declare other
+        types or callables than before, the whole project is analyzed again instead: a new override or
+        implementation adds call edges to unchanged files, which merging would miss.
+
+        Args:
+            analysis_json_path_file (Path): The analysis.json file.
+            manifest (AnalysisManifest): The manifest of analysis.json.
+
+        Returns:
+            Dict[str, str] | None: The new file hashes if analysis.json was updated, otherwise None.
 
+        Raises:
+            CodeanalyzerExecutionException: If there is an error running Codeanalyzer.
+        """
+        file_hashes = hash_source_files(self.project_dir)
+        changed_files, deleted_files = diff_file_hashes(manifest.file_hashes, file_hashes)
+        if not changed_files and not deleted_files:
+            return None
+        logger.info(f"Re-analyzing {len(changed_files)} changed and dropping {len(deleted_files)} deleted files.")
+        with tempfile.TemporaryDirectory() as delta_dir:
+            delta_file = Path(delta_dir).joinpath("analysis.json")
+            if changed_files:
+                codeanalyzer_args = ["-i", str(Path(self.project_dir)), f"--analysis-level={manifest.analysis_level}", "-o", delta_dir]
+                codeanalyzer_args += list(chain.from_iterable(("-t", changed_file) for changed_file in changed_files))
+                try:
+                    self._run_codeanalyzer(codeanalyzer_args)
                 except Exception as e:
                     raise CodeanalyzerExecutionException(str(e)) from e
-            with open(analysis_json_path_file) as f:
-                data = json.load(f)
-                return self._init_japplication(json.dumps(data))
+                if not delta_file.exists():
+                    raise CodeanalyzerExecutionException("Codeanalyzer did not generate the analysis file.")
+            else:
+                delta_file.write_text("{}", encoding="utf-8")
+            if manifest.analysis_level == 2 and declarations_changed(analysis_json_path_file, delta_file, changed_files, deleted_files):
+                logger.info("The declarations of the changed files changed; analyzing the whole project again.")
+                self._run_codeanalyzer_into(self._full_analysis_args(manifest.analysis_level), manifest.analysis_level, analysis_json_path_file)
+            else:
+                merge_analysis(analysis_json_path_file, delta_file, changed_files, deleted_files, analysis_json_path_file)
+        return file_hashes
+
+    def _get_analysis_json_sha256(self, analysis_json_path_file: Path) -> str:
+        """Should return the SHA-256 of analysis.json, hashing it again only when its size or modification time changed.
+
+        The application and the call graph snapshots are both keyed on it, so a warm start reads analysis.json once.
+
+        Args:
+            analysis_json_path_file (Path): The analysis.json file.
+
+        Returns:
+            str: The hex digest of analysis.json.
+        """
+        stat = analysis_json_path_file.stat()
+        file_signature = (str(analysis_json_path_file), stat.st_size, stat.st_mtime_ns)
+        if self._analysis_json_sha256 is None or self._analysis_json_sha256[0] != file_signature:
+            self._analysis_json_sha256 = (file_signature, file_sha256(analysis_json_path_file))
+        return self._analysis_json_sha256[1]
+
+    def _init_japplication_from_snapshot(self, analysis_json_path_file: Path, analysis_level: int) -> JApplication:
+        """Should return JApplication from the snapshot cache next to analysis.json, refreshing it on a miss.
+
+        Args:
+            analysis_json_path_file (Path): The analysis.json file.
+            analysis_level (int): The level of analysis (1 for symbol table, 2 for call graph).
+
+        Returns:
+            JApplication: The application view of the Java code with the analysis results.
+        """
+        snapshot_file = analysis_json_path_file.with_name(SNAPSHOT_FILE_NAME)
+        key = snapshot_key(self._get_analysis_json_sha256(analysis_json_path_file), analysis_level, self._get_backend_version(), self.externalize_code)
+        application = load_snapshot(snapshot_file, key)
+        if application is None:
+            with open(analysis_json_path_file, encoding="utf-8") as f:
+                application = self._init_japplication(f, trusted=self.trusted_input, externalize_code=self.externalize_code)
+            save_snapshot(snapshot_file, key, application)
+        return application
 
     def _codeanalyzer_single_file(self) -> JApplication:
         """Invokes codeanalyzer in a single file mode.
@@ -218,15 +607,12 @@ class JCodeanalyzer:
         Returns:
             JApplication: The application view of the Java code with the analysis results.
         """
-        codeanalyzer_exec = self._get_codeanalyzer_exec()
         codeanalyzer_args = ["--source-analysis", self.source_code]
-        codeanalyzer_cmd = codeanalyzer_exec + codeanalyzer_args
         try:
-            logger.info(f"Running {' '.join(codeanalyzer_cmd)}")
-            console_out: CompletedProcess[str] = subprocess.run(codeanalyzer_cmd, capture_output=True, text=True, check=True)
+            console_out: CompletedProcess[str] = self._run_codeanalyzer(codeanalyzer_args)
             if console_out.returncode != 0:
                 raise CodeanalyzerExecutionException(console_out.stderr)
-            return self._init_japplication(console_out.stdout)
+            return self._init_japplication(console_out.stdout, trusted=self.trusted_input)
         except Exception as e:
             raise CodeanalyzerExecutionException(str(e)) from e
 
@@ -240,6 +626,20 @@ class JCodeanalyzer:
             self.application = self._init_codeanalyzer()
         return self.application.symbol_table
 
+    def _get_symbol_index(self) -> SymbolIndex:
+        """Should return the lookup index of the symbol table.
+
+        The index is built on first use and rebuilt whenever the application has been reloaded, e.g. after an
+        incremental re-analysis, so that it always describes the current symbol table.
+
+        Returns:
+            SymbolIndex: The index of the current symbol table.
+        """
+        symbol_table = self.get_symbol_table()
+        if self._symbol_index is None or self._symbol_index.symbol_table is not symbol_table:
+            self._symbol_index = SymbolIndex(symbol_table)
+        return self._symbol_index
+
     def get_application_view(self) -> JApplication:
         """Should return  the application view of the Java code.
 
@@ -276,79 +676,344 @@ class JCodeanalyzer:
         Returns:
             nx.DiGraph: The call graph of the Java code.
         """
-        cg = nx.DiGraph()
+        return self._build_compact_call_graph(using_symbol_table).to_networkx()
+
+    def _build_compact_call_graph(self, using_symbol_table: bool) -> CompactCallGraph:
+        """Should build the call graph of the Java code with integer method IDs and CSR adjacency arrays.
+
+        A call graph built from the symbol table is built in one pass over the call sites of all callables,
+        resolving each call with class hierarchy analysis. It needs no call graph from codeanalyzer, but is an
+        approximation: calls whose receiver type codeanalyzer could not resolve are missing, and calls through
+        an interface or base class reach every implementation they may dispatch to.
+
+        Args:
+            using_symbol_table (bool): Whether to use the symbol table for building the call graph.
+
+        Returns:
+            CompactCallGraph: The call graph of the Java code.
+        """
+        builder = CompactCallGraphBuilder()
+        calling_lines = self._calling_lines_finder()
         if using_symbol_table:
-            NotImplementedError("Call graph generation using symbol table is not implemented yet.")
+            dispatch_table = self._get_symbol_index().dispatch_table()
+            for class_name, class_details in self.get_all_classes().items():
+                for method_signature, method_details in class_details.callable_declarations.items():
+                    for call_site in method_details.call_sites:
+                        if call_site.callee_signature == "":
+                            continue
+                        # A call without a receiver type is a call on the enclosing class
+                        receiver_type = call_site.receiver_type if call_site.receiver_type != "" else class_name
+                        callee_signature = callee_declaration(call_site.callee_signature, call_site.is_constructor_call)
+                        for target_class, target_method_details in dispatch_table.targets(receiver_type, callee_signature):
+                            source = builder.method_id(method_signature, class_name)
+                            target = builder.method_id(target_method_details.signature, target_class)
+                            if source is not None and target is not None and builder.has_edge(source, target):
+                                continue
+                            if source is None:
+                                source = builder.add_method(JMethodDetail(method_declaration=method_details.declaration, klass=class_name, method=method_details))
+                            if target is None:
+                                target = builder.add_method(
+                                    JMethodDetail(method_declaration=target_method_details.declaration, klass=target_class, method=target_method_details)
+                                )
+                            builder.add_edge(source, target, "CALL_DEP", "1", calling_lines(builder.method_detail(source), builder.method_detail(target)))
         else:
             sdg = self.get_system_dependency_graph()
-            tsu = TreesitterJava()
-            edge_list = [
-                (
-                    (jge.source.method.signature, jge.source.klass),
-                    (jge.target.method.signature, jge.target.klass),
-                    {
-                        "type": jge.type,
-                        "weight": jge.weight,
-                        "calling_lines": (
-                            tsu.get_calling_lines(jge.source.method.code, jge.target.method.signature)
-                            if not jge.source.method.is_implicit or not jge.target.method.is_implicit
-                            else []
-                        ),
-                    },
-                )
-                for jge in sdg
-                if jge.type == "CALL_DEP"  # or jge.type == "CONTROL_DEP"
-            ]
             for jge in sdg:
-                cg.add_node(
-                    (jge.source.method.signature, jge.source.klass),
-                    method_detail=jge.source,
-                )
-                cg.add_node(
-                    (jge.target.method.signature, jge.target.klass),
-                    method_detail=jge.target,
-                )
-            cg.add_edges_from(edge_list)
-        return cg
+                source = builder.add_method(jge.source)
+                target = builder.add_method(jge.target)
+                if jge.type == "CALL_DEP":  # or jge.type == "CONTROL_DEP"
+                    builder.add_edge(
+                        source,
+                        target,
+                        jge.type,
+                        jge.weight,
+                        calling_lines(jge.source, jge.target) if not jge.source.method.is_implicit or not jge.target.method.is_implicit else [],
+                    )
+        return builder.build()
+
+    def _get_compact_call_graph(self) -> CompactCallGraph:
+        """Should return the compact call graph of the Java code, building it on first use.
+
+        At the symbol table analysis level, the call graph is built from the symbol table, without running the
+        call graph analysis of codeanalyzer.
+
+        Returns:
+            CompactCallGraph: The call graph of the Java code.
+        """
+        if self._compact_call_graph is None:
+            self._compact_call_graph = self._init_compact_call_graph(using_symbol_table=self.analysis_level == AnalysisLevel.symbol_table)
+        return self._compact_call_graph
+
+    def _init_compact_call_graph(self, using_symbol_table: bool) -> CompactCallGraph:
+        """Should return the call graph from the call graph snapshot next to analysis.json, or build it.
+
+        With snapshot_cache, a call graph is built once per analysis.json: the built call graph is saved next to it,
+        keyed on its SHA-256, the backend version and how the call graph was built, and later analyses of the same
+        analysis.json load it instead of building it again.
+
+        Args:
+            using_symbol_table (bool): Whether to use the symbol table for building the call graph.
+
+        Returns:
+            CompactCallGraph: The call graph of the Java code.
+        """
+        if not self.snapshot_cache or self.analysis_json_path is None or self.source_code is not None:
+            return self._build_compact_call_graph(using_symbol_table)
+        analysis_json_path_file = Path(self.analysis_json_path).joinpath("analysis.json")
+        snapshot_file = analysis_json_path_file.with_name(CALL_GRAPH_SNAPSHOT_FILE_NAME)
+        key = call_graph_snapshot_key(self._get_analysis_json_sha256(analysis_json_path_file), using_symbol_table, self._get_backend_version(), self.externalize_code)
+        state = load_call_graph_snapshot(snapshot_file, key)
+        if state is not None:
+            method_details = self._resolve_method_details(state["keys"], using_symbol_table)
+            if method_details is not None:
+                return CompactCallGraph.from_state(state, method_details)
+            logger.info(f"Call graph snapshot {snapshot_file} does not match the application.")
+        call_graph = self._build_compact_call_graph(using_symbol_table)
+        save_call_graph_snapshot(snapshot_file, key, call_graph.get_state())
+        return call_graph
+
+    def _resolve_method_details(self, method_keys: List[Tuple[str, str]], using_symbol_table: bool) -> List[JMethodDetail] | None:
+        """Should return the method details of the application for the methods of a call graph snapshot.
+
+        The details are looked up the way the call graph was built: in the symbol table, or in the edges of the
+        system dependency graph.
+
+        Args:
+            method_keys (List[Tuple[str, str]]): The (signature, qualified class name) of every method.
+            using_symbol_table (bool): Whether the call graph was built from the symbol table.
+
+        Returns:
+            List[JMethodDetail] | None: The method details in the order of method_keys, or None if a method is
+            not in the application.
+        """
+        method_details: Dict[Tuple[str, str], JMethodDetail] = {}
+        if using_symbol_table:
+            classes = self._get_symbol_index().all_types()
+            for method_signature, class_name in method_keys:
+                class_details = classes.get(class_name)
+                method = class_details.callable_declarations.get(method_signature) if class_details is not None else None
+                if method is None:
+                    return None
+                method_details[(method_signature, class_name)] = JMethodDetail(method_declaration=method.declaration, klass=class_name, method=method)
+        else:
+            for jge in self.get_system_dependency_graph():
+                method_details[(jge.source.method.signature, jge.source.klass)] = jge.source
+                method_details[(jge.target.method.signature, jge.target.klass)] = jge.target
+        if len(method_details) != len(method_keys):
+            return None
+        resolved = [method_details.get(method_key) for method_key in method_keys]
+        return None if any(method_detail is None for method_detail in resolved) else resolved
+
+    @staticmethod
+    def _calling_lines_finder() -> Callable[[JMethodDetail, JMethodDetail], List[int]]:
+        """Should return a function that finds the lines of a source method that call a target method.
+
+        Every source method is parsed once, and its calls are grouped by name, so that the calling lines of all the
+        edges that leave a method are looked up in the same parse.
+
+        Returns:
+            Callable[[JMethodDetail, JMethodDetail], List[int]]: A function of the source and target method details that
+            returns the calling lines within the source method.
+        """
+        tsu = TreesitterJava()
+        calls_by_method: Dict[Tuple[str, str], Dict[str, List[int]]] = {}
+
+        def calling_lines(source: JMethodDetail, target: JMethodDetail) -> List[int]:
+            calls = calls_by_method.get((source.method.signature, source.klass))
+            if calls is None:
+                calls = calls_by_method[(source.method.signature, source.klass)] = tsu.get_calling_lines_by_name(source.method.code)
+            # Constructors are called by the name of their type. Edges must not share their list of lines.
+            return list(calls.get(call_graph_signature(target.klass, target.method.signature).split("(")[0], []))
+
+        return calling_lines
 
     def get_class_hierarchy(self) -> nx.DiGraph:
         """Should return  the class hierarchy of the Java code.
 
+        Every type points to its direct subtypes, with an edge ``type`` of ``EXTENDS`` or ``IMPLEMENTS``. Nodes of
+        types declared in the application carry their JType as the ``type_declaration`` attribute. The graph is
+        cached with the symbol table index and must not be modified.
+
         Returns:
             nx.DiGraph: The class hierarchy of the Java code.
         """
+        return self._get_symbol_index().type_hierarchy().graph()
+
+    def _get_reachability(self) -> Reachability:
+        """Should return the reachability engine of the call graph, with the closures cached by earlier queries.
+
+        Returns:
+            Reachability: The reachability engine of the call graph.
+        """
+        call_graph = self._get_compact_call_graph()
+        if self._reachability is None or self._reachability.call_graph is not call_graph:
+            self._reachability = Reachability(call_graph)
+        return self._reachability
+
+    def _methods_of_mask(self, mask) -> Dict[str, Dict[str, JCallable]]:
+        """Should return the methods of a boolean mask over the method IDs of the call graph, grouped by class.
+
+        Constructors are keyed by their ``<init>(...)`` signature in the symbol table, whichever form the call graph uses.
+        """
+        call_graph = self._get_compact_call_graph()
+        symbol_index = self._get_symbol_index()
+        methods: Dict[str, Dict[str, JCallable]] = {}
+        for method_id in mask.nonzero()[0].tolist():
+            method_detail = call_graph.method_detail(method_id)
+            signature = symbol_table_signature(method_detail.klass, method_detail.method.signature)
+            callable = symbol_index.get_callable(method_detail.klass, signature) or method_detail.method
+            methods.setdefault(method_detail.klass, {})[signature] = callable
+        return methods
+
+    def _method_id(self, qualified_class_name: str, method_signature: str) -> int | None:
+        """Should return the call graph ID of a method, or None if it has no calls.
+
+        The codeanalyzer call graph names constructors after their type, e.g. ``Inventory(...)``, and the symbol
+        table names them ``<init>(...)``; a constructor is found under either form.
+        """
+        call_graph = self._get_compact_call_graph()
+        method_id = call_graph.method_id(method_signature, qualified_class_name)
+        if method_id is None:
+            method_id = call_graph.method_id(call_graph_signature(qualified_class_name, method_signature), qualified_class_name)
+        return method_id
+
+    def _method_ids(self, methods: List[Tuple[str, str]]) -> List[int]:
+        """Should return the call graph IDs of the given (qualified class name, method signature) pairs, skipping methods without calls."""
+        method_ids = (self._method_id(qualified_class_name, method_signature) for qualified_class_name, method_signature in methods)
+        return [method_id for method_id in method_ids if method_id is not None]
+
+    def get_reachable_methods(self, methods: List[Tuple[str, str]]) -> Dict[str, Dict[str, JCallable]]:
+        """Should return the methods that are reachable in the call graph from any of the given methods.
+
+        The given methods are reachable from themselves if they are in the call graph. Closures are cached per
+        method, so later queries from the same methods, or through them, do not search the call graph again.
+
+        Args:
+            methods (List[Tuple[str, str]]): The (qualified class name, method signature) pairs to start from.
+
+        Returns:
+            Dict[str, Dict[str, JCallable]]: The reachable methods, keyed by qualified class name and signature.
+        """
+        return self._methods_of_mask(self._get_reachability().reachable_from(self._method_ids(methods)))
+
+    def get_reaching_methods(self, methods: List[Tuple[str, str]]) -> Dict[str, Dict[str, JCallable]]:
+        """Should return the methods that reach any of the given methods in the call graph.
+
+        The given methods reach themselves if they are in the call graph.
+
+        Args:
+            methods (List[Tuple[str, str]]): The (qualified class name, method signature) pairs to end at.
+
+        Returns:
+            Dict[str, Dict[str, JCallable]]: The reaching methods, keyed by qualified class name and signature.
+        """
+        return self._methods_of_mask(self._get_reachability().reaching(self._method_ids(methods)))
+
+    def get_reaching_entry_point_methods(self, methods: List[Tuple[str, str]]) -> Dict[str, Dict[str, JCallable]]:
+        """Should return the entry point methods that reach any of the given methods in the call graph.
+
+        Args:
+            methods (List[Tuple[str, str]]): The (qualified class name, method signature) pairs to end at.
+
+        Returns:
+            Dict[str, Dict[str, JCallable]]: The reaching entry point methods, keyed by qualified class name and signature.
+        """
+        reaching_methods = self.get_reaching_methods(methods)
+        entry_point_methods = {
+            typename: {signature: callable for signature, callable in reaching_methods.get(typename, {}).items() if signature in entry_methods}
+            for typename, entry_methods in self.get_all_entry_point_methods().items()
+        }
+        return {typename: entry_methods for typename, entry_methods in entry_point_methods.items() if entry_methods}
+
+    def get_unreachable_methods(self) -> Dict[str, Dict[str, JCallable]]:
+        """Should return the methods of the application that no entry point method reaches in the call graph.
+
+        These are dead code candidates: methods that are only called by reflection, by the framework without being
+        marked as entry points, or through calls that the call graph does not resolve are reported too.
+
+        Returns:
+            Dict[str, Dict[str, JCallable]]: The unreachable methods, keyed by qualified class name and signature.
+        """
+        entry_point_methods = self.get_all_entry_point_methods()
+        live = self._get_reachability().reachable_from(
+            self._method_ids([(typename, signature) for typename, entry_methods in entry_point_methods.items() for signature in entry_methods])
+        )
+        unreachable_methods: Dict[str, Dict[str, JCallable]] = {}
+        for typename, methods in self.get_all_methods_in_application().items():
+            for signature, callable in methods.items():
+                if signature in entry_point_methods.get(typename, {}):
+                    continue
+                method_id = self._method_id(typename, signature)
+                if method_id is None or not live[method_id]:
+                    unreachable_methods.setdefault(typename, {})[signature] = callable
+        return unreachable_methods
 
     def get_call_graph(self) -> nx.DiGraph:
         """Should return  the call graph of the Java code.
 
+        The call graph is kept as a :class:`CompactCallGraph`; the networkx graph is converted from it on the first
+        call and shared by later calls. At the symbol table analysis level, the call graph is built from the symbol
+        table, without running the call graph analysis of codeanalyzer.
+
         Returns:
             nx.DiGraph: The call graph of the Java code.
         """
-        if self.analysis_level == "symbol_table":
-            self.call_graph = self._generate_call_graph(using_symbol_table=True)
         if self.call_graph is None:
-            self.call_graph = self._generate_call_graph(using_symbol_table=False)
+            self.call_graph = self._get_compact_call_graph().to_networkx()
         return self.call_graph
 
     def get_call_graph_json(self) -> str:
         """Get call graph in serialized json format.
 
+        Every edge carries the bodies of both of its methods. For large call graphs, prefer
+        :meth:`export_call_graph_ndjson`, which writes every method once.
+
         Returns:
             str: Call graph in json.
         """
-        callgraph_list = []
-        edges = list(self.call_graph.edges.data("calling_lines"))
-        for edge in edges:
+        call_graph = self._get_compact_call_graph()
+
+        def edge_json(edge_id: int, source: int, target: int) -> str:
+            source_method_signature, source_class = call_graph.method_key(source)
+            target_method_signature, target_class = call_graph.method_key(target)
             callgraph_dict = {}
-            callgraph_dict["source_method_signature"] = edge[0][0]
-            callgraph_dict["source_method_body"] = self.call_graph.nodes[edge[0]]["method_detail"].method.code
-            callgraph_dict["source_class"] = edge[0][1]
-            callgraph_dict["target_method_signature"] = edge[1][0]
-            callgraph_dict["target_method_body"] = self.call_graph.nodes[edge[1]]["method_detail"].method.code
-            callgraph_dict["target_class"] = edge[1][1]
-            callgraph_dict["calling_lines"] = edge[2]
-            callgraph_list.append(callgraph_dict)
-        return json.dumps(callgraph_list)
+            callgraph_dict["source_method_signature"] = source_method_signature
+            callgraph_dict["source_method_body"] = call_graph.method_detail(source).method.code
+            callgraph_dict["source_class"] = source_class
+            callgraph_dict["target_method_signature"] = target_method_signature
+            callgraph_dict["target_method_body"] = call_graph.method_detail(target).method.code
+            callgraph_dict["target_class"] = target_class
+            callgraph_dict["calling_lines"] = call_graph.calling_lines(edge_id)
+            return json.dumps(callgraph_dict)
+
+        # Serialize one edge at a time instead of holding the dictionaries of all edges; the separator is the one json.dumps puts between list items
+        return "[" + ", ".join(edge_json(*edge) for edge in call_graph.edges()) + "]"
+
+    def iter_call_graph_ndjson(self, include_code: bool = True) -> Iterator[str]:
+        """Should yield the call graph as NDJSON lines: a node record per method, then an edge record per call.
+
+        Edges refer to their methods by node ID, so every method body is written once. See
+        :mod:`cldk.analysis.java.codeanalyzer.call_graph_export` for the record layout.
+
+        Args:
+            include_code (bool): If True, node records include the method body. Defaults to True.
+
+        Returns:
+            Iterator[str]: The NDJSON lines, each ending with a newline.
+        """
+        return iter_call_graph_ndjson(self._get_compact_call_graph(), include_code=include_code)
+
+    def export_call_graph_ndjson(self, path: str | Path, include_code: bool = True) -> Path:
+        """Should write the call graph to a file as NDJSON, one record at a time.
+
+        Args:
+            path (str | Path): The file to write.
+            include_code (bool): If True, node records include the method body. Defaults to True.
+
+        Returns:
+            Path: The written file.
+        """
+        return write_call_graph_ndjson(self._get_compact_call_graph(), path, include_code=include_code)
 
     def get_all_callers(self, target_class_name: str, target_method_signature: str, using_symbol_table: bool) -> Dict:
         """Get all the caller details for a given Java method.
@@ -363,11 +1028,20 @@ class JCodeanalyzer:
         """
 
         caller_detail_dict = {}
-        call_graph = None
-        if using_symbol_table:
-            call_graph = self.__call_graph_using_symbol_table(qualified_class_name=target_class_name, method_signature=target_method_signature, is_target_method=True)
-        else:
-            call_graph = self.call_graph
+        if not using_symbol_table:
+            # The callers are a slice of the reverse adjacency of the compact call graph
+            compact_call_graph = self._get_compact_call_graph()
+            target = compact_call_graph.method_id(target_method_signature, target_class_name)
+            if target is None:
+                return caller_detail_dict
+            caller_detail_dict["caller_details"] = [
+                {"caller_method": compact_call_graph.method_detail(source), "calling_lines": compact_call_graph.calling_lines(edge)}
+                for source, edge in zip(compact_call_graph.predecessors(target).tolist(), compact_call_graph.in_edges(target).tolist())
+            ]
+            caller_detail_dict["target_method"] = compact_call_graph.method_detail(target)
+            return caller_detail_dict
+
+        call_graph = self.__call_graph_using_symbol_table(qualified_class_name=target_class_name, method_signature=target_method_signature, is_target_method=True)
         if (target_method_signature, target_class_name) not in call_graph.nodes():
             return caller_detail_dict
 
@@ -398,11 +1072,20 @@ class JCodeanalyzer:
             Dict: A dictionary containing callee details.
         """
         callee_detail_dict = {}
-        call_graph = None
-        if using_symbol_table:
-            call_graph = self.__call_graph_using_symbol_table(qualified_class_name=source_class_name, method_signature=source_method_signature)
-        else:
-            call_graph = self.call_graph
+        if not using_symbol_table:
+            # The callees are a slice of the forward adjacency of the compact call graph
+            compact_call_graph = self._get_compact_call_graph()
+            source = compact_call_graph.method_id(source_method_signature, source_class_name)
+            if source is None:
+                return callee_detail_dict
+            callee_detail_dict["callee_details"] = [
+                {"callee_method": compact_call_graph.method_detail(compact_call_graph.edge_target(edge)), "calling_lines": compact_call_graph.calling_lines(edge)}
+                for edge in compact_call_graph.out_edges(source)
+            ]
+            callee_detail_dict["source_method"] = compact_call_graph.method_detail(source)
+            return callee_detail_dict
+
+        call_graph = self.__call_graph_using_symbol_table(qualified_class_name=source_class_name, method_signature=source_method_signature)
         if (source_method_signature, source_class_name) not in call_graph.nodes():
             return callee_detail_dict
 
@@ -433,15 +1116,12 @@ class JCodeanalyzer:
     def get_all_classes(self) -> Dict[str, JType]:
         """Should return  a dictionary of all classes in the Java code.
 
+        The dictionary is cached with the symbol table index and must not be modified.
+
         Returns:
             Dict[str, JType]: A dictionary of all classes in the Java code, with qualified class names as keys.
         """
-
-        class_dict = {}
-        symtab = self.get_symbol_table()
-        for v in symtab.values():
-            class_dict.update(v.type_declarations)
-        return class_dict
+        return self._get_symbol_index().all_types()
 
     def get_class(self, qualified_class_name) -> JType:
         """Should return  a class given the qualified class name.
@@ -452,10 +1132,7 @@ class JCodeanalyzer:
         Returns:
             JType: A class for the given qualified class name.
         """
-        symtab = self.get_symbol_table()
-        for _, v in symtab.items():
-            if qualified_class_name in v.type_declarations.keys():
-                return v.type_declarations.get(qualified_class_name)
+        return self._get_symbol_index().get_type(qualified_class_name)
 
     def get_method(self, qualified_class_name, method_signature) -> JCallable:
         """Should return  a method given the qualified method name.
@@ -467,13 +1144,7 @@ class JCodeanalyzer:
         Returns:
             JCallable: A method for the given qualified method name.
         """
-        symtab = self.get_symbol_table()
-        for v in symtab.values():
-            if qualified_class_name in v.type_declarations.keys():
-                ci = v.type_declarations[qualified_class_name]
-                for cd in ci.callable_declarations.keys():
-                    if cd == method_signature:
-                        return ci.callable_declarations[cd]
+        return self._get_symbol_index().get_callable(qualified_class_name, method_signature)
 
     def get_method_parameters(self, qualified_class_name, method_signature) -> List[JCallableParameter]:
         """Should return  a dictionary of method parameters given the qualified class name and method signature.
@@ -507,10 +1178,7 @@ class JCodeanalyzer:
         Returns:
             str: Java file name containing the given qualified class.
         """
-        symtab = self.get_symbol_table()
-        for k, v in symtab.items():
-            if (qualified_class_name) in v.type_declarations.keys():
-                return k
+        return self._get_symbol_index().file_of(qualified_class_name)
 
     def get_compilation_units(self) -> List[JCompilationUnit]:
         """Get all the compilation units in the symbol table.
@@ -566,22 +1234,35 @@ class JCodeanalyzer:
         constructors = {k: v for (k, v) in ci.callable_declarations.items() if v.is_constructor is True}
         return constructors
 
-    def get_all_sub_classes(self, qualified_class_name) -> Dict[str, JType]:
+    def get_all_sub_classes(self, qualified_class_name, transitive: bool = False) -> Dict[str, JType]:
         """Should return  a dictionary of all sub-classes of the given class.
 
         Args:
             qualified_class_name (str): The qualified name of the class.
+            transitive (bool): If True, include the sub-classes of sub-classes. Defaults to False.
 
         Returns:
             Dict[str, JType]: A dictionary of all sub-classes of the given class, and class details.
         """
-
+        type_hierarchy = self._get_symbol_index().type_hierarchy()
+        sub_classes = type_hierarchy.all_subtypes(qualified_class_name) if transitive else type_hierarchy.subtypes(qualified_class_name)
         all_classes = self.get_all_classes()
-        sub_classes = {}
-        for cls in all_classes:
-            if qualified_class_name in all_classes[cls].implements_list or qualified_class_name in all_classes[cls].extends_list:
-                sub_classes[cls] = all_classes[cls]
-        return sub_classes
+        return {cls: all_classes[cls] for cls in sub_classes}
+
+    def get_all_super_classes(self, qualified_class_name, transitive: bool = False) -> List[str]:
+        """Should return  a list of all classes and interfaces the given class extends or implements.
+
+        Args:
+            qualified_class_name (str): The qualified name of the class.
+            transitive (bool): If True, include the super-classes of super-classes. Defaults to False.
+
+        Returns:
+            List[str]: The qualified names of the super-classes, including those that are not part of the application.
+        """
+        type_hierarchy = self._get_symbol_index().type_hierarchy()
+        if transitive:
+            return list(type_hierarchy.all_supertypes(qualified_class_name))
+        return list(type_hierarchy.supertypes(qualified_class_name))
 
     def get_all_fields(self, qualified_class_name) -> List[JField]:
         """Should return  a list of all fields of the given class.
@@ -649,22 +1330,24 @@ class JCodeanalyzer:
         complete as symbol table has known limitation of resolving types
         Args:
             qualified_class_name: qualified name of the class
-            method_signature: method signature of the starting point of the call graph
+            method_signature: method signature of the starting point of the call graph. If None, the call graph
+                starts from every callable the class declares.
 
         Returns: List[Tuple[JMethodDetail, JMethodDetail]]
             List of edges
         """
-        call_graph = self.__call_graph_using_symbol_table(qualified_class_name, method_signature)
+        # If the method signature is not provided, we'll get the call graph of every callable the class declares.
         if method_signature is None:
-            filter_criteria = {node for node in call_graph.nodes if node[1] == qualified_class_name}
+            class_details = self.get_class(qualified_class_name)
+            method_signatures = list(class_details.callable_declarations) if class_details is not None else []
         else:
-            filter_criteria = {node for node in call_graph.nodes if tuple(node) == (method_signature, qualified_class_name)}
+            method_signatures = [method_signature]
 
         graph_edges: List[Tuple[JMethodDetail, JMethodDetail]] = list()
-        for edge in call_graph.edges(nbunch=filter_criteria):
-            source: JMethodDetail = call_graph.nodes[edge[0]]["method_detail"]
-            target: JMethodDetail = call_graph.nodes[edge[1]]["method_detail"]
-            graph_edges.append((source, target))
+        for signature in method_signatures:
+            # Every edge of the raw call graph of a method leaves that method
+            for edge in self.__raw_call_graph_using_symbol_table(qualified_class_name=qualified_class_name, method_signature=signature):
+                graph_edges.append((edge.source, edge.target))
         return graph_edges
 
     def __call_graph_using_symbol_table(self, qualified_class_name: str, method_signature: str, is_target_method: bool = False) -> nx.DiGraph:
@@ -683,7 +1366,7 @@ class JCodeanalyzer:
             sdg = self.__raw_call_graph_using_symbol_table_target_method(target_class_name=qualified_class_name, target_method_signature=method_signature)
         else:
             sdg = self.__raw_call_graph_using_symbol_table(qualified_class_name=qualified_class_name, method_signature=method_signature)
-        tsu = TreesitterJava()
+        calling_lines = self._calling_lines_finder()
         edge_list = [
             (
                 (jge.source.method.signature, jge.source.klass),
@@ -691,7 +1374,7 @@ class JCodeanalyzer:
                 {
                     "type": jge.type,
                     "weight": jge.weight,
-                    "calling_lines": tsu.get_calling_lines(jge.source.method.code, jge.target.method.signature),
+                    "calling_lines": calling_lines(jge.source, jge.target),
                 },
             )
             for jge in sdg
@@ -721,55 +1404,27 @@ class JCodeanalyzer:
         if cg is None:
             cg = []
         target_method_details = self.get_method(qualified_class_name=target_class_name, method_signature=target_method_signature)
-        for class_name in self.get_all_classes():
-            for method in self.get_all_methods_in_class(qualified_class_name=class_name):
-                method_details = self.get_method(qualified_class_name=class_name, method_signature=method)
-                for call_site in method_details.call_sites:
-                    source_method_details = None
-                    source_class = ""
-                    callee_signature = ""
-                    if call_site.callee_signature != "":
-                        # pattern = r"\b(?:[a-zA-Z_][\w\.]*\.)+([a-zA-Z_][\w]*)\b|<[^>]*>"
-                        #
-                        # # Find the part within the parentheses
-                        # start = call_site.callee_signature.find("(") + 1
-                        # end = call_site.callee_signature.rfind(")")
-                        #
-                        # # Extract the elements inside the parentheses
-                        # elements = call_site.callee_signature[start:end].split(",")
-                        #
-                        # # Apply the regex to each element
-                        # simplified_elements = [re.sub(pattern, r"\1", element.strip()) for element in elements]
-                        #
-                        # # Reconstruct the string with simplified elements
-                        # callee_signature = f"{call_site.callee_signature[:start]}{', '.join(simplified_elements)}{call_site.callee_signature[end:]}"
-                        callee_signature = call_site.callee_signature
-
-                    if call_site.receiver_type != "":
-                        # call to any class
-                        if self.get_class(qualified_class_name=call_site.receiver_type):
-                            if callee_signature == target_method_signature and call_site.receiver_type == target_class_name:
-                                source_method_details = self.get_method(method_signature=method, qualified_class_name=class_name)
-                                source_class = class_name
-                    else:
-                        # check if any method exists with the signature in the class even if the receiver type is blank
-                        if callee_signature == target_method_signature and class_name == target_class_name:
-                            source_method_details = self.get_method(method_signature=method, qualified_class_name=class_name)
-                            source_class = class_name
-
-                    if source_class != "" and source_method_details is not None:
-                        source: JMethodDetail
-                        target: JMethodDetail
-                        type: str
-                        weight: str
-                        call_edge = JGraphEdgesST(
-                            source=JMethodDetail(method_declaration=source_method_details.declaration, klass=source_class, method=source_method_details),
-                            target=JMethodDetail(method_declaration=target_method_details.declaration, klass=target_class_name, method=target_method_details),
-                            type="CALL_DEP",
-                            weight="1",
-                        )
-                        if call_edge not in cg:
-                            cg.append(call_edge)
+        # If the provided classname and method signature combination do not exist
+        if target_method_details is None:
+            return cg
+        seen = {(edge.source.klass, edge.source.method.signature, edge.target.klass, edge.target.method.signature) for edge in cg}
+        # The call site index only looks up the calls that may dispatch to the target method
+        for source_class, method in self._get_symbol_index().call_site_index().dispatching_callers(target_class_name, target_method_signature):
+            if (source_class, method, target_class_name, target_method_signature) in seen:
+                continue
+            seen.add((source_class, method, target_class_name, target_method_signature))
+            source_method_details = self.get_method(qualified_class_name=source_class, method_signature=method)
+            source: JMethodDetail
+            target: JMethodDetail
+            type: str
+            weight: str
+            call_edge = JGraphEdgesST(
+                source=JMethodDetail(method_declaration=source_method_details.declaration, klass=source_class, method=source_method_details),
+                target=JMethodDetail(method_declaration=target_method_details.declaration, klass=target_class_name, method=target_method_details),
+                type="CALL_DEP",
+                weight="1",
+            )
+            cg.append(call_edge)
         return cg
 
     def __raw_call_graph_using_symbol_table(self, qualified_class_name: str, method_signature: str, cg=None) -> list[JGraphEdgesST]:
@@ -789,9 +1444,9 @@ class JCodeanalyzer:
         # If the provided classname and method signature combination do not exist
         if source_method_details is None:
             return cg
+        dispatch_table = self._get_symbol_index().dispatch_table()
+        seen = {(edge.source.klass, edge.source.method.signature, edge.target.klass, edge.target.method.signature) for edge in cg}
         for call_site in source_method_details.call_sites:
-            target_method_details = None
-            target_class = ""
             callee_signature = ""
             if call_site.callee_signature != "":
                 # Currently the callee signature returns the fully qualified type, whereas
@@ -811,23 +1466,15 @@ class JCodeanalyzer:
                 #
                 # # Reconstruct the string with simplified elements
                 # callee_signature = f"{call_site.callee_signature[:start]}{', '.join(simplified_elements)}{call_site.callee_signature[end:]}"
-                callee_signature = call_site.callee_signature
-
-            if call_site.receiver_type != "":
-                # call to any class
-                if self.get_class(qualified_class_name=call_site.receiver_type):
-                    tmd = self.get_method(method_signature=callee_signature, qualified_class_name=call_site.receiver_type)
-                    if tmd is not None:
-                        target_method_details = tmd
-                        target_class = call_site.receiver_type
-            else:
-                # check if any method exists with the signature in the class even if the receiver type is blank
-                tmd = self.get_method(method_signature=callee_signature, qualified_class_name=qualified_class_name)
-                if tmd is not None:
-                    target_method_details = tmd
-                    target_class = qualified_class_name
-
-            if target_class != "" and target_method_details is not None:
+                callee_signature = callee_declaration(call_site.callee_signature, call_site.is_constructor_call)
+
+            # A call without a receiver type is a call on this. Calls are resolved with class hierarchy analysis,
+            # so a call through an interface or a base class reaches every implementation it may dispatch to.
+            receiver_type = call_site.receiver_type if call_site.receiver_type != "" else qualified_class_name
+            for target_class, target_method_details in dispatch_table.targets(receiver_type, callee_signature):
+                if (qualified_class_name, method_signature, target_class, target_method_details.signature) in seen:
+                    continue
+                seen.add((qualified_class_name, method_signature, target_class, target_method_details.signature))
                 source: JMethodDetail
                 target: JMethodDetail
                 type: str
@@ -838,8 +1485,7 @@ class JCodeanalyzer:
                     type="CALL_DEP",
                     weight="1",
                 )
-                if call_edge not in cg:
-                    cg.append(call_edge)
+                cg.append(call_edge)
                 # cg = self.__raw_call_graph_using_symbol_table(qualified_class_name=target_class, method_signature=target_method_details.signature, cg=cg)
         return cg
 
@@ -856,19 +1502,23 @@ class JCodeanalyzer:
 
         Notes:
             The class name must be fully qualified, e.g., "org.example.MyClass" and not "MyClass".
+            The methods of the class are looked up in the class index of the call graph, so the cost of a
+            query is proportional to the methods and edges of the class.
         """
         # If the method name is not provided, we'll get the call graph for the entire class.
-
+        call_graph = self._get_compact_call_graph()
         if method_name is None:
-            filter_criteria = {node for node in self.call_graph.nodes if node[1] == qualified_class_name}
+            filter_criteria = call_graph.class_methods(qualified_class_name)
         else:
-            filter_criteria = {node for node in self.call_graph.nodes if tuple(node) == (method_name, qualified_class_name)}
+            method_id = call_graph.method_id(method_name, qualified_class_name)
+            filter_criteria = [] if method_id is None else [method_id]
 
         graph_edges: List[Tuple[JMethodDetail, JMethodDetail]] = list()
-        for edge in self.call_graph.edges(nbunch=filter_criteria):
-            source: JMethodDetail = self.call_graph.nodes[edge[0]]["method_detail"]
-            target: JMethodDetail = self.call_graph.nodes[edge[1]]["method_detail"]
-            graph_edges.append((source, target))
+        for method_id in filter_criteria:
+            source: JMethodDetail = call_graph.method_detail(method_id)
+            for target_id in call_graph.successors(method_id).tolist():
+                target: JMethodDetail = call_graph.method_detail(target_id)
+                graph_edges.append((source, target))
 
         return graph_edges
 
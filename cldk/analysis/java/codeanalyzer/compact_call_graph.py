@@ -0,0 +1,290 @@
+################################################################################
+# Copyright IBM Corporation 2024
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+################################################################################
+
+"""Compact call graph module
+
+Stores a call graph with integer method IDs and NumPy arrays: the callees and
+the callers of every method are slices of a forward and a reverse compressed
+sparse row (CSR) adjacency, and the edge attributes are parallel arrays. A
+``networkx.DiGraph`` with the same nodes, edges and attributes is built on
+demand.
+"""
+
+from itertools import chain
+from typing import Any, Dict, Iterator, List, Tuple
+
+import networkx as nx
+import numpy as np
+
+from cldk.models.java.models import JMethodDetail
+
+# A method of the call graph: its signature and the qualified name of its declaring type, as in the networkx call graph.
+MethodKey = Tuple[str, str]
+
+
+class CompactCallGraph:
+    """A read-only call graph over integer method IDs.
+
+    Method IDs are dense, in the order the methods were added. The edges are sorted by source and target ID; an
+    edge ID is the position of an edge in that order. Build one with :class:`CompactCallGraphBuilder`.
+
+    Args:
+        method_details (List[JMethodDetail]): The method details, indexed by method ID.
+        sources (np.ndarray): The source method ID of every edge.
+        targets (np.ndarray): The target method ID of every edge.
+        edge_types (List[str]): The ``type`` of every edge.
+        weights (List[str]): The ``weight`` of every edge.
+        calling_lines (List[List[int]]): The ``calling_lines`` of every edge.
+    """
+
+    def __init__(
+        self,
+        method_details: List[JMethodDetail],
+        sources: np.ndarray,
+        targets: np.ndarray,
+        edge_types: List[str],
+        weights: List[str],
+        calling_lines: List[List[int]],
+    ) -> None:
+        self._method_details = method_details
+        self._keys: List[MethodKey] = [(method_detail.method.signature, method_detail.klass) for method_detail in method_details]
+        self._index_methods()
+        num_methods = len(method_details)
+        order = np.lexsort((targets, sources))
+
+        # Forward adjacency: the callees of method i are indices[indptr[i]:indptr[i + 1]], and their edge IDs are that range.
+        self._indptr = np.zeros(num_methods + 1, dtype=np.int64)
+        np.cumsum(np.bincount(sources, minlength=num_methods), out=self._indptr[1:])
+        self._indices = targets[order].astype(np.int32)
+        edge_sources = sources[order].astype(np.int32)
+
+        # Reverse adjacency: the callers of method i are rindices[rindptr[i]:rindptr[i + 1]], with the edge IDs in redges.
+        self._redges = np.argsort(self._indices, kind="stable")
+        self._rindptr = np.zeros(num_methods + 1, dtype=np.int64)
+        np.cumsum(np.bincount(self._indices, minlength=num_methods), out=self._rindptr[1:])
+        self._rindices = edge_sources[self._redges]
+
+        # Edge attributes: types and weights are codes into small vocabularies, and calling lines are one flat array.
+        self._edge_type_names, self._edge_types = self._encode([edge_types[edge] for edge in order])
+        self._weight_names, self._weights = self._encode([weights[edge] for edge in order])
+        self._lines_indptr = np.zeros(len(order) + 1, dtype=np.int64)
+        np.cumsum(np.fromiter((len(calling_lines[edge]) for edge in order), dtype=np.int64, count=len(order)), out=self._lines_indptr[1:])
+        self._lines = np.fromiter(chain.from_iterable(calling_lines[edge] for edge in order), dtype=np.int32, count=int(self._lines_indptr[-1]))
+
+    # The attributes that describe a call graph apart from its method details, in the state of get_state().
+    _STATE_ATTRIBUTES = (
+        "_keys",
+        "_indptr",
+        "_indices",
+        "_rindptr",
+        "_rindices",
+        "_redges",
+        "_edge_type_names",
+        "_edge_types",
+        "_weight_names",
+        "_weights",
+        "_lines_indptr",
+        "_lines",
+    )
+
+    def get_state(self) -> Dict[str, Any]:
+        """Return the method keys and arrays of the call graph, without the method details.
+
+        The method details refer to the callables of an application; they are given back to :meth:`from_state`
+        instead of being serialized with the state.
+        """
+        return {attribute.lstrip("_"): getattr(self, attribute) for attribute in self._STATE_ATTRIBUTES}
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any], method_details: List[JMethodDetail]) -> "CompactCallGraph":
+        """Return the call graph of a state returned by :meth:`get_state`.
+
+        Args:
+            state (Dict[str, Any]): The state of the call graph.
+            method_details (List[JMethodDetail]): The method details of the methods of the state, in the order of its keys.
+
+        Returns:
+            CompactCallGraph: The call graph.
+        """
+        call_graph = cls.__new__(cls)
+        for attribute in cls._STATE_ATTRIBUTES:
+            setattr(call_graph, attribute, state[attribute.lstrip("_")])
+        call_graph._method_details = method_details
+        call_graph._index_methods()
+        return call_graph
+
+    def _index_methods(self) -> None:
+        """Index the IDs of the methods by key, and by the class that declares them."""
+        self._ids: Dict[MethodKey, int] = {}
+        self._class_methods: Dict[str, List[int]] = {}
+        for method_id, key in enumerate(self._keys):
+            self._ids[key] = method_id
+            self._class_methods.setdefault(key[1], []).append(method_id)
+
+    @staticmethod
+    def _encode(values: List[str]) -> Tuple[List[str], np.ndarray]:
+        """Return the distinct values in order of appearance, and the code of every value."""
+        names: Dict[str, int] = {}
+        codes = np.fromiter((names.setdefault(value, len(names)) for value in values), dtype=np.uint16, count=len(values))
+        return list(names), codes
+
+    def number_of_methods(self) -> int:
+        """Return the number of methods of the call graph."""
+        return len(self._method_details)
+
+    def number_of_edges(self) -> int:
+        """Return the number of edges of the call graph."""
+        return len(self._indices)
+
+    def method_id(self, method_signature: str, qualified_class_name: str) -> int | None:
+        """Return the ID of a method, or None if the method is not in the call graph."""
+        return self._ids.get((method_signature, qualified_class_name))
+
+    def class_methods(self, qualified_class_name: str) -> List[int]:
+        """Return the IDs of the methods of a class, in ascending order; the list must not be modified."""
+        return self._class_methods.get(qualified_class_name, [])
+
+    def method_key(self, method_id: int) -> MethodKey:
+        """Return the (signature, qualified class name) of a method."""
+        return self._keys[method_id]
+
+    def method_keys(self) -> List[MethodKey]:
+        """Return the (signature, qualified class name) of every method, indexed by method ID; the list must not be modified."""
+        return self._keys
+
+    def method_detail(self, method_id: int) -> JMethodDetail:
+        """Return the method detail of a method."""
+        return self._method_details[method_id]
+
+    def successors(self, method_id: int) -> np.ndarray:
+        """Return the IDs of the methods that a method calls, in ascending order."""
+        return self._indices[self._indptr[method_id] : self._indptr[method_id + 1]]
+
+    def predecessors(self, method_id: int) -> np.ndarray:
+        """Return the IDs of the methods that call a method, in ascending order."""
+        return self._rindices[self._rindptr[method_id] : self._rindptr[method_id + 1]]
+
+    def adjacency(self, reverse: bool = False) -> Tuple[np.ndarray, np.ndarray]:
+        """Return the CSR (indptr, indices) arrays of the callees, or of the callers if reverse is True; the arrays must not be modified."""
+        if reverse:
+            return self._rindptr, self._rindices
+        return self._indptr, self._indices
+
+    def out_edges(self, method_id: int) -> range:
+        """Return the IDs of the edges that leave a method."""
+        return range(self._indptr[method_id], self._indptr[method_id + 1])
+
+    def in_edges(self, method_id: int) -> np.ndarray:
+        """Return the IDs of the edges that enter a method."""
+        return self._redges[self._rindptr[method_id] : self._rindptr[method_id + 1]]
+
+    def edge_source(self, edge_id: int) -> int:
+        """Return the source method ID of an edge."""
+        return int(np.searchsorted(self._indptr, edge_id, side="right")) - 1
+
+    def edge_target(self, edge_id: int) -> int:
+        """Return the target method ID of an edge."""
+        return int(self._indices[edge_id])
+
+    def edge_type(self, edge_id: int) -> str:
+        """Return the ``type`` of an edge."""
+        return self._edge_type_names[self._edge_types[edge_id]]
+
+    def edge_weight(self, edge_id: int) -> str:
+        """Return the ``weight`` of an edge."""
+        return self._weight_names[self._weights[edge_id]]
+
+    def calling_lines(self, edge_id: int) -> List[int]:
+        """Return the ``calling_lines`` of an edge, as a new list."""
+        return self._lines[self._lines_indptr[edge_id] : self._lines_indptr[edge_id + 1]].tolist()
+
+    def edges(self) -> Iterator[Tuple[int, int, int]]:
+        """Iterate over the (edge ID, source method ID, target method ID) of every edge, in edge ID order."""
+        for source in range(len(self._method_details)):
+            for edge_id in range(self._indptr[source], self._indptr[source + 1]):
+                yield edge_id, source, int(self._indices[edge_id])
+
+    def to_networkx(self) -> nx.DiGraph:
+        """Return the call graph as a ``networkx.DiGraph``.
+
+        Nodes are (signature, qualified class name) tuples with a ``method_detail`` attribute, and edges have
+        ``type``, ``weight`` and ``calling_lines`` attributes.
+        """
+        graph = nx.DiGraph()
+        graph.add_nodes_from((key, {"method_detail": method_detail}) for key, method_detail in zip(self._keys, self._method_details))
+        graph.add_edges_from(
+            (
+                self._keys[source],
+                self._keys[target],
+                {"type": self.edge_type(edge_id), "weight": self.edge_weight(edge_id), "calling_lines": self.calling_lines(edge_id)},
+            )
+            for edge_id, source, target in self.edges()
+        )
+        return graph
+
+
+class CompactCallGraphBuilder:
+    """Collects the methods and edges of a :class:`CompactCallGraph`.
+
+    Like a ``networkx.DiGraph``, adding a method or an edge a second time replaces its details or attributes.
+    """
+
+    def __init__(self) -> None:
+        self._method_details: List[JMethodDetail] = []
+        self._ids: Dict[MethodKey, int] = {}
+        self._edges: Dict[Tuple[int, int], Tuple[str, str, List[int]]] = {}
+
+    def add_method(self, method_detail: JMethodDetail) -> int:
+        """Add a method and return its ID."""
+        key = (method_detail.method.signature, method_detail.klass)
+        method_id = self._ids.get(key)
+        if method_id is None:
+            method_id = self._ids[key] = len(self._method_details)
+            self._method_details.append(method_detail)
+        else:
+            self._method_details[method_id] = method_detail
+        return method_id
+
+    def method_id(self, method_signature: str, qualified_class_name: str) -> int | None:
+        """Return the ID of a method, or None if the method has not been added."""
+        return self._ids.get((method_signature, qualified_class_name))
+
+    def method_detail(self, method_id: int) -> JMethodDetail:
+        """Return the method detail of an added method."""
+        return self._method_details[method_id]
+
+    def has_edge(self, source: int, target: int) -> bool:
+        """Return True if an edge from source to target has been added."""
+        return (source, target) in self._edges
+
+    def add_edge(self, source: int, target: int, edge_type: str, weight: str, calling_lines: List[int]) -> None:
+        """Add an edge between two added methods."""
+        self._edges[(source, target)] = (edge_type, weight, calling_lines)
+
+    def build(self) -> CompactCallGraph:
+        """Return the call graph of the added methods and edges."""
+        num_edges = len(self._edges)
+        sources = np.fromiter((source for source, _ in self._edges), dtype=np.int64, count=num_edges)
+        targets = np.fromiter((target for _, target in self._edges), dtype=np.int64, count=num_edges)
+        attributes = list(self._edges.values())
+        return CompactCallGraph(
+            self._method_details,
+            sources,
+            targets,
+            [edge_type for edge_type, _, _ in attributes],
+            [weight for _, weight, _ in attributes],
+            [calling_lines for _, _, calling_lines in attributes],
+        )
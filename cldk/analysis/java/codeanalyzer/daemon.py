@@ -0,0 +1,277 @@
+################################################################################
+# Copyright IBM Corporation 2024
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+################################################################################
+
+"""Persistent codeanalyzer worker.
+
+Runs codeanalyzer inside one long-lived JVM (see CodeanalyzerWorker.java) and
+talks to it over stdin/stdout, so that JVM startup is paid once instead of on
+every analysis. Each request loads codeanalyzer in a fresh class loader, so no
+static state is carried from one project to the next.
+
+The worker is launched from a compiled class: the cldk-worker.jar built next
+to the codeanalyzer jar by the release build, or else a copy compiled once
+with javac into the user cache directory. Only when neither is available is it
+run from source, which needs a full JDK and compiles it on every start.
+"""
+
+import atexit
+import base64
+import hashlib
+import logging
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+from pathlib import Path
+from subprocess import CompletedProcess
+from typing import Dict, List, Tuple
+
+from cldk.utils.exceptions.exceptions import CodeanalyzerExecutionException
+
+logger = logging.getLogger(__name__)
+
+WORKER_SOURCE = Path(__file__).with_name("CodeanalyzerWorker.java")
+WORKER_CLASS = "CodeanalyzerWorker"
+WORKER_JAR = "cldk-worker.jar"
+
+_DAEMONS: Dict[Tuple[str, int], "CodeanalyzerDaemon"] = {}
+_DAEMONS_LOCK = threading.Lock()
+
+
+class CodeanalyzerDaemon:
+    """A locally spawned codeanalyzer worker process that is reused across analyses.
+
+    The worker is started lazily, health-checked before each request and restarted (once per
+    request) if it has crashed or the connection to it breaks.
+
+    Args:
+        command (List[str]): The command that starts the worker.
+    """
+
+    def __init__(self, command: List[str]) -> None:
+        self.command = command
+        self._process: subprocess.Popen | None = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_jar(cls, codeanalyzer_jar: Path | str, java: str = "java") -> "CodeanalyzerDaemon":
+        """Create a daemon that runs the given codeanalyzer jar in the bundled Java worker.
+
+        The worker is started from the cldk-worker.jar next to the codeanalyzer jar if there is one,
+        otherwise from classes compiled once with javac into the cache directory, and only as a last
+        resort from source.
+
+        Args:
+            codeanalyzer_jar (Path | str): The codeanalyzer jar.
+            java (str): The java executable. Defaults to "java" on PATH.
+
+        Returns:
+            CodeanalyzerDaemon: The (not yet started) daemon.
+        """
+        worker_classpath = _worker_classpath(Path(codeanalyzer_jar), java)
+        if worker_classpath is None:
+            logger.warning(f"No compiled codeanalyzer worker and no javac found; running {WORKER_SOURCE.name} from source, which requires a JDK.")
+            return cls([java, str(WORKER_SOURCE), str(codeanalyzer_jar)])
+        return cls([java, "-cp", str(worker_classpath), WORKER_CLASS, str(codeanalyzer_jar)])
+
+    def start(self) -> None:
+        """Start the worker if it is not running."""
+        if self._process is not None and self._process.poll() is None:
+            return
+        logger.info(f"Starting codeanalyzer worker: {' '.join(self.command)}")
+        self._process = subprocess.Popen(self.command, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        threading.Thread(target=self._drain_stderr, args=(self._process,), daemon=True).start()
+        if self._readline() != b"READY":
+            self._kill()
+            raise CodeanalyzerExecutionException("Codeanalyzer worker failed to start.")
+
+    def ping(self) -> bool:
+        """Check that the worker is alive and responsive.
+
+        Returns:
+            bool: True if the worker answered the health check.
+        """
+        with self._lock:
+            return self._ping()
+
+    def run(self, args: List[str]) -> CompletedProcess[str]:
+        """Run codeanalyzer with the given arguments in the worker.
+
+        Args:
+            args (List[str]): The codeanalyzer command line arguments (without ``java -jar <jar>``).
+
+        Returns:
+            CompletedProcess[str]: The exit code and captured stdout of the run.
+
+        Raises:
+            CodeanalyzerExecutionException: If the run fails, exits with a non-zero code, or the worker
+                cannot be (re)started.
+        """
+        with self._lock:
+            try:
+                if not self._ping():
+                    self._restart()
+                return self._run(args)
+            except (BrokenPipeError, ConnectionError, EOFError) as e:
+                logger.warning(f"Codeanalyzer worker crashed ({e}); restarting.")
+                self._restart()
+                try:
+                    return self._run(args)
+                except (BrokenPipeError, ConnectionError, EOFError) as retry_error:
+                    raise CodeanalyzerExecutionException(f"Codeanalyzer worker crashed: {retry_error}") from retry_error
+
+    def close(self) -> None:
+        """Stop the worker."""
+        with self._lock:
+            if self._process is None:
+                return
+            if self._process.poll() is None:
+                try:
+                    self._process.stdin.write(b"EXIT\n")
+                    self._process.stdin.flush()
+                    self._process.wait(timeout=10)
+                except (OSError, subprocess.TimeoutExpired):
+                    pass
+            self._kill()
+
+    def __enter__(self) -> "CodeanalyzerDaemon":
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def _run(self, args: List[str]) -> CompletedProcess[str]:
+        request = [f"RUN {len(args)}".encode()] + [base64.b64encode(arg.encode("utf-8")) for arg in args]
+        self._process.stdin.write(b"\n".join(request) + b"\n")
+        self._process.stdin.flush()
+        header = self._readline().split()
+        if not header:
+            raise EOFError("Codeanalyzer worker closed its output.")
+        if header[0] == b"ERR":
+            raise CodeanalyzerExecutionException(self._read(int(header[1])).decode("utf-8", errors="replace"))
+        returncode, payload = int(header[1]), self._read(int(header[2])).decode("utf-8")
+        if returncode != 0:
+            raise CodeanalyzerExecutionException(f"Codeanalyzer exited with code {returncode}.")
+        return CompletedProcess(args=args, returncode=returncode, stdout=payload, stderr="")
+
+    def _ping(self) -> bool:
+        if self._process is None or self._process.poll() is not None:
+            return False
+        try:
+            self._process.stdin.write(b"PING\n")
+            self._process.stdin.flush()
+            return self._readline() == b"PONG"
+        except (OSError, EOFError):
+            return False
+
+    def _restart(self) -> None:
+        self._kill()
+        self.start()
+
+    def _kill(self) -> None:
+        if self._process is not None:
+            if self._process.poll() is None:
+                self._process.kill()
+            self._process.wait()
+            for stream in (self._process.stdin, self._process.stdout):
+                stream.close()
+            self._process = None
+
+    def _readline(self) -> bytes:
+        line = self._process.stdout.readline()
+        if not line:
+            raise EOFError("Codeanalyzer worker closed its output.")
+        return line.rstrip(b"\n")
+
+    def _read(self, size: int) -> bytes:
+        payload = self._process.stdout.read(size)
+        if len(payload) != size:
+            raise EOFError("Codeanalyzer worker closed its output.")
+        return payload
+
+    @staticmethod
+    def _drain_stderr(process: subprocess.Popen) -> None:
+        for line in process.stderr:
+            logger.debug(line.decode("utf-8", errors="replace").rstrip())
+
+
+def _worker_classpath(codeanalyzer_jar: Path, java: str) -> Path | None:
+    """Return the classpath of the compiled worker, compiling it into the cache directory on first use.
+
+    Args:
+        codeanalyzer_jar (Path): The codeanalyzer jar.
+        java (str): The java executable, next to which javac is looked up first.
+
+    Returns:
+        Path | None: The worker jar or classes directory, or None if there is none and javac is not available.
+    """
+    worker_jar = codeanalyzer_jar.with_name(WORKER_JAR)
+    if worker_jar.is_file():
+        return worker_jar
+    source = WORKER_SOURCE.read_bytes()
+    cache_dir = Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "cldk" / "worker"
+    classes_dir = cache_dir / hashlib.sha256(source).hexdigest()[:16]
+    if (classes_dir / f"{WORKER_CLASS}.class").is_file():
+        return classes_dir
+    java_path = shutil.which(java)
+    javac = (java_path and shutil.which("javac", path=str(Path(java_path).resolve().parent))) or shutil.which("javac")
+    if javac is None:
+        return None
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    # Compile into a scratch directory and move it in place, so that concurrent compiles never expose a partial result
+    with tempfile.TemporaryDirectory(dir=cache_dir, ignore_cleanup_errors=True) as build_dir:
+        try:
+            subprocess.run([javac, "--release", "11", "-d", build_dir, str(WORKER_SOURCE)], check=True, capture_output=True, text=True)
+        except subprocess.CalledProcessError as e:
+            logger.warning(f"Failed to compile the codeanalyzer worker: {e.stderr}")
+            return None
+        try:
+            os.replace(build_dir, classes_dir)
+        except OSError:
+            # Another process compiled the worker in the meantime
+            pass
+    return classes_dir if (classes_dir / f"{WORKER_CLASS}.class").is_file() else None
+
+
+def get_daemon(codeanalyzer_jar: Path | str, worker: int = 0) -> CodeanalyzerDaemon:
+    """Return a shared worker for a codeanalyzer jar, creating it on first use.
+
+    A daemon serves one run at a time, so runs on the same daemon are serialized. Runs that must
+    proceed in parallel, such as the shards of a sharded analysis, use different workers.
+
+    Args:
+        codeanalyzer_jar (Path | str): The codeanalyzer jar.
+        worker (int): The number of the worker of the jar. Defaults to 0, the worker shared by all analyses.
+
+    Returns:
+        CodeanalyzerDaemon: The shared daemon for the jar and worker number.
+    """
+    with _DAEMONS_LOCK:
+        key = (str(codeanalyzer_jar), worker)
+        if key not in _DAEMONS:
+            _DAEMONS[key] = CodeanalyzerDaemon.for_jar(codeanalyzer_jar)
+        return _DAEMONS[key]
+
+
+@atexit.register
+def shutdown_daemons() -> None:
+    """Stop all shared codeanalyzer workers."""
+    with _DAEMONS_LOCK:
+        for daemon in _DAEMONS.values():
+            daemon.close()
+        _DAEMONS.clear()
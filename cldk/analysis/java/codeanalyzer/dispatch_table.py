@@ -0,0 +1,125 @@
+################################################################################
+# Copyright IBM Corporation 2024
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+################################################################################
+
+"""Dispatch table module
+
+Resolves calls of the symbol table with class hierarchy analysis (CHA): a call
+of a signature on a declared receiver type may dispatch to the implementation
+that the receiver type declares or inherits, and to every implementation of the
+signature in a subtype of the receiver type.
+"""
+
+from typing import Dict, List, Mapping, Tuple
+
+from cldk.analysis.java.codeanalyzer.type_hierarchy import TypeHierarchy
+from cldk.models.java.models import JCallable, JType
+
+# A resolved call target: the qualified name of the declaring type and the callable.
+DispatchTarget = Tuple[str, JCallable]
+
+
+class DispatchTable:
+    """Class hierarchy analysis of the calls between the types of an application.
+
+    The concrete implementations of every signature are collected in one pass over the callable
+    declarations. The targets of a (receiver type, signature) pair are computed on first request
+    and cached.
+
+    Args:
+        types (Mapping[str, JType]): The types of the application, keyed by qualified name.
+        type_hierarchy (TypeHierarchy): The type hierarchy of the same types.
+    """
+
+    def __init__(self, types: Mapping[str, JType], type_hierarchy: TypeHierarchy) -> None:
+        self._types = types
+        self._type_hierarchy = type_hierarchy
+        self._implementations: Dict[str, Dict[str, JCallable]] = {}
+        for type_name, type_declaration in types.items():
+            for signature, callable in type_declaration.callable_declarations.items():
+                if self._is_concrete(type_declaration, callable) and self._is_virtual(callable):
+                    self._implementations.setdefault(signature, {})[type_name] = callable
+        self._targets: Dict[Tuple[str, str], Tuple[DispatchTarget, ...]] = {}
+
+    @staticmethod
+    def _is_concrete(type_declaration: JType, callable: JCallable) -> bool:
+        """Return True if the callable has a body: it is not abstract, nor an interface method other than a default or static one."""
+        if "abstract" in callable.modifiers:
+            return False
+        return not type_declaration.is_interface or "default" in callable.modifiers or "static" in callable.modifiers
+
+    @staticmethod
+    def _is_virtual(callable: JCallable) -> bool:
+        """Return True if calls of the callable are dispatched on the runtime type of the receiver."""
+        return not callable.is_constructor and "static" not in callable.modifiers and "private" not in callable.modifiers
+
+    def targets(self, receiver_type: str, signature: str) -> Tuple[DispatchTarget, ...]:
+        """Return the implementations that a call of signature on receiver_type may dispatch to.
+
+        Args:
+            receiver_type (str): The qualified name of the declared type of the receiver.
+            signature (str): The signature of the called method.
+
+        Returns:
+            Tuple[DispatchTarget, ...]: The (declaring type, callable) pairs of the possible targets. The implementation
+            that receiver_type declares or inherits comes first, followed by the overriding implementations of its subtypes.
+        """
+        key = (receiver_type, signature)
+        targets = self._targets.get(key)
+        if targets is None:
+            targets = self._targets[key] = self._resolve(receiver_type, signature)
+        return targets
+
+    def _resolve(self, receiver_type: str, signature: str) -> Tuple[DispatchTarget, ...]:
+        resolved: List[DispatchTarget] = []
+        inherited = self._inherited_implementation(receiver_type, signature)
+        if inherited is not None:
+            resolved.append(inherited)
+            if not self._is_virtual(inherited[1]):
+                return tuple(resolved)
+        implementations = self._implementations.get(signature)
+        if not implementations:
+            return tuple(resolved)
+        subtypes = self._type_hierarchy.all_subtypes(receiver_type)
+        # Intersect from the smaller side: few types override a common signature, and few types derive from most receivers.
+        if len(implementations) <= len(subtypes):
+            resolved.extend((type_name, callable) for type_name, callable in implementations.items() if type_name in subtypes)
+        else:
+            resolved.extend((type_name, implementations[type_name]) for type_name in sorted(subtypes) if type_name in implementations)
+        return tuple(resolved)
+
+    def _inherited_implementation(self, receiver_type: str, signature: str) -> DispatchTarget | None:
+        """Return the implementation that the receiver type declares, or inherits from its nearest supertype."""
+        visited = set()
+        pending = [receiver_type]
+        while pending:
+            next_pending = []
+            for type_name in pending:
+                if type_name in visited:
+                    continue
+                visited.add(type_name)
+                type_declaration = self._types.get(type_name)
+                if type_declaration is not None:
+                    callable = type_declaration.callable_declarations.get(signature)
+                    # Private methods and constructors are not inherited.
+                    if (
+                        callable is not None
+                        and self._is_concrete(type_declaration, callable)
+                        and (type_name == receiver_type or ("private" not in callable.modifiers and not callable.is_constructor))
+                    ):
+                        return type_name, callable
+                next_pending.extend(self._type_hierarchy.supertypes(type_name))
+            pending = next_pending
+        return None
@@ -0,0 +1,212 @@
+################################################################################
+# Copyright IBM Corporation 2024
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+################################################################################
+
+"""Incremental re-analysis support.
+
+The content hash of every Java source file is recorded in the analysis
+manifest (see manifest.py). On the next run, only the files whose hash changed
+(or that were added) are re-analyzed with codeanalyzer, and that partial
+analysis is merged into the existing analysis.json: compilation units of changed and deleted files are
+replaced or dropped, and so are the graph edges that originate in them.
+
+Edges that start in unchanged files are kept as they are. A call graph merged
+this way is only the call graph of a full run as long as the changed files
+declare the same types and callables as before: a new override or
+implementation adds dispatch edges to unchanged callers. Use
+:func:`declarations_changed` to detect this and run a full analysis instead.
+"""
+
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Set, TextIO, Tuple
+
+from cldk.analysis.java.codeanalyzer.loader import _GRAPH_KEYS, JsonStreamReader
+from cldk.analysis.java.codeanalyzer.snapshot import file_sha256
+
+logger = logging.getLogger(__name__)
+
+
+def _real_path(file_path: str | None) -> str | None:
+    return os.path.realpath(file_path) if file_path else file_path
+
+
+def hash_source_files(project_dir: str | Path) -> Dict[str, str]:
+    """Return the SHA-256 digest of every Java source file of a project.
+
+    Args:
+        project_dir (str | Path): The root of the Java project.
+
+    Returns:
+        Dict[str, str]: The hex digests keyed by the resolved path of each file.
+    """
+    return {str(java_file): file_sha256(java_file) for java_file in sorted(Path(project_dir).resolve().rglob("*.java")) if java_file.is_file()}
+
+
+def diff_file_hashes(recorded: Dict[str, str], current: Dict[str, str]) -> Tuple[List[str], List[str]]:
+    """Compare recorded file hashes with the current ones.
+
+    Args:
+        recorded (Dict[str, str]): The hashes recorded at the last analysis.
+        current (Dict[str, str]): The hashes of the files as they are now.
+
+    Returns:
+        Tuple[List[str], List[str]]: The changed or added files, and the deleted files.
+    """
+    changed = [file_path for file_path, digest in current.items() if recorded.get(file_path) != digest]
+    deleted = [file_path for file_path in recorded if file_path not in current]
+    return changed, deleted
+
+
+def _declarations(unit: Dict[str, Any]) -> Dict[str, Any]:
+    """Return what a compilation unit declares that the targets of calls depend on: its types, their supertypes and modifiers, and their callables."""
+    return {
+        type_name: (
+            type_declaration.get("modifiers", []),
+            type_declaration.get("extends_list", []),
+            type_declaration.get("implements_list", []),
+            {signature: callable.get("modifiers", []) for signature, callable in type_declaration.get("callable_declarations", {}).items()},
+        )
+        for type_name, type_declaration in unit.get("type_declarations", {}).items()
+    }
+
+
+def declarations_changed(base_file: Path, delta_file: Path, reanalyzed_files: Iterable[str], deleted_files: Iterable[str]) -> bool:
+    """Return True if the re-analyzed and deleted files declare other types or callables than in the full analysis.
+
+    Such a change may add or remove call graph edges that start in unchanged files, e.g. for a new override, so a
+    call graph merged with :func:`merge_analysis` would differ from the one of a full run. Only the compilation
+    units of the re-analyzed and deleted files are decoded from the base analysis.
+
+    Args:
+        base_file (Path): The full analysis.json of the previous run.
+        delta_file (Path): The analysis.json of the re-analyzed files.
+        reanalyzed_files (Iterable[str]): The files that were re-analyzed.
+        deleted_files (Iterable[str]): The files that no longer exist.
+
+    Returns:
+        bool: True if the declarations of the files changed, or files that declare types were added or deleted.
+    """
+    reanalyzed = {_real_path(file_path) for file_path in reanalyzed_files}
+    stale = reanalyzed | {_real_path(file_path) for file_path in deleted_files}
+    base_declarations: Dict[str, Dict[str, Any]] = {}
+    with open(base_file, encoding="utf-8") as base:
+        reader = JsonStreamReader(base)
+        for key in reader.iter_object():
+            if key != "symbol_table":
+                reader.read_raw()
+                continue
+            for file_path in reader.iter_object():
+                if _real_path(file_path) in stale:
+                    base_declarations[_real_path(file_path)] = _declarations(reader.read_value())
+                else:
+                    reader.read_raw()
+    with open(delta_file, encoding="utf-8") as f:
+        delta_symbol_table = json.load(f).get("symbol_table") or {}
+    delta_declarations = {_real_path(file_path): _declarations(unit) for file_path, unit in delta_symbol_table.items() if _real_path(file_path) in reanalyzed}
+    # A file without type declarations is the same as a missing one
+    return {file_path: declarations for file_path, declarations in base_declarations.items() if declarations} != {
+        file_path: declarations for file_path, declarations in delta_declarations.items() if declarations
+    }
+
+
+def merge_analysis(base_file: Path, delta_file: Path, reanalyzed_files: Iterable[str], deleted_files: Iterable[str], output_file: Path) -> None:
+    """Merge a partial analysis of some files into a full analysis.
+
+    The base analysis is streamed: compilation units of unchanged files are copied over as raw JSON
+    without being decoded. From the base analysis, the compilation units of re-analyzed and deleted
+    files are dropped, together with every graph edge that starts in one of them or ends in a deleted
+    file. Edges that end in a re-analyzed file are kept if their target callable still exists. The
+    compilation units and outgoing edges of the re-analyzed files are then taken from the partial
+    analysis, except for edges into deleted files.
+
+    Args:
+        base_file (Path): The full analysis.json of the previous run.
+        delta_file (Path): The analysis.json of the re-analyzed files.
+        reanalyzed_files (Iterable[str]): The files that were re-analyzed.
+        deleted_files (Iterable[str]): The files that no longer exist.
+        output_file (Path): The file to write the merged analysis to. It may be base_file itself.
+    """
+    reanalyzed = {_real_path(file_path) for file_path in reanalyzed_files}
+    deleted = {_real_path(file_path) for file_path in deleted_files}
+    stale = reanalyzed | deleted
+
+    with open(delta_file, encoding="utf-8") as f:
+        delta: Dict[str, Any] = json.load(f)
+    delta_symbol_table = {file_path: unit for file_path, unit in (delta.get("symbol_table") or {}).items() if _real_path(file_path) in reanalyzed}
+    delta_callables: Set[Tuple[str, str]] = {
+        (type_name, signature)
+        for unit in delta_symbol_table.values()
+        for type_name, type_declaration in unit["type_declarations"].items()
+        for signature in type_declaration["callable_declarations"]
+    }
+
+    def keep_edge(edge: Dict[str, Any]) -> bool:
+        source, target = _real_path(edge["source"].get("file_path")), _real_path(edge["target"].get("file_path"))
+        if source in stale or target in deleted:
+            return False
+        # Edges name constructors after their type; callable_declaration holds the <init> key of the symbol table.
+        return target not in reanalyzed or (edge["target"]["type_declaration"], edge["target"]["callable_declaration"]) in delta_callables
+
+    def write_edges(out: TextIO, key: str, reader: JsonStreamReader) -> None:
+        if reader.peek() == "n":
+            reader.read_value()
+            out.write("null")
+            return
+        separator = ""
+        out.write("[")
+        for _ in reader.iter_array():
+            edge = reader.read_value()
+            if keep_edge(edge):
+                out.write(separator + json.dumps(edge))
+                separator = ","
+        for edge in delta.get(key) or []:
+            if _real_path(edge["source"].get("file_path")) in reanalyzed and _real_path(edge["target"].get("file_path")) not in deleted:
+                out.write(separator + json.dumps(edge))
+                separator = ","
+        out.write("]")
+
+    tmp_file = output_file.with_name(f"{output_file.name}.{os.getpid()}.tmp")
+    try:
+        with open(base_file, encoding="utf-8") as base, open(tmp_file, "w", encoding="utf-8") as out:
+            reader = JsonStreamReader(base)
+            separator = ""
+            out.write("{")
+            for key in reader.iter_object():
+                out.write(f"{separator}{json.dumps(key)}:")
+                separator = ","
+                if key == "symbol_table":
+                    unit_separator = ""
+                    out.write("{")
+                    for file_path in reader.iter_object():
+                        raw_unit = reader.read_raw()
+                        if _real_path(file_path) not in stale:
+                            out.write(f"{unit_separator}{json.dumps(file_path)}:{raw_unit}")
+                            unit_separator = ","
+                    for file_path, unit in delta_symbol_table.items():
+                        out.write(f"{unit_separator}{json.dumps(file_path)}:{json.dumps(unit)}")
+                        unit_separator = ","
+                    out.write("}")
+                elif key in _GRAPH_KEYS:
+                    write_edges(out, key, reader)
+                else:
+                    out.write(json.dumps(reader.read_value()))
+            out.write("}")
+        os.replace(tmp_file, output_file)
+    finally:
+        tmp_file.unlink(missing_ok=True)
+    logger.info(f"Merged the analysis of {len(reanalyzed)} changed and {len(deleted)} deleted files into {output_file}.")
@@ -0,0 +1,596 @@
+################################################################################
+# Copyright IBM Corporation 2024
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+################################################################################
+
+"""Streaming loader for codeanalyzer output.
+
+Parses an analysis.json document in a single pass. Each compilation unit and
+each graph edge is decoded and validated as soon as it is read, so neither the
+raw text of the whole document nor a dictionary of the whole document is ever
+held in memory. In lazy mode, compilation units are kept as their raw JSON
+records and only validated when they are first accessed, and graph edges are
+kept as their raw records until the graph is first accessed.
+
+Type names, modifiers, annotations and signatures repeat across the symbol
+table and the graph edges, so the strings of those fields are interned before
+validation and every occurrence of a value shares one string object.
+
+In trusted mode, the output of a codeanalyzer release whose major version the
+models were written for is turned into models without pydantic validation, in
+one pass that also interns the strings.
+"""
+
+import io
+import json
+import logging
+import os
+import re
+import sys
+import types
+from collections.abc import MutableMapping
+from copy import copy
+from enum import Enum
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, Iterator, List, TextIO, Tuple, Type, TypeVar, Union, get_args, get_origin
+
+from pydantic import BaseModel, PrivateAttr
+
+from cldk.models.java.models import JApplication, JCallable, JCompilationUnit, JGraphEdges, callables_scope, externalize_code_bodies, register_callables
+
+logger = logging.getLogger(__name__)
+
+M = TypeVar("M", bound=BaseModel)
+
+_WHITESPACE = " \t\n\r"
+_GRAPH_KEYS = ("call_graph", "system_dependency_graph")
+
+# Fields whose (list of) string values are interned.
+_INTERNED_FIELDS = frozenset(
+    {
+        "accessed_fields",
+        "annotations",
+        "argument_types",
+        "callable_declaration",
+        "callee_signature",
+        "destination_kind",
+        "extends_list",
+        "file_path",
+        "implements_list",
+        "imports",
+        "method_name",
+        "modifiers",
+        "name",
+        "nested_type_declarations",
+        "package_name",
+        "parent_type",
+        "receiver_type",
+        "referenced_types",
+        "return_type",
+        "signature",
+        "source_kind",
+        "thrown_exceptions",
+        "type",
+        "type_declaration",
+        "weight",
+    }
+)
+# Dictionaries keyed by type names or signatures, whose keys are interned.
+_INTERNED_KEYS_FIELDS = frozenset({"type_declarations", "callable_declarations"})
+
+# The codeanalyzer major version whose output the Java models describe.
+TRUSTED_BACKEND_MAJOR_VERSION = 2
+
+_VERSION_TAIL_SIZE = 4096
+_VERSION_PATTERN = re.compile(r'"version"\s*:\s*"([^"]*)"\s*}\s*$')
+
+_object_setattr = object.__setattr__
+
+
+def intern_strings(value: Any) -> Any:
+    """Intern the repeated strings of a decoded analysis.json record in place.
+
+    The string values of the fields in ``_INTERNED_FIELDS`` and the keys of the type and
+    callable declaration dictionaries are replaced by their ``sys.intern`` counterpart.
+    Code, declarations, comments and expressions are left alone.
+
+    Args:
+        value (Any): A decoded JSON value, such as a compilation unit or a graph edge.
+
+    Returns:
+        Any: The same value.
+    """
+    pending = [value]
+    while pending:
+        current = pending.pop()
+        if isinstance(current, list):
+            pending.extend(item for item in current if isinstance(item, (dict, list)))
+            continue
+        if not isinstance(current, dict):
+            continue
+        for key, item in current.items():
+            if isinstance(item, str):
+                if key in _INTERNED_FIELDS:
+                    current[key] = sys.intern(item)
+            elif isinstance(item, list):
+                if key in _INTERNED_FIELDS:
+                    item[:] = [sys.intern(element) if isinstance(element, str) else element for element in item]
+                pending.append(item)
+            elif isinstance(item, dict):
+                if key in _INTERNED_KEYS_FIELDS:
+                    item = current[key] = {sys.intern(name): declaration for name, declaration in item.items()}
+                pending.append(item)
+    return value
+
+
+def read_backend_version(source: Union[str, TextIO]) -> str | None:
+    """Read the codeanalyzer version recorded at the end of an analysis JSON document.
+
+    The version is read from the tail of the document without consuming the stream.
+
+    Args:
+        source (str | TextIO): The analysis JSON text, or a text stream over a file.
+
+    Returns:
+        str | None: The version, or None if it cannot be read.
+    """
+    if isinstance(source, str):
+        tail = source[-_VERSION_TAIL_SIZE:]
+    else:
+        try:
+            fileno = source.fileno()
+            size = os.fstat(fileno).st_size
+            tail = os.pread(fileno, _VERSION_TAIL_SIZE, max(0, size - _VERSION_TAIL_SIZE)).decode("utf-8", errors="ignore")
+        except (AttributeError, OSError, io.UnsupportedOperation):
+            return None
+    match = _VERSION_PATTERN.search(tail)
+    return match.group(1) if match else None
+
+
+def is_trusted_backend_version(version: str | None) -> bool:
+    """Check whether the output of a codeanalyzer version can be constructed without validation.
+
+    Args:
+        version (str | None): The codeanalyzer version.
+
+    Returns:
+        bool: True if the major version is TRUSTED_BACKEND_MAJOR_VERSION.
+    """
+    major = (version or "").split(".", 1)[0]
+    return major.isdigit() and int(major) == TRUSTED_BACKEND_MAJOR_VERSION
+
+
+def _builder(annotation: Any, interned: bool = False, interned_keys: bool = False) -> Callable[[Any], Any] | None:
+    """Return the function that builds a field value of the given annotation, or None if the decoded value is kept as is."""
+    origin = get_origin(annotation)
+    if origin in (Union, types.UnionType):
+        arguments = [argument for argument in get_args(annotation) if argument is not type(None)]
+        inner = _builder(arguments[0], interned, interned_keys) if len(arguments) == 1 else None
+        return None if inner is None else (lambda value: None if value is None else inner(value))
+    if origin is list:
+        inner = _builder(get_args(annotation)[0], interned)
+        return None if inner is None else (lambda value: list(map(inner, value)))
+    if origin is dict:
+        inner = _builder(get_args(annotation)[1])
+        if interned_keys:
+            if inner is None:
+                return lambda value: dict(zip(map(sys.intern, value), value.values()))
+            return lambda value: dict(zip(map(sys.intern, value), map(inner, value.values())))
+        return None if inner is None else (lambda value: {key: inner(item) for key, item in value.items()})
+    if annotation is str:
+        return sys.intern if interned else None
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return lambda value: value if isinstance(value, annotation) else construct_model(annotation, value)
+    if isinstance(annotation, type) and issubclass(annotation, Enum):
+        return annotation
+    return None
+
+
+@lru_cache(maxsize=None)
+def _construction_plan(model: Type[BaseModel]) -> Tuple[Tuple[str, ...], Tuple[Tuple[str, Callable[[Any], Any]], ...], Tuple[Tuple[str, Any], ...]]:
+    """Return the field names, the builders of the fields that need one, and the field defaults of a model."""
+    builders = ((name, _builder(field.annotation, name in _INTERNED_FIELDS, name in _INTERNED_KEYS_FIELDS)) for name, field in model.model_fields.items())
+    defaults = tuple((name, field.default) for name, field in model.model_fields.items() if not field.is_required())
+    return tuple(model.model_fields), tuple((name, builder) for name, builder in builders if builder is not None), defaults
+
+
+def construct_model(model: Type[M], data: Dict[str, Any]) -> M:
+    """Build a model and its nested models from a trusted, decoded record without validation.
+
+    This is ``model_construct`` applied recursively along the field annotations (nested models,
+    lists and dictionaries of models, and enums), and it interns the same strings as
+    :func:`intern_strings` on the way. Every other value is taken as decoded.
+
+    Args:
+        model (Type[M]): The model class.
+        data (Dict[str, Any]): The decoded JSON record.
+
+    Returns:
+        M: The model. Keys of the record that are not fields of the model are dropped.
+    """
+    names, builders, defaults = _construction_plan(model)
+    values = {name: data[name] for name in names if name in data}
+    fields_set = set(values)
+    for name, builder in builders:
+        if name in values:
+            values[name] = builder(values[name])
+    for name, default in defaults:
+        if name not in values:
+            # Mutable defaults are copied, as pydantic does.
+            values[name] = copy(default) if isinstance(default, (list, dict)) else default
+    instance = model.__new__(model)
+    _object_setattr(instance, "__dict__", values)
+    _object_setattr(instance, "__pydantic_fields_set__", fields_set)
+    _object_setattr(instance, "__pydantic_extra__", None)
+    _object_setattr(instance, "__pydantic_private__", None)
+    return instance
+
+
+def _build_compilation_unit(record: Dict[str, Any], file_path: str, trusted: bool, externalize_code: bool) -> JCompilationUnit:
+    """Build a compilation unit from its decoded record."""
+    if trusted:
+        compilation_unit = construct_model(JCompilationUnit, record)
+    else:
+        compilation_unit = JCompilationUnit.model_validate(intern_strings(record))
+    if externalize_code:
+        externalize_code_bodies(compilation_unit, file_path)
+    return compilation_unit
+
+
+class JsonStreamReader:
+    """A pull-based reader over a JSON document.
+
+    Only the containers the caller walks with :meth:`iter_object` and :meth:`iter_array`
+    are parsed incrementally; every other value is decoded in one piece with
+    :meth:`read_value`.
+
+    Args:
+        source (str | TextIO): The JSON text, or a text stream to read it from.
+        chunk_size (int): The number of characters to read from the stream at a time.
+    """
+
+    def __init__(self, source: Union[str, TextIO], chunk_size: int = 1 << 20) -> None:
+        self._decoder = json.JSONDecoder()
+        self._chunk_size = chunk_size
+        if isinstance(source, str):
+            self._stream = None
+            self._buffer = source
+        else:
+            self._stream = source
+            self._buffer = ""
+        self._pos = 0
+
+    def _fill(self, min_size: int = 0) -> bool:
+        """Read more text from the stream, dropping what has already been consumed.
+
+        Returns:
+            bool: False when the stream is exhausted.
+        """
+        if self._stream is None:
+            return False
+        chunk = self._stream.read(max(self._chunk_size, min_size))
+        if not chunk:
+            return False
+        self._buffer = self._buffer[self._pos :] + chunk
+        self._pos = 0
+        return True
+
+    def _skip_whitespace(self) -> None:
+        while True:
+            while self._pos < len(self._buffer) and self._buffer[self._pos] in _WHITESPACE:
+                self._pos += 1
+            if self._pos < len(self._buffer) or not self._fill():
+                return
+
+    def peek(self) -> str:
+        """Return the next significant character without consuming it ('' at the end of input)."""
+        self._skip_whitespace()
+        return self._buffer[self._pos] if self._pos < len(self._buffer) else ""
+
+    def _expect(self, char: str) -> None:
+        if self.peek() != char:
+            raise json.JSONDecodeError(f"Expecting '{char}'", self._buffer, self._pos)
+        self._pos += 1
+
+    def _decode_next(self) -> Any:
+        """Decode the next complete JSON value, leaving the position at its first character."""
+        self._skip_whitespace()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                # The value straddles the end of the buffer. Grow the read geometrically so that
+                # large values are not re-scanned once per chunk.
+                if not self._fill(min_size=len(self._buffer) - self._pos):
+                    raise
+                continue
+            # A number that ends exactly at the end of the buffer may have been cut short.
+            if end == len(self._buffer) and isinstance(value, (int, float)) and self._fill():
+                continue
+            return value, end
+
+    def read_value(self) -> Any:
+        """Decode the next complete JSON value."""
+        value, self._pos = self._decode_next()
+        return value
+
+    def read_raw(self) -> str:
+        """Return the text of the next complete JSON value, discarding its decoded form."""
+        return self.read_value_and_raw()[1]
+
+    def read_value_and_raw(self) -> Tuple[Any, str]:
+        """Decode the next complete JSON value, and return it together with its text."""
+        value, end = self._decode_next()
+        raw, self._pos = self._buffer[self._pos : end], end
+        return value, raw
+
+    def iter_object(self) -> Iterator[str]:
+        """Iterate over the keys of the next JSON object.
+
+        The caller must consume the value of each key (with :meth:`read_value`, or by walking it
+        with :meth:`iter_object`/:meth:`iter_array`) before advancing the iterator.
+        """
+        self._expect("{")
+        if self.peek() == "}":
+            self._pos += 1
+            return
+        while True:
+            key = self.read_value()
+            self._expect(":")
+            yield key
+            if self.peek() == ",":
+                self._pos += 1
+                continue
+            self._expect("}")
+            return
+
+    def iter_array(self) -> Iterator[int]:
+        """Iterate over the indices of the next JSON array.
+
+        The caller must consume each element before advancing the iterator.
+        """
+        self._expect("[")
+        if self.peek() == "]":
+            self._pos += 1
+            return
+        index = 0
+        while True:
+            yield index
+            index += 1
+            if self.peek() == ",":
+                self._pos += 1
+                continue
+            self._expect("]")
+            return
+
+
+class LazySymbolTable(MutableMapping):
+    """A symbol table that validates compilation units on first access.
+
+    Each compilation unit is kept as its raw JSON record until it is looked up, at which point
+    it is validated into a :class:`JCompilationUnit` (and its callables are registered for
+    graph edge resolution). Iterating over keys or locating the file that declares a type
+    does not validate anything.
+
+    Args:
+        callables (Dict[Tuple[str, str], JCallable]): The callable registry of the application.
+        trusted (bool): If True, compilation units are built with :func:`construct_model` instead of
+            being validated.
+        externalize_code (bool): If True, the code of callables and initialization blocks is dropped
+            and read from the source files on access.
+    """
+
+    def __init__(self, callables: Dict[Tuple[str, str], JCallable], trusted: bool = False, externalize_code: bool = False) -> None:
+        self._callables = callables
+        self._trusted = trusted
+        self._externalize_code = externalize_code
+        self._entries: Dict[str, Union[str, JCompilationUnit]] = {}
+        self._type_index: Dict[str, str] = {}
+
+    def add_raw(self, file_path: str, raw: str, type_names: Iterable[str]) -> None:
+        """Add the raw JSON record of a compilation unit.
+
+        Args:
+            file_path (str): The path of the source file.
+            raw (str): The JSON text of the compilation unit.
+            type_names (Iterable[str]): The qualified names of the types the compilation unit declares, as
+                decoded by the reader, so that the record is not parsed again to index them.
+        """
+        self._entries[file_path] = raw
+        for type_name in type_names:
+            self._type_index[type_name] = file_path
+
+    def is_materialized(self, file_path: str) -> bool:
+        """Return True if the compilation unit for the given file has already been validated."""
+        return isinstance(self._entries.get(file_path), JCompilationUnit)
+
+    def file_of(self, qualified_class_name: str) -> str | None:
+        """Return the path of the file that declares the given type, without validating it."""
+        return self._type_index.get(qualified_class_name)
+
+    def __getitem__(self, file_path: str) -> JCompilationUnit:
+        entry = self._entries[file_path]
+        if isinstance(entry, str):
+            entry = _build_compilation_unit(json.loads(entry), file_path, self._trusted, self._externalize_code)
+            register_callables(entry, self._callables)
+            self._entries[file_path] = entry
+        return entry
+
+    def __setitem__(self, file_path: str, compilation_unit: JCompilationUnit) -> None:
+        if file_path in self._entries:
+            del self[file_path]
+        self._entries[file_path] = compilation_unit
+        register_callables(compilation_unit, self._callables)
+        for type_name in compilation_unit.type_declarations:
+            self._type_index[type_name] = file_path
+
+    def __delitem__(self, file_path: str) -> None:
+        del self._entries[file_path]
+        self._type_index = {type_name: path for type_name, path in self._type_index.items() if path != file_path}
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._entries)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, file_path: object) -> bool:
+        return file_path in self._entries
+
+
+def _validate_edge(application: JApplication, raw_edge: Dict[str, Any], trusted: bool) -> JGraphEdges:
+    if isinstance(application.symbol_table, LazySymbolTable):
+        # Validating the endpoints' compilation units registers their callables
+        for endpoint in ("source", "target"):
+            application.symbol_table.get(raw_edge[endpoint].get("file_path"))
+    with callables_scope(application.callables):
+        if trusted:
+            endpoints = {endpoint: JGraphEdges.validate_source(raw_edge[endpoint]) for endpoint in ("source", "target")}
+            return construct_model(JGraphEdges, {**raw_edge, **endpoints})
+        return JGraphEdges.model_validate(raw_edge)
+
+
+class LazyJApplication(JApplication):
+    """A JApplication with a :class:`LazySymbolTable` that validates its graph edges on first access.
+
+    The edges of call_graph and system_dependency_graph are kept as their raw JSON records until the
+    graph is first read (or the application is dumped), at which point they are validated, along with
+    the compilation units of their endpoints.
+    """
+
+    _pending_graphs: Dict[str, List[Dict[str, Any]]] = PrivateAttr(default_factory=dict)
+    _trusted: bool = PrivateAttr(default=False)
+
+    def defer_graph(self, key: str, raw_edges: List[Dict[str, Any]], trusted: bool) -> None:
+        """Keep the raw edges of a graph until the graph is first accessed.
+
+        Args:
+            key (str): The graph, "call_graph" or "system_dependency_graph".
+            raw_edges (List[Dict[str, Any]]): The raw JSON records of the edges.
+            trusted (bool): If True, the edges are built with :func:`construct_model` instead of being validated.
+        """
+        self.__dict__.pop(key, None)
+        self._pending_graphs[key] = raw_edges
+        self._trusted = trusted
+
+    def num_edges(self, key: str) -> int | None:
+        """Return the number of edges of the given graph without validating them, or None if it has none."""
+        if key in self._pending_graphs:
+            return len(self._pending_graphs[key])
+        graph_edges = self.__dict__.get(key)
+        return None if graph_edges is None else len(graph_edges)
+
+    def validate_graphs(self) -> None:
+        """Validate the edges of every graph that has not been accessed yet."""
+        for key in list(self._pending_graphs):
+            getattr(self, key)
+
+    def model_dump(self, **kwargs) -> Dict[str, Any]:
+        self.validate_graphs()
+        return super().model_dump(**kwargs)
+
+    def model_dump_json(self, **kwargs) -> str:
+        self.validate_graphs()
+        return super().model_dump_json(**kwargs)
+
+    def __getattr__(self, name: str) -> Any:
+        # Only reached for a graph while it is pending, since validated graphs are stored as regular fields
+        if name in _GRAPH_KEYS and name in self._pending_graphs:
+            graph_edges = [_validate_edge(self, raw_edge, self._trusted) for raw_edge in self._pending_graphs[name]]
+            self.__dict__[name] = graph_edges
+            del self._pending_graphs[name]
+            return graph_edges
+        return super().__getattr__(name)
+
+
+def load_japplication(
+    source: Union[str, TextIO],
+    chunk_size: int = 1 << 20,
+    lazy: bool = False,
+    trusted: bool = False,
+    externalize_code: bool = False,
+) -> JApplication:
+    """Build a JApplication from codeanalyzer output in a single streaming pass.
+
+    Args:
+        source (str | TextIO): The analysis JSON text, or a text stream (e.g., an open analysis.json).
+        chunk_size (int): The number of characters to read from the stream at a time.
+        lazy (bool): If True, the application is a :class:`LazyJApplication`: its symbol table is a
+            :class:`LazySymbolTable` that validates each compilation unit only when it is first accessed,
+            and its graph edges are validated when the graph is first accessed.
+        trusted (bool): If True and the document was written by a codeanalyzer release of
+            TRUSTED_BACKEND_MAJOR_VERSION, compilation units and graph edges are built with
+            :func:`construct_model` instead of being validated. Documents of other (or unknown)
+            versions are validated.
+        externalize_code (bool): If True, the code of callables and initialization blocks is not
+            kept in memory. Only their line spans are, and ``code`` is read from the (memory-mapped)
+            source file when it is accessed. The source files must remain where they were analyzed.
+
+    Returns:
+        JApplication: The application view of the Java code with the analysis results.
+
+    Notes:
+        Graph edges are resolved against the callables of the symbol table. codeanalyzer writes
+        the call graph before the symbol table, so edges read ahead of the symbol table are kept
+        as their raw (four-string) endpoint records until the symbol table has been validated.
+        In lazy mode, loading validates neither edges nor compilation units; resolving an edge on
+        first access to its graph validates the compilation units of its two endpoints.
+    """
+    if trusted:
+        version = read_backend_version(source)
+        if not is_trusted_backend_version(version):
+            logger.warning(f"Validating the output of codeanalyzer {version or '(unknown version)'}; trusted construction requires version {TRUSTED_BACKEND_MAJOR_VERSION}.x.")
+            trusted = False
+    reader = JsonStreamReader(source, chunk_size=chunk_size)
+    application: JApplication | None = None
+    pending_edges: Dict[str, List[Dict[str, Any]]] = {}
+    edges: Dict[str, List[JGraphEdges] | None] = {}
+
+    for key in reader.iter_object():
+        if key == "symbol_table":
+            if lazy:
+                application = LazyJApplication.model_construct(symbol_table={}, call_graph=None, system_dependency_graph=None)
+                lazy_symbol_table = LazySymbolTable(application.callables, trusted=trusted, externalize_code=externalize_code)
+                for file_path in reader.iter_object():
+                    record, raw = reader.read_value_and_raw()
+                    lazy_symbol_table.add_raw(sys.intern(file_path), raw, record.get("type_declarations", {}))
+                application.symbol_table = lazy_symbol_table
+            else:
+                symbol_table: Dict[str, JCompilationUnit] = {}
+                for file_path in reader.iter_object():
+                    file_path = sys.intern(file_path)
+                    symbol_table[file_path] = _build_compilation_unit(reader.read_value(), file_path, trusted, externalize_code)
+                application = JApplication(symbol_table=symbol_table)
+        elif key in _GRAPH_KEYS:
+            if reader.peek() == "n":
+                reader.read_value()
+                edges[key] = None
+                continue
+            if application is None or isinstance(application, LazyJApplication):
+                pending_edges[key] = [intern_strings(reader.read_value()) for _ in reader.iter_array()]
+            else:
+                edges[key] = [_validate_edge(application, intern_strings(reader.read_value()), trusted) for _ in reader.iter_array()]
+        else:
+            reader.read_value()
+
+    if application is None:
+        application = JApplication(symbol_table={})
+    for key, raw_edges in pending_edges.items():
+        if isinstance(application, LazyJApplication):
+            application.defer_graph(key, raw_edges, trusted)
+        else:
+            edges[key] = [_validate_edge(application, raw_edge, trusted) for raw_edge in raw_edges]
+    for key, graph_edges in edges.items():
+        setattr(application, key, graph_edges)
+    return application
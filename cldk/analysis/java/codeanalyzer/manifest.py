@@ -0,0 +1,144 @@
+################################################################################
+# Copyright IBM Corporation 2024
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+################################################################################
+
+"""Sidecar manifest of an analysis.json.
+
+The manifest is a small JSON document written next to analysis.json whenever
+cldk (re)generates it. It records what the analysis contains and which
+analysis.json it describes (by size and modification time), so that checking
+whether an existing analysis can be reused does not require parsing it.
+"""
+
+import logging
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict
+
+from pydantic import BaseModel, ValidationError
+
+from cldk.analysis.java.codeanalyzer.loader import LazyJApplication
+from cldk.models.java.models import JApplication
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILE_NAME = "analysis.manifest.json"
+
+# Bump this whenever the manifest fields change incompatibly.
+MANIFEST_FORMAT_VERSION = 1
+
+
+class AnalysisManifest(BaseModel):
+    """Represents the manifest of an analysis.json.
+
+    Attributes:
+        format_version (int): The version of the manifest format.
+        analysis_level (int): The codeanalyzer analysis level (1 for symbol table, 2 for call graph).
+        backend_version (str): The codeanalyzer backend version that produced the analysis.
+        analysis_json_size (int): The size of analysis.json in bytes.
+        analysis_json_mtime_ns (int): The modification time of analysis.json in nanoseconds.
+        num_compilation_units (int): The number of compilation units in the symbol table.
+        num_call_graph_edges (int): The number of call graph edges.
+        file_hashes (Dict[str, str] | None): The SHA-256 of every source file at the time of the analysis,
+            keyed by resolved path. Only recorded for incremental analyses.
+        created_at (datetime): When the analysis was first generated.
+        updated_at (datetime): When the analysis was last generated or incrementally updated.
+    """
+
+    format_version: int = MANIFEST_FORMAT_VERSION
+    analysis_level: int
+    backend_version: str
+    analysis_json_size: int
+    analysis_json_mtime_ns: int
+    num_compilation_units: int
+    num_call_graph_edges: int
+    file_hashes: Dict[str, str] | None = None
+    created_at: datetime
+    updated_at: datetime
+
+    def describes(self, analysis_json_file: Path) -> bool:
+        """Check that the manifest was written for the current contents of an analysis.json.
+
+        Args:
+            analysis_json_file (Path): The analysis.json file.
+
+        Returns:
+            bool: True if the file exists and its size and modification time match the manifest.
+        """
+        try:
+            stat = analysis_json_file.stat()
+        except OSError:
+            return False
+        return self.format_version == MANIFEST_FORMAT_VERSION and stat.st_size == self.analysis_json_size and stat.st_mtime_ns == self.analysis_json_mtime_ns
+
+
+def load_manifest(manifest_file: Path) -> AnalysisManifest | None:
+    """Load a manifest.
+
+    Args:
+        manifest_file (Path): The manifest file.
+
+    Returns:
+        AnalysisManifest | None: The manifest, or None if it is missing or unreadable.
+    """
+    try:
+        return AnalysisManifest.model_validate_json(manifest_file.read_bytes())
+    except FileNotFoundError:
+        return None
+    except (OSError, ValidationError) as e:
+        logger.warning(f"Unable to read manifest {manifest_file}: {e}")
+        return None
+
+
+def write_manifest(
+    analysis_json_file: Path,
+    backend_version: str,
+    application: JApplication,
+    file_hashes: Dict[str, str] | None = None,
+    previous: AnalysisManifest | None = None,
+) -> AnalysisManifest:
+    """Write the manifest of an analysis.json next to it.
+
+    Args:
+        analysis_json_file (Path): The analysis.json file.
+        backend_version (str): The codeanalyzer backend version.
+        application (JApplication): The application loaded from analysis.json.
+        file_hashes (Dict[str, str] | None): The source file hashes, for incremental analyses.
+        previous (AnalysisManifest | None): The manifest this one replaces after an incremental update.
+
+    Returns:
+        AnalysisManifest: The written manifest. Its analysis level reflects what analysis.json actually
+        contains: 2 if it has a call graph, otherwise 1.
+    """
+    stat = analysis_json_file.stat()
+    now = datetime.now(timezone.utc)
+    # The edges of a lazily loaded application are counted without validating them
+    if isinstance(application, LazyJApplication):
+        num_call_graph_edges = application.num_edges("call_graph")
+    else:
+        num_call_graph_edges = None if application.call_graph is None else len(application.call_graph)
+    manifest = AnalysisManifest(
+        analysis_level=2 if num_call_graph_edges is not None else 1,
+        backend_version=backend_version,
+        analysis_json_size=stat.st_size,
+        analysis_json_mtime_ns=stat.st_mtime_ns,
+        num_compilation_units=len(application.symbol_table),
+        num_call_graph_edges=num_call_graph_edges or 0,
+        file_hashes=file_hashes,
+        created_at=previous.created_at if previous is not None else now,
+        updated_at=now,
+    )
+    analysis_json_file.with_name(MANIFEST_FILE_NAME).write_text(manifest.model_dump_json(indent=2), encoding="utf-8")
+    return manifest
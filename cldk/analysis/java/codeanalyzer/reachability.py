@@ -0,0 +1,112 @@
+################################################################################
+# Copyright IBM Corporation 2024
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+################################################################################
+
+"""Reachability module
+
+Computes the methods reachable from, and reaching, sets of methods of a
+:class:`CompactCallGraph`. Every closure is a bitset over method IDs, found by
+a breadth-first search over the CSR adjacency that expands a whole frontier
+with array operations. The closure of every single method is cached, and a
+search stops at methods whose closure is already known.
+"""
+
+from typing import Dict, Iterable, List
+
+import numpy as np
+
+from cldk.analysis.java.codeanalyzer.compact_call_graph import CompactCallGraph
+
+
+class Reachability:
+    """Forward and backward transitive closures over a call graph.
+
+    A method is reachable from, and reaches, itself. Multi-source queries are the union of the closures of
+    their sources; a source that is already in the union adds nothing, and is skipped.
+
+    Args:
+        call_graph (CompactCallGraph): The call graph to search.
+    """
+
+    def __init__(self, call_graph: CompactCallGraph) -> None:
+        self.call_graph = call_graph
+        self._num_methods = call_graph.number_of_methods()
+        # The closures of single methods, packed eight methods per byte, for forward (False) and backward (True) searches.
+        self._closures: Dict[bool, Dict[int, np.ndarray]] = {False: {}, True: {}}
+        self._is_cached: Dict[bool, np.ndarray] = {False: np.zeros(self._num_methods, dtype=bool), True: np.zeros(self._num_methods, dtype=bool)}
+
+    def reachable_from(self, method_ids: Iterable[int]) -> np.ndarray:
+        """Return the methods reachable from any of the given methods.
+
+        Args:
+            method_ids (Iterable[int]): The IDs of the methods to start from.
+
+        Returns:
+            np.ndarray: A boolean mask over method IDs.
+        """
+        return self._union(method_ids, reverse=False)
+
+    def reaching(self, method_ids: Iterable[int]) -> np.ndarray:
+        """Return the methods that reach any of the given methods.
+
+        Args:
+            method_ids (Iterable[int]): The IDs of the methods to end at.
+
+        Returns:
+            np.ndarray: A boolean mask over method IDs.
+        """
+        return self._union(method_ids, reverse=True)
+
+    def _union(self, method_ids: Iterable[int], reverse: bool) -> np.ndarray:
+        reached = np.zeros(self._num_methods, dtype=bool)
+        packed = np.packbits(reached, bitorder="little")
+        for method_id in dict.fromkeys(method_ids):
+            # The closure of a method that is already reached is part of the union
+            if reached[method_id]:
+                continue
+            packed |= self._closure(method_id, reverse)
+            reached = np.unpackbits(packed, count=self._num_methods, bitorder="little").view(bool)
+        return reached
+
+    def _closure(self, method_id: int, reverse: bool) -> np.ndarray:
+        """Return the packed closure of a method, searching the call graph if it is not cached."""
+        closures = self._closures[reverse]
+        closure = closures.get(method_id)
+        if closure is not None:
+            return closure
+        indptr, indices = self.call_graph.adjacency(reverse)
+        is_cached = self._is_cached[reverse]
+        reached = np.zeros(self._num_methods, dtype=bool)
+        reached[method_id] = True
+        frontier = np.array([method_id], dtype=np.int64)
+        known: List[int] = []
+        while frontier.size:
+            starts = indptr[frontier]
+            counts = indptr[frontier + 1] - starts
+            # The positions of the neighbors of all frontier methods in indices, slice after slice
+            positions = np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+            neighbors = np.unique(indices[positions])
+            neighbors = neighbors[~reached[neighbors]]
+            reached[neighbors] = True
+            # Methods with a known closure contribute it as a whole instead of being searched again
+            cached = is_cached[neighbors]
+            known.extend(neighbors[cached].tolist())
+            frontier = neighbors[~cached]
+        closure = np.packbits(reached, bitorder="little")
+        for known_id in known:
+            closure |= closures[known_id]
+        closures[method_id] = closure
+        is_cached[method_id] = True
+        return closure
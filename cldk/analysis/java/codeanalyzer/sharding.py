@@ -0,0 +1,225 @@
+################################################################################
+# Copyright IBM Corporation 2024
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+################################################################################
+
+"""Module sharding for multi-module Maven and Gradle builds.
+
+Each module of a multi-module build is analyzed by its own codeanalyzer
+process, and the per-module analyses (shards) are merged into one. Since the
+call graph of a shard cannot resolve calls into the sources of another shard,
+the merge adds those cross-shard call edges from the call sites recorded in the
+symbol table, resolved with class hierarchy analysis across all shards.
+"""
+
+import json
+import logging
+import os
+import shutil
+import tempfile
+from contextlib import ExitStack
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Set, Tuple
+
+from cldk.analysis.java.codeanalyzer.dispatch_table import DispatchTable
+from cldk.analysis.java.codeanalyzer.loader import _GRAPH_KEYS, JsonStreamReader
+from cldk.analysis.java.codeanalyzer.signatures import call_graph_signature, callee_declaration
+from cldk.analysis.java.codeanalyzer.type_hierarchy import TypeHierarchy
+from cldk.models.java.models import JCallable, JType
+
+logger = logging.getLogger(__name__)
+
+BUILD_FILE_NAMES = ("pom.xml", "build.gradle", "build.gradle.kts")
+
+# The (source type, source signature, target type, target signature) of a call graph edge.
+EdgeKey = Tuple[str, str, str, str]
+
+_SKIPPED_DIRECTORIES = {".git", ".gradle", ".idea", "build", "node_modules", "out", "target"}
+
+
+def discover_modules(project_dir: str | Path) -> List[Path]:
+    """Discover the modules of a multi-module Maven or Gradle build.
+
+    A module is a directory with a build file (pom.xml, build.gradle or build.gradle.kts) and a
+    src/main/java source root. Sharding is only possible if no module contains another one, since
+    analyzing the outer module would also analyze the sources of the inner one.
+
+    Args:
+        project_dir (str | Path): The root of the Java project.
+
+    Returns:
+        List[Path]: The modules, or an empty list if the project has fewer than two independent modules.
+    """
+    modules: List[Path] = []
+    for directory, subdirectories, files in os.walk(project_dir):
+        subdirectories[:] = sorted(subdirectory for subdirectory in subdirectories if subdirectory not in _SKIPPED_DIRECTORIES)
+        if any(build_file in files for build_file in BUILD_FILE_NAMES) and Path(directory, "src", "main", "java").is_dir():
+            modules.append(Path(directory))
+    for module in modules:
+        if any(other != module and other.is_relative_to(module) for other in modules):
+            logger.info(f"Module {module} contains other modules; the project is analyzed as a whole.")
+            return []
+    return modules if len(modules) > 1 else []
+
+
+def _endpoint(file_path: str, type_name: str, callable_declaration: str) -> Dict[str, str]:
+    # Like codeanalyzer, call graph edges name constructors after their type rather than <init>.
+    signature = call_graph_signature(type_name, callable_declaration)
+    return {"file_path": file_path, "type_declaration": type_name, "signature": signature, "callable_declaration": callable_declaration}
+
+
+def _edge_key(edge: Dict[str, Any]) -> EdgeKey:
+    return edge["source"]["type_declaration"], edge["source"]["signature"], edge["target"]["type_declaration"], edge["target"]["signature"]
+
+
+class _ShardIndex:
+    """The types and call sites of the shards, collected as their compilation units are streamed.
+
+    Only what resolving calls needs is kept: the supertypes and callable modifiers of every type, and the
+    receiver type and callee of every call site.
+    """
+
+    def __init__(self) -> None:
+        self.types: Dict[str, JType] = {}
+        self.type_shard: Dict[str, int] = {}
+        self.type_file: Dict[str, str] = {}
+        # (shard index, file path, type name, caller signature, receiver type, callee signature) of every call site
+        self.call_sites: List[Tuple[int, str, str, str, str, str]] = []
+
+    def add_compilation_unit(self, shard_index: int, file_path: str, compilation_unit: Dict[str, Any]) -> None:
+        for type_name, type_declaration in compilation_unit["type_declarations"].items():
+            if type_name not in self.types:
+                self.type_shard[type_name] = shard_index
+                self.type_file[type_name] = file_path
+                self.types[type_name] = JType.model_construct(
+                    is_interface=type_declaration.get("is_interface", False),
+                    extends_list=type_declaration.get("extends_list", []),
+                    implements_list=type_declaration.get("implements_list", []),
+                    callable_declarations={
+                        signature: JCallable.model_construct(modifiers=j_callable.get("modifiers", []), is_constructor=j_callable.get("is_constructor", False))
+                        for signature, j_callable in type_declaration["callable_declarations"].items()
+                    },
+                )
+            for signature, j_callable in type_declaration["callable_declarations"].items():
+                for call_site in j_callable["call_sites"]:
+                    callee_signature = call_site.get("callee_signature")
+                    if not callee_signature or not call_site.get("receiver_type"):
+                        continue
+                    callee_signature = callee_declaration(callee_signature, bool(call_site.get("is_constructor_call")))
+                    self.call_sites.append((shard_index, file_path, type_name, signature, call_site["receiver_type"], callee_signature))
+
+    def cross_shard_edges(self) -> Iterator[Dict[str, Any]]:
+        """Derive the call edges between shards from the call sites of their symbol tables.
+
+        Calls are resolved with class hierarchy analysis, like a whole-project call graph: a call through an
+        interface or a base class of one shard reaches the implementations in the other shards.
+        """
+        dispatch_table = DispatchTable(self.types, TypeHierarchy(self.types))
+        for shard_index, file_path, type_name, signature, receiver_type, callee_signature in self.call_sites:
+            for callee_type, _ in dispatch_table.targets(receiver_type, callee_signature):
+                if self.type_shard[callee_type] == shard_index:
+                    continue
+                yield {
+                    "type": "CALL_DEP",
+                    "weight": "1",
+                    "source": _endpoint(file_path, type_name, signature),
+                    "target": _endpoint(self.type_file[callee_type], callee_type, callee_signature),
+                }
+
+
+def merge_shards(shard_files: List[Path], output_file: Path) -> None:
+    """Merge the analyses of the modules of a project into one analysis.json.
+
+    Symbol tables and graph edges of the shards are concatenated. If the shards have call graphs,
+    the call edges between shards are added to the merged call graph.
+
+    Every shard is streamed once: its compilation units and edges are copied as raw JSON into spill files
+    next to output_file, which are then concatenated, so neither the shards nor the merged analysis are
+    held in memory.
+
+    Args:
+        shard_files (List[Path]): The analysis.json of every shard.
+        output_file (Path): The file to write the merged analysis to.
+    """
+    shard_index = _ShardIndex()
+    edge_keys: Set[EdgeKey] = set()
+    # Whether any shard has a list of edges for a graph key; a key that all shards have as null stays null
+    has_edges: Dict[str, bool] = {}
+    other_values: Dict[str, Any] = {}
+
+    with tempfile.TemporaryDirectory(dir=output_file.parent) as spill_dir:
+        spill_files = {key: Path(spill_dir, key) for key in ("symbol_table", *_GRAPH_KEYS)}
+        counts = dict.fromkeys(spill_files, 0)
+        with ExitStack() as stack:
+            spills = {key: stack.enter_context(open(spill_file, "w", encoding="utf-8")) for key, spill_file in spill_files.items()}
+
+            def spill(key: str, raw: str) -> None:
+                spills[key].write(("," if counts[key] else "") + raw)
+                counts[key] += 1
+
+            for index, shard_file in enumerate(shard_files):
+                with open(shard_file, encoding="utf-8") as f:
+                    reader = JsonStreamReader(f)
+                    for key in reader.iter_object():
+                        if key == "symbol_table" and reader.peek() != "n":
+                            for file_path in reader.iter_object():
+                                compilation_unit, raw = reader.read_value_and_raw()
+                                spill(key, f"{json.dumps(file_path)}:{raw}")
+                                shard_index.add_compilation_unit(index, file_path, compilation_unit)
+                        elif key in _GRAPH_KEYS and reader.peek() != "n":
+                            has_edges[key] = True
+                            for _ in reader.iter_array():
+                                edge, raw = reader.read_value_and_raw()
+                                spill(key, raw)
+                                if key == "call_graph":
+                                    edge_keys.add(_edge_key(edge))
+                        elif key in _GRAPH_KEYS:
+                            reader.read_value()
+                            has_edges.setdefault(key, False)
+                        elif key == "symbol_table":
+                            reader.read_value()
+                        else:
+                            other_values.setdefault(key, reader.read_value())
+
+            if has_edges.get("call_graph"):
+                num_edges = counts["call_graph"]
+                for edge in shard_index.cross_shard_edges():
+                    edge_key = _edge_key(edge)
+                    if edge_key not in edge_keys:
+                        edge_keys.add(edge_key)
+                        spill("call_graph", json.dumps(edge))
+                logger.info(f"Added {counts['call_graph'] - num_edges} cross-shard call edges.")
+
+        tmp_file = output_file.with_name(f"{output_file.name}.{os.getpid()}.tmp")
+        try:
+            with open(tmp_file, "w", encoding="utf-8") as out:
+                out.write('{"symbol_table":{')
+                with open(spill_files["symbol_table"], encoding="utf-8") as f:
+                    shutil.copyfileobj(f, out)
+                out.write("}")
+                for key, key_has_edges in has_edges.items():
+                    out.write(f",{json.dumps(key)}:")
+                    if not key_has_edges:
+                        out.write("null")
+                        continue
+                    out.write("[")
+                    with open(spill_files[key], encoding="utf-8") as f:
+                        shutil.copyfileobj(f, out)
+                    out.write("]")
+                for key, value in other_values.items():
+                    out.write(f",{json.dumps(key)}:{json.dumps(value)}")
+                out.write("}")
+            os.replace(tmp_file, output_file)
+        finally:
+            tmp_file.unlink(missing_ok=True)
@@ -0,0 +1,70 @@
+################################################################################
+# Copyright IBM Corporation 2024
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+################################################################################
+
+"""Signatures module
+
+Converts constructor signatures between the forms codeanalyzer uses for them.
+The symbol table declares a constructor under ``<init>(...)``, call sites name
+it after its type, e.g. ``Inventory(...)``, and so do the endpoints of call
+graph edges.
+"""
+
+CONSTRUCTOR_NAME = "<init>"
+
+
+def callee_declaration(callee_signature: str, is_constructor_call: bool) -> str:
+    """Return the signature under which the symbol table declares the callee of a call site.
+
+    Args:
+        callee_signature (str): The callee signature of the call site, e.g. ``Inventory(java.lang.String)``.
+        is_constructor_call (bool): Whether the call site is a constructor call.
+
+    Returns:
+        str: The signature of the callee, e.g. ``<init>(java.lang.String)`` for a constructor call.
+    """
+    if is_constructor_call:
+        return CONSTRUCTOR_NAME + callee_signature[callee_signature.find("(") :]
+    return callee_signature
+
+
+def call_graph_signature(type_name: str, callable_declaration: str) -> str:
+    """Return the signature of a callable as the endpoints of codeanalyzer call graph edges name it.
+
+    Args:
+        type_name (str): The qualified name of the type that declares the callable.
+        callable_declaration (str): The signature of the callable in the symbol table.
+
+    Returns:
+        str: The signature, with a constructor named after its type instead of ``<init>``.
+    """
+    if callable_declaration.startswith(CONSTRUCTOR_NAME + "("):
+        return type_name.rsplit(".", 1)[-1] + callable_declaration[len(CONSTRUCTOR_NAME) :]
+    return callable_declaration
+
+
+def symbol_table_signature(type_name: str, signature: str) -> str:
+    """Return the signature of a callable as the symbol table declares it; the inverse of :func:`call_graph_signature`.
+
+    Args:
+        type_name (str): The qualified name of the type that declares the callable.
+        signature (str): The signature of the callable, in either form.
+
+    Returns:
+        str: The signature, with a constructor named ``<init>``.
+    """
+    if signature[: signature.find("(")] == type_name.rsplit(".", 1)[-1]:
+        return CONSTRUCTOR_NAME + signature[signature.find("(") :]
+    return signature
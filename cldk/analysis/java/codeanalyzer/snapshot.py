@@ -0,0 +1,183 @@
+################################################################################
+# Copyright IBM Corporation 2024
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+################################################################################
+
+"""Binary snapshot cache of validated analysis results.
+
+A snapshot is a pickle (protocol 5) of an already validated JApplication, stored
+next to analysis.json. It is keyed on the content hash of analysis.json, the
+analysis level and the codeanalyzer backend version, so a warm start whose key
+matches skips both JSON parsing and pydantic validation. The callable registry
+of the application is pickled along with it.
+
+The call graph built from an application is snapshotted separately, as the
+arrays of its compact form without the method details; these are resolved
+against the application again on load, which needs no source parsing.
+
+Snapshots are only ever read from the analysis_json_path they were written to;
+like any pickle, they must not be loaded from an untrusted location.
+"""
+
+import hashlib
+import logging
+import os
+import pickle
+from pathlib import Path
+from typing import Any, Dict
+
+from cldk.models.java.models import JApplication
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_FILE_NAME = "analysis.snapshot.pkl"
+CALL_GRAPH_SNAPSHOT_FILE_NAME = "call_graph.snapshot.pkl"
+
+# Bump this whenever the pickled layout of the Java models changes.
+SNAPSHOT_FORMAT_VERSION = 2
+# Bump this whenever the state of CompactCallGraph, or the way call graphs are built, changes.
+CALL_GRAPH_SNAPSHOT_FORMAT_VERSION = 1
+
+
+def file_sha256(file_path: Path, chunk_size: int = 1 << 20) -> str:
+    """Return the hex SHA-256 digest of a file, read in chunks.
+
+    Args:
+        file_path (Path): The file to hash.
+        chunk_size (int): The number of bytes to read at a time.
+
+    Returns:
+        str: The hex digest of the file contents.
+    """
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def snapshot_key(analysis_json_sha256: str, analysis_level: int, backend_version: str, externalize_code: bool = False) -> Dict[str, Any]:
+    """Return the key that identifies a snapshot of the given analysis.json.
+
+    Args:
+        analysis_json_sha256 (str): The SHA-256 (see :func:`file_sha256`) of the analysis.json file the snapshot is built from.
+        analysis_level (int): The codeanalyzer analysis level (1 for symbol table, 2 for call graph).
+        backend_version (str): The codeanalyzer backend version.
+        externalize_code (bool): Whether the code bodies of the application are externalized.
+
+    Returns:
+        Dict[str, Any]: The snapshot key.
+    """
+    return {
+        "format_version": SNAPSHOT_FORMAT_VERSION,
+        "analysis_json_sha256": analysis_json_sha256,
+        "analysis_level": analysis_level,
+        "backend_version": backend_version,
+        "externalize_code": externalize_code,
+    }
+
+
+def call_graph_snapshot_key(analysis_json_sha256: str, using_symbol_table: bool, backend_version: str, externalize_code: bool = False) -> Dict[str, Any]:
+    """Return the key that identifies a call graph snapshot of the given analysis.json.
+
+    Args:
+        analysis_json_sha256 (str): The SHA-256 of the analysis.json file the call graph is built from.
+        using_symbol_table (bool): Whether the call graph is built from the symbol table.
+        backend_version (str): The codeanalyzer backend version.
+        externalize_code (bool): Whether the code bodies of the application are externalized.
+
+    Returns:
+        Dict[str, Any]: The call graph snapshot key.
+    """
+    key = snapshot_key(analysis_json_sha256, 1 if using_symbol_table else 2, backend_version, externalize_code)
+    key["call_graph_format_version"] = CALL_GRAPH_SNAPSHOT_FORMAT_VERSION
+    return key
+
+
+def _load(snapshot_file: Path, key: Dict[str, Any]) -> Any | None:
+    """Unpickle the object of a snapshot file if it exists and was written for the given key."""
+    if not snapshot_file.exists():
+        return None
+    try:
+        with open(snapshot_file, "rb") as f:
+            # The key is pickled separately ahead of the object, so a stale snapshot is
+            # rejected without unpickling the object.
+            if pickle.load(f) != key:
+                logger.info(f"Snapshot {snapshot_file} is stale.")
+                return None
+            return pickle.load(f)
+    except Exception as e:
+        logger.warning(f"Unable to read snapshot {snapshot_file}: {e}")
+        return None
+
+
+def _save(snapshot_file: Path, key: Dict[str, Any], obj: Any) -> None:
+    """Pickle a key and an object to a snapshot file atomically."""
+    tmp_file = snapshot_file.with_name(f"{snapshot_file.name}.{os.getpid()}.tmp")
+    try:
+        with open(tmp_file, "wb") as f:
+            pickle.dump(key, f, protocol=5)
+            pickle.dump(obj, f, protocol=5)
+        os.replace(tmp_file, snapshot_file)
+    except Exception as e:
+        logger.warning(f"Unable to write snapshot {snapshot_file}: {e}")
+        tmp_file.unlink(missing_ok=True)
+
+
+def load_snapshot(snapshot_file: Path, key: Dict[str, Any]) -> JApplication | None:
+    """Load a snapshot if it exists and was written for the given key.
+
+    Args:
+        snapshot_file (Path): The snapshot file.
+        key (Dict[str, Any]): The expected snapshot key.
+
+    Returns:
+        JApplication | None: The cached application, or None on a cache miss.
+    """
+    return _load(snapshot_file, key)
+
+
+def save_snapshot(snapshot_file: Path, key: Dict[str, Any], application: JApplication) -> None:
+    """Write a snapshot of an application atomically.
+
+    Args:
+        snapshot_file (Path): The snapshot file.
+        key (Dict[str, Any]): The snapshot key.
+        application (JApplication): The validated application to cache.
+    """
+    _save(snapshot_file, key, application)
+
+
+def load_call_graph_snapshot(snapshot_file: Path, key: Dict[str, Any]) -> Dict[str, Any] | None:
+    """Load the state of a compact call graph if a snapshot exists and was written for the given key.
+
+    Args:
+        snapshot_file (Path): The call graph snapshot file.
+        key (Dict[str, Any]): The expected call graph snapshot key.
+
+    Returns:
+        Dict[str, Any] | None: The state of the call graph (see ``CompactCallGraph.get_state``), or None on a cache miss.
+    """
+    return _load(snapshot_file, key)
+
+
+def save_call_graph_snapshot(snapshot_file: Path, key: Dict[str, Any], state: Dict[str, Any]) -> None:
+    """Write a snapshot of the state of a compact call graph atomically.
+
+    Args:
+        snapshot_file (Path): The call graph snapshot file.
+        key (Dict[str, Any]): The call graph snapshot key.
+        state (Dict[str, Any]): The state of the call graph (see ``CompactCallGraph.get_state``).
+    """
+    _save(snapshot_file, key, state)
@@ -0,0 +1,128 @@
+################################################################################
+# Copyright IBM Corporation 2024
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+################################################################################
+
+"""Symbol index module
+
+Maps qualified type names to their declarations and files, and (type, signature)
+pairs to callables, so that point queries on a symbol table do not scan every
+compilation unit.
+"""
+
+from typing import Dict, Mapping, Tuple
+
+from cldk.analysis.java.codeanalyzer.call_site_index import CallSiteIndex
+from cldk.analysis.java.codeanalyzer.dispatch_table import DispatchTable
+from cldk.analysis.java.codeanalyzer.loader import LazySymbolTable
+from cldk.analysis.java.codeanalyzer.type_hierarchy import TypeHierarchy
+from cldk.models.java.models import JCallable, JCompilationUnit, JType
+
+
+class SymbolIndex:
+    """Constant time lookups of the types and callables of a symbol table.
+
+    The index of a :class:`LazySymbolTable` is filled one compilation unit at a time, when a type of
+    that unit is first looked up, so that building it does not validate anything. An index describes
+    the symbol table it was built from; a reloaded (e.g., incrementally re-analyzed) application needs
+    a new index.
+
+    Args:
+        symbol_table (Mapping[str, JCompilationUnit]): The symbol table to index.
+    """
+
+    def __init__(self, symbol_table: Mapping[str, JCompilationUnit]) -> None:
+        self.symbol_table = symbol_table
+        self._lazy = isinstance(symbol_table, LazySymbolTable)
+        self._files: Dict[str, str] = {}
+        self._types: Dict[str, JType] = {}
+        self._callables: Dict[Tuple[str, str], JCallable] = {}
+        self._all_types: Dict[str, JType] | None = None
+        self._type_hierarchy: TypeHierarchy | None = None
+        self._dispatch_table: DispatchTable | None = None
+        self._call_site_index: CallSiteIndex | None = None
+        if not self._lazy:
+            for file_path, compilation_unit in symbol_table.items():
+                self.add_compilation_unit(file_path, compilation_unit)
+
+    def add_compilation_unit(self, file_path: str, compilation_unit: JCompilationUnit) -> None:
+        """Index the types and callables of a compilation unit.
+
+        A type that is declared in more than one file keeps the declaration that was indexed first.
+
+        Args:
+            file_path (str): The path of the source file.
+            compilation_unit (JCompilationUnit): The compilation unit of the file.
+        """
+        for type_name, type_declaration in compilation_unit.type_declarations.items():
+            if type_name in self._types:
+                continue
+            self._files[type_name] = file_path
+            self._types[type_name] = type_declaration
+            for signature, callable in type_declaration.callable_declarations.items():
+                self._callables[(type_name, signature)] = callable
+
+    def file_of(self, qualified_class_name: str) -> str | None:
+        """Return the path of the file that declares the given type."""
+        if self._lazy:
+            return self.symbol_table.file_of(qualified_class_name)
+        return self._files.get(qualified_class_name)
+
+    def get_type(self, qualified_class_name: str) -> JType | None:
+        """Return the declaration of the given type."""
+        type_declaration = self._types.get(qualified_class_name)
+        if type_declaration is None and self._lazy:
+            file_path = self.symbol_table.file_of(qualified_class_name)
+            if file_path is not None:
+                self.add_compilation_unit(file_path, self.symbol_table[file_path])
+                type_declaration = self._types.get(qualified_class_name)
+        return type_declaration
+
+    def get_callable(self, qualified_class_name: str, signature: str) -> JCallable | None:
+        """Return the callable with the given signature declared by the given type."""
+        if self._lazy and qualified_class_name not in self._types:
+            self.get_type(qualified_class_name)
+        return self._callables.get((qualified_class_name, signature))
+
+    def all_types(self) -> Dict[str, JType]:
+        """Return all types of the symbol table, keyed by qualified name.
+
+        The dictionary is built on the first call and shared by later calls; it must not be modified.
+        Like a merge of the type declarations of all files, a type declared in more than one file maps
+        to the declaration in the last of them.
+        """
+        if self._all_types is None:
+            all_types: Dict[str, JType] = {}
+            for compilation_unit in self.symbol_table.values():
+                all_types.update(compilation_unit.type_declarations)
+            self._all_types = all_types
+        return self._all_types
+
+    def type_hierarchy(self) -> TypeHierarchy:
+        """Return the type hierarchy of the symbol table, building it on the first call."""
+        if self._type_hierarchy is None:
+            self._type_hierarchy = TypeHierarchy(self.all_types())
+        return self._type_hierarchy
+
+    def dispatch_table(self) -> DispatchTable:
+        """Return the class hierarchy analysis dispatch table of the symbol table, building it on the first call."""
+        if self._dispatch_table is None:
+            self._dispatch_table = DispatchTable(self.all_types(), self.type_hierarchy())
+        return self._dispatch_table
+
+    def call_site_index(self) -> CallSiteIndex:
+        """Return the reverse call site index of the symbol table, building it on the first call."""
+        if self._call_site_index is None:
+            self._call_site_index = CallSiteIndex(self.all_types(), self.type_hierarchy(), self.dispatch_table())
+        return self._call_site_index
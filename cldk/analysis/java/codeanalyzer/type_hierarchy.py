@@ -0,0 +1,112 @@
+################################################################################
+# Copyright IBM Corporation 2024
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+################################################################################
+
+"""Type hierarchy module
+
+Inverts the ``extends_list`` and ``implements_list`` of every type of an
+application once, so that direct and transitive subtype and supertype queries
+are dictionary lookups. Transitive closures are computed on first request and
+cached.
+"""
+
+from typing import Dict, FrozenSet, List, Mapping, Tuple
+
+import networkx as nx
+
+from cldk.models.java.models import JType
+
+
+class TypeHierarchy:
+    """The subtype and supertype relations between the types of an application.
+
+    Supertypes that are not declared in the application (e.g., ``java.io.Serializable``) are part of
+    the hierarchy, without a type declaration.
+
+    Args:
+        types (Mapping[str, JType]): The types of the application, keyed by qualified name.
+    """
+
+    def __init__(self, types: Mapping[str, JType]) -> None:
+        self._types = types
+        self._supertypes: Dict[str, Tuple[str, ...]] = {}
+        subtypes: Dict[str, List[str]] = {}
+        for type_name, type_declaration in types.items():
+            supertypes = tuple(dict.fromkeys((type_declaration.extends_list or []) + (type_declaration.implements_list or [])))
+            self._supertypes[type_name] = supertypes
+            for supertype in supertypes:
+                subtypes.setdefault(supertype, []).append(type_name)
+        self._subtypes: Dict[str, Tuple[str, ...]] = {type_name: tuple(names) for type_name, names in subtypes.items()}
+        self._all_subtypes: Dict[str, FrozenSet[str]] = {}
+        self._all_supertypes: Dict[str, FrozenSet[str]] = {}
+        self._graph: nx.DiGraph | None = None
+
+    def subtypes(self, qualified_class_name: str) -> Tuple[str, ...]:
+        """Return the types that directly extend or implement the given type."""
+        return self._subtypes.get(qualified_class_name, ())
+
+    def supertypes(self, qualified_class_name: str) -> Tuple[str, ...]:
+        """Return the types that the given type directly extends or implements."""
+        return self._supertypes.get(qualified_class_name, ())
+
+    def all_subtypes(self, qualified_class_name: str) -> FrozenSet[str]:
+        """Return the transitive subtypes of the given type, excluding the type itself."""
+        closure = self._all_subtypes.get(qualified_class_name)
+        if closure is None:
+            closure = self._all_subtypes[qualified_class_name] = self._closure(qualified_class_name, self._subtypes, self._all_subtypes)
+        return closure
+
+    def all_supertypes(self, qualified_class_name: str) -> FrozenSet[str]:
+        """Return the transitive supertypes of the given type, excluding the type itself."""
+        closure = self._all_supertypes.get(qualified_class_name)
+        if closure is None:
+            closure = self._all_supertypes[qualified_class_name] = self._closure(qualified_class_name, self._supertypes, self._all_supertypes)
+        return closure
+
+    @staticmethod
+    def _closure(type_name: str, edges: Mapping[str, Tuple[str, ...]], cache: Mapping[str, FrozenSet[str]]) -> FrozenSet[str]:
+        """Collect the types reachable from type_name over edges, reusing the closures already in cache."""
+        reached = set()
+        pending = list(edges.get(type_name, ()))
+        while pending:
+            current = pending.pop()
+            if current in reached:
+                continue
+            reached.add(current)
+            cached = cache.get(current)
+            if cached is not None:
+                reached.update(cached)
+            else:
+                pending.extend(edges.get(current, ()))
+        # The hierarchy of well-formed code is acyclic; this only guards against malformed input.
+        reached.discard(type_name)
+        return frozenset(reached)
+
+    def graph(self) -> nx.DiGraph:
+        """Return the hierarchy as a graph with an edge from every supertype to each of its direct subtypes.
+
+        Edges have a ``type`` attribute of ``EXTENDS`` or ``IMPLEMENTS``, and the nodes of types declared in
+        the application have a ``type_declaration`` attribute. The graph is built on the first call and
+        shared by later calls.
+        """
+        if self._graph is None:
+            graph = nx.DiGraph()
+            for type_name, type_declaration in self._types.items():
+                graph.add_node(type_name, type_declaration=type_declaration)
+            for type_name, type_declaration in self._types.items():
+                graph.add_edges_from(((supertype, type_name) for supertype in type_declaration.implements_list or []), type="IMPLEMENTS")
+                graph.add_edges_from(((supertype, type_name) for supertype in type_declaration.extends_list or []), type="EXTENDS")
+            self._graph = graph
+        return self._graph
@@ -0,0 +1,318 @@
+################################################################################
+# Copyright IBM Corporation 2024
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+################################################################################
+
+"""Columnar (Apache Arrow) view of the Java symbol table.
+
+The symbol table is normalized into one Arrow table per entity: compilation
+units, types, callables, call sites, fields and CRUD operations. Rows of the
+child tables refer to their parents by file path, qualified type name and
+callable signature, so bulk analytics (complexity, fan-out, annotations, ...)
+run as vectorized column scans with ``pyarrow.compute``.
+
+Examples:
+    Find the ten most complex methods of an application (backend required):
+
+    >>> import pyarrow.compute as pc
+    >>> from cldk import CLDK
+    >>> ja = CLDK(language="java").analysis(project_path='path/to/project')
+    >>> callables = ja.get_symbol_table_arrow()["callables"]  # doctest: +SKIP
+    >>> top = callables.take(pc.sort_indices(callables, [("cyclomatic_complexity", "descending")])[:10])  # doctest: +SKIP
+"""
+
+from pathlib import Path
+from typing import Dict, List, Mapping
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from cldk.models.java.models import JCompilationUnit
+
+_STRINGS = pa.list_(pa.string())
+
+COMPILATION_UNITS_SCHEMA = pa.schema(
+    [
+        ("file_path", pa.string()),
+        ("package_name", pa.string()),
+        ("imports", _STRINGS),
+        ("num_comments", pa.int32()),
+        ("num_types", pa.int32()),
+        ("is_modified", pa.bool_()),
+    ]
+)
+
+TYPES_SCHEMA = pa.schema(
+    [
+        ("file_path", pa.string()),
+        ("type_name", pa.string()),
+        ("parent_type", pa.string()),
+        ("is_interface", pa.bool_()),
+        ("is_inner_class", pa.bool_()),
+        ("is_local_class", pa.bool_()),
+        ("is_nested_type", pa.bool_()),
+        ("is_class_or_interface_declaration", pa.bool_()),
+        ("is_enum_declaration", pa.bool_()),
+        ("is_annotation_declaration", pa.bool_()),
+        ("is_record_declaration", pa.bool_()),
+        ("is_concrete_class", pa.bool_()),
+        ("is_entrypoint_class", pa.bool_()),
+        ("extends_list", _STRINGS),
+        ("implements_list", _STRINGS),
+        ("modifiers", _STRINGS),
+        ("annotations", _STRINGS),
+        ("nested_type_declarations", _STRINGS),
+        ("num_callables", pa.int32()),
+        ("num_fields", pa.int32()),
+    ]
+)
+
+CALLABLES_SCHEMA = pa.schema(
+    [
+        ("file_path", pa.string()),
+        ("type_name", pa.string()),
+        ("signature", pa.string()),
+        ("declaration", pa.string()),
+        ("return_type", pa.string()),
+        ("is_implicit", pa.bool_()),
+        ("is_constructor", pa.bool_()),
+        ("is_entrypoint", pa.bool_()),
+        ("modifiers", _STRINGS),
+        ("annotations", _STRINGS),
+        ("thrown_exceptions", _STRINGS),
+        ("parameter_types", _STRINGS),
+        ("referenced_types", _STRINGS),
+        ("accessed_fields", _STRINGS),
+        ("start_line", pa.int32()),
+        ("end_line", pa.int32()),
+        ("code_start_line", pa.int32()),
+        ("cyclomatic_complexity", pa.int32()),
+        ("num_call_sites", pa.int32()),
+        ("num_variable_declarations", pa.int32()),
+        ("code", pa.string()),
+    ]
+)
+
+CALL_SITES_SCHEMA = pa.schema(
+    [
+        ("file_path", pa.string()),
+        ("type_name", pa.string()),
+        ("signature", pa.string()),
+        ("method_name", pa.string()),
+        ("receiver_expr", pa.string()),
+        ("receiver_type", pa.string()),
+        ("argument_types", _STRINGS),
+        ("return_type", pa.string()),
+        ("callee_signature", pa.string()),
+        ("is_static_call", pa.bool_()),
+        ("is_constructor_call", pa.bool_()),
+        ("crud_operation", pa.string()),
+        ("crud_query", pa.string()),
+        ("start_line", pa.int32()),
+        ("start_column", pa.int32()),
+        ("end_line", pa.int32()),
+        ("end_column", pa.int32()),
+    ]
+)
+
+FIELDS_SCHEMA = pa.schema(
+    [
+        ("file_path", pa.string()),
+        ("type_name", pa.string()),
+        ("type", pa.string()),
+        ("variables", _STRINGS),
+        ("modifiers", _STRINGS),
+        ("annotations", _STRINGS),
+        ("start_line", pa.int32()),
+        ("end_line", pa.int32()),
+    ]
+)
+
+CRUD_OPERATIONS_SCHEMA = pa.schema(
+    [
+        ("file_path", pa.string()),
+        ("type_name", pa.string()),
+        ("signature", pa.string()),
+        ("line_number", pa.int32()),
+        ("operation_type", pa.string()),
+    ]
+)
+
+SCHEMAS: Dict[str, pa.Schema] = {
+    "compilation_units": COMPILATION_UNITS_SCHEMA,
+    "types": TYPES_SCHEMA,
+    "callables": CALLABLES_SCHEMA,
+    "call_sites": CALL_SITES_SCHEMA,
+    "fields": FIELDS_SCHEMA,
+    "crud_operations": CRUD_OPERATIONS_SCHEMA,
+}
+
+
+def _columns(schema: pa.Schema) -> Dict[str, List]:
+    return {name: [] for name in schema.names}
+
+
+def _append(columns: Dict[str, List], **row) -> None:
+    for name, column in columns.items():
+        column.append(row[name])
+
+
+def symbol_table_to_arrow(symbol_table: Mapping[str, JCompilationUnit], include_code: bool = False) -> Dict[str, pa.Table]:
+    """Normalize a symbol table into Arrow tables.
+
+    Args:
+        symbol_table (Mapping[str, JCompilationUnit]): The symbol table keyed by file path.
+        include_code (bool): If True, the callables table carries method bodies in its ``code`` column.
+            Defaults to False, which leaves the column null.
+
+    Returns:
+        Dict[str, pa.Table]: Tables keyed by "compilation_units", "types", "callables", "call_sites",
+        "fields" and "crud_operations".
+    """
+    columns = {name: _columns(schema) for name, schema in SCHEMAS.items()}
+    for file_path, compilation_unit in symbol_table.items():
+        _append(
+            columns["compilation_units"],
+            file_path=file_path,
+            package_name=compilation_unit.package_name,
+            imports=compilation_unit.imports,
+            num_comments=len(compilation_unit.comments),
+            num_types=len(compilation_unit.type_declarations),
+            is_modified=compilation_unit.is_modified,
+        )
+        for type_name, jtype in compilation_unit.type_declarations.items():
+            _append(
+                columns["types"],
+                file_path=file_path,
+                type_name=type_name,
+                parent_type=jtype.parent_type,
+                is_interface=jtype.is_interface,
+                is_inner_class=jtype.is_inner_class,
+                is_local_class=jtype.is_local_class,
+                is_nested_type=jtype.is_nested_type,
+                is_class_or_interface_declaration=jtype.is_class_or_interface_declaration,
+                is_enum_declaration=jtype.is_enum_declaration,
+                is_annotation_declaration=jtype.is_annotation_declaration,
+                is_record_declaration=jtype.is_record_declaration,
+                is_concrete_class=jtype.is_concrete_class,
+                is_entrypoint_class=jtype.is_entrypoint_class,
+                extends_list=jtype.extends_list,
+                implements_list=jtype.implements_list,
+                modifiers=jtype.modifiers,
+                annotations=jtype.annotations,
+                nested_type_declarations=jtype.nested_type_declarations,
+                num_callables=len(jtype.callable_declarations),
+                num_fields=len(jtype.field_declarations),
+            )
+            for field in jtype.field_declarations:
+                _append(
+                    columns["fields"],
+                    file_path=file_path,
+                    type_name=type_name,
+                    type=field.type,
+                    variables=field.variables,
+                    modifiers=field.modifiers,
+                    annotations=field.annotations,
+                    start_line=field.start_line,
+                    end_line=field.end_line,
+                )
+            for signature, j_callable in jtype.callable_declarations.items():
+                _append(
+                    columns["callables"],
+                    file_path=file_path,
+                    type_name=type_name,
+                    signature=signature,
+                    declaration=j_callable.declaration,
+                    return_type=j_callable.return_type,
+                    is_implicit=j_callable.is_implicit,
+                    is_constructor=j_callable.is_constructor,
+                    is_entrypoint=j_callable.is_entrypoint,
+                    modifiers=j_callable.modifiers,
+                    annotations=j_callable.annotations,
+                    thrown_exceptions=j_callable.thrown_exceptions,
+                    parameter_types=[parameter.type for parameter in j_callable.parameters],
+                    referenced_types=j_callable.referenced_types,
+                    accessed_fields=j_callable.accessed_fields,
+                    start_line=j_callable.start_line,
+                    end_line=j_callable.end_line,
+                    code_start_line=j_callable.code_start_line,
+                    cyclomatic_complexity=j_callable.cyclomatic_complexity,
+                    num_call_sites=len(j_callable.call_sites),
+                    num_variable_declarations=len(j_callable.variable_declarations),
+                    code=j_callable.code if include_code else None,
+                )
+                for call_site in j_callable.call_sites:
+                    _append(
+                        columns["call_sites"],
+                        file_path=file_path,
+                        type_name=type_name,
+                        signature=signature,
+                        method_name=call_site.method_name,
+                        receiver_expr=call_site.receiver_expr,
+                        receiver_type=call_site.receiver_type,
+                        argument_types=call_site.argument_types,
+                        return_type=call_site.return_type,
+                        callee_signature=call_site.callee_signature,
+                        is_static_call=call_site.is_static_call,
+                        is_constructor_call=call_site.is_constructor_call,
+                        crud_operation=call_site.crud_operation.operation_type.value if call_site.crud_operation and call_site.crud_operation.operation_type else None,
+                        crud_query=call_site.crud_query.query_type.value if call_site.crud_query and call_site.crud_query.query_type else None,
+                        start_line=call_site.start_line,
+                        start_column=call_site.start_column,
+                        end_line=call_site.end_line,
+                        end_column=call_site.end_column,
+                    )
+                for crud_operation in j_callable.crud_operations or []:
+                    _append(
+                        columns["crud_operations"],
+                        file_path=file_path,
+                        type_name=type_name,
+                        signature=signature,
+                        line_number=crud_operation.line_number,
+                        operation_type=crud_operation.operation_type.value if crud_operation.operation_type else None,
+                    )
+    return {name: pa.table(columns[name], schema=schema) for name, schema in SCHEMAS.items()}
+
+
+def write_parquet(tables: Mapping[str, pa.Table], directory: str | Path) -> Dict[str, Path]:
+    """Write symbol table Arrow tables as one Parquet file per table.
+
+    Args:
+        tables (Mapping[str, pa.Table]): Tables as returned by :func:`symbol_table_to_arrow`.
+        directory (str | Path): The directory to write ``<table name>.parquet`` files into.
+
+    Returns:
+        Dict[str, Path]: The written files keyed by table name.
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    files = {}
+    for name, table in tables.items():
+        files[name] = directory / f"{name}.parquet"
+        pq.write_table(table, files[name])
+    return files
+
+
+def read_parquet(directory: str | Path, memory_map: bool = True) -> Dict[str, pa.Table]:
+    """Read symbol table Arrow tables written by :func:`write_parquet`.
+
+    Args:
+        directory (str | Path): The directory holding the ``<table name>.parquet`` files.
+        memory_map (bool): If True, the files are memory-mapped instead of read into buffers. Defaults to True.
+
+    Returns:
+        Dict[str, pa.Table]: Tables keyed by table name.
+    """
+    directory = Path(directory)
+    return {name: pq.read_table(directory / f"{name}.parquet", memory_map=memory_map) for name in SCHEMAS if (directory / f"{name}.parquet").exists()}
@@ -21,8 +21,9 @@ using a Treesitter-based parser and the Code Analyzer backend.
 """
 
 from pathlib import Path
-from typing import Dict, List, Tuple, Set, Union
+from typing import Dict, Iterator, List, Tuple, Set, Union
 import networkx as nx
+import pyarrow as pa
 
 from tree_sitter import Tree
 
@@ -31,6 +32,7 @@ from cldk.models.java import JCallable
 from cldk.models.java import JApplication
 from cldk.models.java.models import JCRUDOperation, JComment, JCompilationUnit, JMethodDetail, JType, JField
 from cldk.analysis.java.codeanalyzer import JCodeanalyzer
+from cldk.analysis.java.columnar import symbol_table_to_arrow, write_parquet
 
 
 class JavaAnalysis:
@@ -50,6 +52,14 @@ class JavaAnalysis:
         analysis_level: str,
         target_files: List[str] | None,
         eager_analysis: bool,
+        lazy_symbol_table: bool = False,
+        snapshot_cache: bool = False,
+        use_daemon: bool = False,
+        incremental: bool = False,
+        shard_modules: bool = False,
+        max_shard_workers: int | None = None,
+        trusted_input: bool = False,
+        externalize_code: bool = False,
     ) -> None:
         """Initialize the Java analysis backend.
 
@@ -67,6 +77,33 @@ class JavaAnalysis:
                 constrain analysis (primarily supported for symbol-table).
             eager_analysis (bool): If True, forces regeneration of analysis.json
                 on each run even if it exists.
+            lazy_symbol_table (bool): If True, compilation units are validated the
+                first time they are queried instead of up front. Speeds up point
+                queries on large applications. Defaults to False.
+            snapshot_cache (bool): If True, the validated analysis and the built
+                call graph are cached as binary snapshots next to analysis.json
+                (requires analysis_json_path) and reused on warm starts. Defaults to False.
+            use_daemon (bool): If True, codeanalyzer runs in a persistent JVM
+                worker shared across analyses instead of a new JVM per run.
+                Defaults to False.
+            incremental (bool): If True, per-file content hashes are recorded
+                next to analysis.json (requires analysis_json_path), and later
+                runs only re-analyze changed or added files and drop deleted
+                ones. Defaults to False.
+            shard_modules (bool): If True, the modules of a multi-module Maven
+                or Gradle build are analyzed by parallel codeanalyzer processes
+                and merged into one view, including cross-module call edges.
+                Defaults to False.
+            max_shard_workers (int | None): The maximum number of parallel
+                codeanalyzer processes with shard_modules. Defaults to the
+                number of CPUs.
+            trusted_input (bool): If True, codeanalyzer output is built into
+                the models without pydantic validation, provided it was written
+                by a supported codeanalyzer major version (otherwise it is
+                validated as usual). Defaults to False.
+            externalize_code (bool): If True, method and initializer bodies
+                are not kept in memory; their code is read from the analyzed
+                source files when accessed. Defaults to False.
 
         Raises:
             NotImplementedError: If the requested analysis backend is unsupported.
@@ -79,6 +116,14 @@ class JavaAnalysis:
         self.analysis_backend_path = analysis_backend_path
         self.eager_analysis = eager_analysis
         self.target_files = target_files
+        self.lazy_symbol_table = lazy_symbol_table
+        self.snapshot_cache = snapshot_cache
+        self.use_daemon = use_daemon
+        self.incremental = incremental
+        self.shard_modules = shard_modules
+        self.max_shard_workers = max_shard_workers
+        self.trusted_input = trusted_input
+        self.externalize_code = externalize_code
         self.treesitter_java: TreesitterJava = TreesitterJava()
         # Initialize the analysis analysis_backend
         self.backend: JCodeanalyzer = JCodeanalyzer(
@@ -89,8 +134,38 @@ class JavaAnalysis:
             analysis_json_path=self.analysis_json_path,
             analysis_backend_path=self.analysis_backend_path,
             target_files=self.target_files,
+            lazy_symbol_table=self.lazy_symbol_table,
+            snapshot_cache=self.snapshot_cache,
+            use_daemon=self.use_daemon,
+            incremental=self.incremental,
+            shard_modules=self.shard_modules,
+            max_shard_workers=self.max_shard_workers,
+            trusted_input=self.trusted_input,
+            externalize_code=self.externalize_code,
         )
 
+    def close(self) -> None:
+        """Release the analysis results held by the backend.
+
+        The callables registered to resolve call graph edges are released along
+        with the application view. Queries made after closing load the analysis
+        again.
+
+        Examples:
+            Release an analysis once done with it (backend required):
+
+            >>> from cldk import CLDK
+            >>> with CLDK(language="java").analysis(project_path="path/to/project") as analysis:  # doctest: +SKIP
+            ...     classes = analysis.get_classes()
+        """
+        self.backend.close()
+
+    def __enter__(self) -> "JavaAnalysis":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
     def get_imports(self) -> List[str]:
         """Return all import statements in the source code.
 
@@ -176,6 +251,75 @@ class JavaAnalysis:
         """
         return self.backend.get_symbol_table()
 
+    def get_symbol_table_arrow(self, include_code: bool = False) -> Dict[str, pa.Table]:
+        """Return the symbol table as normalized Arrow tables.
+
+        Args:
+            include_code (bool): If True, the callables table includes method bodies. Defaults to False.
+
+        Returns:
+            dict[str, pyarrow.Table]: Tables keyed by "compilation_units", "types",
+            "callables", "call_sites", "fields" and "crud_operations".
+
+        Examples:
+            Compute the mean cyclomatic complexity as a column scan (backend required):
+
+            >>> import pyarrow.compute as pc
+            >>> from cldk import CLDK
+            >>> ja = CLDK(language="java").analysis(project_path='path/to/project')
+            >>> tables = ja.get_symbol_table_arrow()  # doctest: +SKIP
+            >>> pc.mean(tables["callables"]["cyclomatic_complexity"]).as_py() > 0  # doctest: +SKIP
+            True
+        """
+        return symbol_table_to_arrow(self.backend.get_symbol_table(), include_code=include_code)
+
+    def export_symbol_table_parquet(self, directory: str | Path, include_code: bool = False) -> Dict[str, Path]:
+        """Write the symbol table as one Parquet file per Arrow table.
+
+        The files can be memory-mapped back with :func:`cldk.analysis.java.columnar.read_parquet`.
+
+        Args:
+            directory (str | Path): Output directory.
+            include_code (bool): If True, the callables table includes method bodies. Defaults to False.
+
+        Returns:
+            dict[str, Path]: Written Parquet files keyed by table name.
+
+        Examples:
+            >>> from cldk import CLDK
+            >>> from cldk.analysis.java.columnar import read_parquet
+            >>> ja = CLDK(language="java").analysis(project_path='path/to/project')
+            >>> files = ja.export_symbol_table_parquet('out/symbol_table')  # doctest: +SKIP
+            >>> read_parquet('out/symbol_table')["callables"].num_rows > 0  # doctest: +SKIP
+            True
+        """
+        return write_parquet(self.get_symbol_table_arrow(include_code=include_code), directory)
+
+    def analyze_snippets(self, snippets: List[str]) -> List[JApplication]:
+        """Analyze many Java source snippets with one backend invocation.
+
+        The snippets are analyzed with the same backend (and worker setting) as this
+        analysis, independently of its project.
+
+        Args:
+            snippets (list[str]): Java source code of the snippets.
+
+        Returns:
+            list[JApplication]: One application per snippet, in order. The symbol
+            table of a snippet that could not be parsed is empty.
+
+        Raises:
+            CodeanalyzerExecutionException: If the backend fails.
+
+        Examples:
+            >>> from cldk import CLDK
+            >>> ja = CLDK(language="java").analysis(project_path='path/to/project')  # doctest: +SKIP
+            >>> apps = ja.analyze_snippets(['public class A {}', 'public class B {}'])  # doctest: +SKIP
+            >>> len(apps)  # doctest: +SKIP
+            2
+        """
+        return JCodeanalyzer.analyze_snippets(snippets, analysis_backend_path=self.analysis_backend_path, use_daemon=self.use_daemon)
+
     def get_compilation_units(self) -> List[JCompilationUnit]:
         """Return all compilation units in the Java code.
 
@@ -195,14 +339,22 @@ class JavaAnalysis:
     def get_class_hierarchy(self) -> nx.DiGraph:
         """Return the class hierarchy of the Java code.
 
+        Every type has an edge to each of its direct subtypes, with an edge ``type`` of
+        ``EXTENDS`` or ``IMPLEMENTS``. Supertypes outside the application are included as
+        plain nodes.
+
         Returns:
             networkx.DiGraph: Class hierarchy.
 
-        Raises:
-            NotImplementedError: Always, as the feature is not implemented yet.
-        """
+        Examples:
+            Find everything that derives from a class (backend required):
 
-        raise NotImplementedError("Class hierarchy is not implemented yet.")
+            >>> import networkx as nx
+            >>> from cldk import CLDK
+            >>> ja = CLDK(language="java").analysis(project_path='path/to/project')
+            >>> subtypes = nx.descendants(ja.get_class_hierarchy(), 'com.example.A')  # doctest: +SKIP
+        """
+        return self.backend.get_class_hierarchy()
 
     def is_parsable(self, source_code: str) -> bool:
         """Check if the source code is parsable.
@@ -244,6 +396,11 @@ class JavaAnalysis:
     def get_call_graph(self) -> nx.DiGraph:
         """Return the call graph of the Java code.
 
+        With ``AnalysisLevel.symbol_table``, an approximate call graph is built from the
+        call sites of the symbol table, resolving calls with class hierarchy analysis.
+        The graph is converted from the compact call graph that answers caller and callee
+        queries on the first call, and shared by later calls.
+
         Returns:
             networkx.DiGraph: Call graph.
 
@@ -280,6 +437,56 @@ class JavaAnalysis:
             raise NotImplementedError("Producing a call graph over a single file is not implemented yet.")
         return self.backend.get_call_graph_json()
 
+    def iter_call_graph_ndjson(self, include_code: bool = True) -> Iterator[str]:
+        """Stream the call graph as newline-delimited JSON.
+
+        A node record is yielded once per method, then an edge record per call that
+        refers to its methods by node ID, so method bodies are not repeated per edge.
+
+        Args:
+            include_code (bool): If True, node records include the method body. Defaults to True.
+
+        Returns:
+            Iterator[str]: NDJSON lines, each ending with a newline.
+
+        Raises:
+            NotImplementedError: If single-file mode is used (unsupported here).
+
+        Examples:
+            >>> import json
+            >>> from cldk import CLDK
+            >>> ja = CLDK(language="java").analysis(project_path='path/to/project')
+            >>> records = [json.loads(line) for line in ja.iter_call_graph_ndjson(include_code=False)]  # doctest: +SKIP
+            >>> records[0]["kind"]  # doctest: +SKIP
+            'node'
+        """
+        if self.source_code:
+            raise NotImplementedError("Producing a call graph over a single file is not implemented yet.")
+        return self.backend.iter_call_graph_ndjson(include_code=include_code)
+
+    def export_call_graph_ndjson(self, path: str | Path, include_code: bool = True) -> Path:
+        """Write the call graph to a newline-delimited JSON file, one record at a time.
+
+        Args:
+            path (str | Path): Output file.
+            include_code (bool): If True, node records include the method body. Defaults to True.
+
+        Returns:
+            Path: The written file.
+
+        Raises:
+            NotImplementedError: If single-file mode is used (unsupported here).
+
+        Examples:
+            >>> from cldk import CLDK
+            >>> ja = CLDK(language="java").analysis(project_path='path/to/project')
+            >>> ja.export_call_graph_ndjson('out/call_graph.ndjson').exists()  # doctest: +SKIP
+            True
+        """
+        if self.source_code:
+            raise NotImplementedError("Producing a call graph over a single file is not implemented yet.")
+        return self.backend.export_call_graph_ndjson(path, include_code=include_code)
+
     def get_callers(self, target_class_name: str, target_method_declaration: str, using_symbol_table: bool = False) -> Dict:
         """Return all callers of a target method.
 
@@ -596,11 +803,12 @@ class JavaAnalysis:
         """
         return self.backend.get_all_nested_classes(qualified_class_name)
 
-    def get_sub_classes(self, qualified_class_name) -> Dict[str, JType]:
+    def get_sub_classes(self, qualified_class_name, transitive: bool = False) -> Dict[str, JType]:
         """Return all subclasses of a class.
 
         Args:
             qualified_class_name (str): Qualified class name.
+            transitive (bool): If True, include indirect subclasses. Defaults to False.
 
         Returns:
             dict[str, JType]: Subclasses keyed by qualified name.
@@ -614,7 +822,28 @@ class JavaAnalysis:
             >>> isinstance(subs, dict)  # doctest: +SKIP
             True
         """
-        return self.backend.get_all_sub_classes(qualified_class_name=qualified_class_name)
+        return self.backend.get_all_sub_classes(qualified_class_name=qualified_class_name, transitive=transitive)
+
+    def get_super_classes(self, qualified_class_name: str, transitive: bool = False) -> List[str]:
+        """Return all classes and interfaces a class extends or implements.
+
+        Args:
+            qualified_class_name (str): Qualified class name.
+            transitive (bool): If True, include indirect superclasses. Defaults to False.
+
+        Returns:
+            list[str]: Qualified names of the superclasses and interfaces.
+
+        Examples:
+            List every supertype of a class (backend required):
+
+            >>> from cldk import CLDK
+            >>> ja = CLDK(language="java").analysis(project_path='path/to/project')
+            >>> supers = ja.get_super_classes('com.example.A', transitive=True)  # doctest: +SKIP
+            >>> isinstance(supers, list)  # doctest: +SKIP
+            True
+        """
+        return self.backend.get_all_super_classes(qualified_class_name, transitive=transitive)
 
     def get_extended_classes(self, qualified_class_name) -> List[str]:
         """Return all extended superclasses for a class.
@@ -726,6 +955,104 @@ class JavaAnalysis:
         """
         return self.backend.get_all_entry_point_methods()
 
+    def get_reachable_methods(self, methods: List[Tuple[str, str]]) -> Dict[str, Dict[str, JCallable]]:
+        """Return the methods reachable in the call graph from any of the given methods.
+
+        Closures are computed as bitsets over the call graph and cached per method, so
+        repeated and overlapping queries do not search the call graph again.
+
+        Args:
+            methods (list[tuple[str, str]]): (qualified class name, method signature) pairs to start from.
+
+        Returns:
+            dict[str, dict[str, JCallable]]: Reachable methods keyed by class, including the given methods.
+
+        Raises:
+            NotImplementedError: If single-file mode is used (unsupported here).
+
+        Examples:
+            >>> from cldk import CLDK
+            >>> ja = CLDK(language="java").analysis(project_path='path/to/project')
+            >>> reachable = ja.get_reachable_methods([('com.example.A', 'main(java.lang.String[])')])  # doctest: +SKIP
+            >>> isinstance(reachable, dict)  # doctest: +SKIP
+            True
+        """
+        if self.source_code:
+            raise NotImplementedError("Reachability over a single file is not implemented yet.")
+        return self.backend.get_reachable_methods(methods)
+
+    def get_reaching_methods(self, methods: List[Tuple[str, str]]) -> Dict[str, Dict[str, JCallable]]:
+        """Return the methods that reach any of the given methods in the call graph.
+
+        Args:
+            methods (list[tuple[str, str]]): (qualified class name, method signature) pairs to end at.
+
+        Returns:
+            dict[str, dict[str, JCallable]]: Reaching methods keyed by class, including the given methods.
+
+        Raises:
+            NotImplementedError: If single-file mode is used (unsupported here).
+
+        Examples:
+            >>> from cldk import CLDK
+            >>> ja = CLDK(language="java").analysis(project_path='path/to/project')
+            >>> reaching = ja.get_reaching_methods([('com.example.A', 'f()')])  # doctest: +SKIP
+            >>> isinstance(reaching, dict)  # doctest: +SKIP
+            True
+        """
+        if self.source_code:
+            raise NotImplementedError("Reachability over a single file is not implemented yet.")
+        return self.backend.get_reaching_methods(methods)
+
+    def get_reaching_entry_point_methods(self, methods: List[Tuple[str, str]]) -> Dict[str, Dict[str, JCallable]]:
+        """Return the entry-point methods that reach any of the given methods in the call graph.
+
+        Args:
+            methods (list[tuple[str, str]]): (qualified class name, method signature) pairs to end at.
+
+        Returns:
+            dict[str, dict[str, JCallable]]: Reaching entry-point methods keyed by class.
+
+        Raises:
+            NotImplementedError: If single-file mode is used (unsupported here).
+
+        Examples:
+            Find the entry points impacted by a change to a method (backend required):
+
+            >>> from cldk import CLDK
+            >>> ja = CLDK(language="java").analysis(project_path='path/to/project')
+            >>> impacted = ja.get_reaching_entry_point_methods([('com.example.A', 'f()')])  # doctest: +SKIP
+            >>> isinstance(impacted, dict)  # doctest: +SKIP
+            True
+        """
+        if self.source_code:
+            raise NotImplementedError("Reachability over a single file is not implemented yet.")
+        return self.backend.get_reaching_entry_point_methods(methods)
+
+    def get_unreachable_methods(self) -> Dict[str, Dict[str, JCallable]]:
+        """Return the methods that no entry-point method reaches in the call graph.
+
+        The result is a list of dead-code candidates: methods invoked only by reflection,
+        by a framework without being marked as entry points, or through calls the call
+        graph does not resolve are reported as well.
+
+        Returns:
+            dict[str, dict[str, JCallable]]: Unreachable methods keyed by class.
+
+        Raises:
+            NotImplementedError: If single-file mode is used (unsupported here).
+
+        Examples:
+            >>> from cldk import CLDK
+            >>> ja = CLDK(language="java").analysis(project_path='path/to/project')
+            >>> dead = ja.get_unreachable_methods()  # doctest: +SKIP
+            >>> isinstance(dead, dict)  # doctest: +SKIP
+            True
+        """
+        if self.source_code:
+            raise NotImplementedError("Reachability over a single file is not implemented yet.")
+        return self.backend.get_unreachable_methods()
+
     def remove_all_comments(self) -> str:
         """Remove all comments from the source code.
 
@@ -20,6 +20,9 @@ Provides the top-level CLDK entry point used to initialize language-specific
 analysis, Treesitter parsers, and related utilities.
 """
 
+import asyncio
+from concurrent.futures import Executor, ThreadPoolExecutor
+from functools import partial
 from pathlib import Path
 
 import logging
@@ -28,8 +31,10 @@ from typing import List
 from cldk.analysis import AnalysisLevel
 from cldk.analysis.c import CAnalysis
 from cldk.analysis.java import JavaAnalysis
+from cldk.analysis.java.codeanalyzer import JCodeanalyzer
 from cldk.analysis.commons.treesitter import TreesitterJava
 from cldk.analysis.python.python_analysis import PythonAnalysis
+from cldk.models.java import JApplication
 from cldk.utils.exceptions import CldkInitializationException
 from cldk.utils.sanitization.java import TreesitterSanitizer
 
@@ -61,6 +66,14 @@ class CLDK:
         target_files: List[str] | None = None,
         analysis_backend_path: str | None = None,
         analysis_json_path: str | Path = None,
+        lazy_symbol_table: bool = False,
+        snapshot_cache: bool = False,
+        use_daemon: bool = False,
+        incremental: bool = False,
+        shard_modules: bool = False,
+        max_shard_workers: int | None = None,
+        trusted_input: bool = False,
+        externalize_code: bool = False,
     ) -> JavaAnalysis | PythonAnalysis | CAnalysis:
         """Initialize a language-specific analysis façade.
 
@@ -72,6 +85,14 @@ class CLDK:
             target_files (list[str] | None): Files to constrain analysis (optional).
             analysis_backend_path (str | None): Path to the analysis backend.
             analysis_json_path (str | Path | None): Path to persist analysis database.
+            lazy_symbol_table (bool): Java only. If True, compilation units are validated on first access.
+            snapshot_cache (bool): Java only. If True, cache the validated analysis and the call graph next to analysis.json.
+            use_daemon (bool): Java only. If True, run codeanalyzer in a persistent JVM worker.
+            incremental (bool): Java only. If True, re-analyze only the files changed since analysis.json was written.
+            shard_modules (bool): Java only. If True, analyze the modules of a multi-module build in parallel.
+            max_shard_workers (int | None): Java only. Maximum number of parallel module analyses.
+            trusted_input (bool): Java only. If True, build the models from codeanalyzer output without validation.
+            externalize_code (bool): Java only. If True, read method bodies from the source files on access instead of keeping them in memory.
 
         Returns:
             JavaAnalysis | PythonAnalysis | CAnalysis: Initialized analysis façade for the chosen language.
@@ -106,6 +127,14 @@ class CLDK:
                 analysis_json_path=analysis_json_path,
                 target_files=target_files,
                 eager_analysis=eager,
+                lazy_symbol_table=lazy_symbol_table,
+                snapshot_cache=snapshot_cache,
+                use_daemon=use_daemon,
+                incremental=incremental,
+                shard_modules=shard_modules,
+                max_shard_workers=max_shard_workers,
+                trusted_input=trusted_input,
+                externalize_code=externalize_code,
             )
         elif self.language == "python":
             return PythonAnalysis(
@@ -117,6 +146,85 @@ class CLDK:
         else:
             raise NotImplementedError(f"Analysis support for {self.language} is not implemented yet.")
 
+    async def analysis_async(self, executor: Executor | None = None, **kwargs) -> JavaAnalysis | PythonAnalysis | CAnalysis:
+        """Initialize a language-specific analysis façade without blocking the event loop.
+
+        The analysis, including its codeanalyzer run, is built in a worker thread of executor. The thread
+        is busy for the whole analysis, so the number of analyses that run at a time is bounded by the
+        number of threads of the executor.
+
+        Args:
+            executor (Executor | None): The executor to build the analysis in. Defaults to the default executor
+                of the event loop, which has min(32, os.cpu_count() + 4) threads.
+            **kwargs: The keyword arguments of :meth:`analysis`.
+
+        Returns:
+            JavaAnalysis | PythonAnalysis | CAnalysis: Initialized analysis façade for the chosen language.
+
+        Raises:
+            CldkInitializationException: If both or neither of project_path and source_code are provided.
+            NotImplementedError: If the specified language is unsupported.
+
+        Examples:
+            >>> import asyncio
+            >>> from cldk import CLDK
+            >>> analysis = asyncio.run(CLDK(language="java").analysis_async(project_path='path/to/project'))  # doctest: +SKIP
+        """
+        return await asyncio.get_running_loop().run_in_executor(executor, partial(self.analysis, **kwargs))
+
+    async def analyses_async(self, project_paths: List[str | Path], max_concurrency: int = 4, **kwargs) -> List[JavaAnalysis | PythonAnalysis | CAnalysis]:
+        """Analyze many projects concurrently.
+
+        The analyses are built in a thread pool of their own with max_concurrency threads, so max_concurrency
+        is not limited by the default executor of the event loop.
+
+        Args:
+            project_paths (list[str | Path]): Directory paths of the projects.
+            max_concurrency (int): Maximum number of analyses that run at a time. Defaults to 4.
+            **kwargs: Further keyword arguments of :meth:`analysis`, applied to every project.
+
+        Returns:
+            list[JavaAnalysis | PythonAnalysis | CAnalysis]: One analysis per project, in the order of project_paths.
+
+        Examples:
+            >>> import asyncio
+            >>> from cldk import CLDK
+            >>> analyses = asyncio.run(CLDK(language="java").analyses_async(['path/to/a', 'path/to/b'], max_concurrency=2))  # doctest: +SKIP
+        """
+        executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="cldk-analysis")
+        try:
+            return list(await asyncio.gather(*(self.analysis_async(executor=executor, project_path=project_path, **kwargs) for project_path in project_paths)))
+        finally:
+            # Every analysis has finished, or has failed and the others are not waited for
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def analyze_snippets(self, snippets: List[str], analysis_backend_path: str | None = None, use_daemon: bool = False) -> List[JApplication]:
+        """Analyze many source snippets with a single backend invocation.
+
+        Args:
+            snippets (list[str]): Source code of the snippets.
+            analysis_backend_path (str | None): Path to the analysis backend.
+            use_daemon (bool): Java only. If True, run codeanalyzer in a persistent JVM worker.
+
+        Returns:
+            list[JApplication]: One application per snippet, in the order of snippets.
+
+        Raises:
+            NotImplementedError: If the language is unsupported.
+
+        Examples:
+            Analyze two Java snippets at once (backend required):
+
+            >>> from cldk import CLDK
+            >>> apps = CLDK(language="java").analyze_snippets(['public class A {}', 'public class B {}'])  # doctest: +SKIP
+            >>> [list(app.symbol_table.values())[0].type_declarations.keys() for app in apps]  # doctest: +SKIP
+            [dict_keys(['A']), dict_keys(['B'])]
+        """
+        if self.language == "java":
+            return JCodeanalyzer.analyze_snippets(snippets, analysis_backend_path=analysis_backend_path, use_daemon=use_daemon)
+        else:
+            raise NotImplementedError(f"Snippet analysis for {self.language} is not implemented yet.")
+
     def treesitter_parser(self):
         """Return a Treesitter parser for the selected language.
 
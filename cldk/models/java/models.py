@@ -17,11 +17,16 @@
 """
 Models module
 """
-from typing import Any, Dict, List, Optional, Union
-from pydantic import BaseModel, field_validator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+from pydantic import BaseModel, PrivateAttr, field_validator, model_validator
 from cldk.models.java.enums import CRUDOperationType, CRUDQueryType
+from cldk.utils.source_reader import read_code_block
 
-_CALLABLES_LOOKUP_TABLE = dict()
+# The callables of the application being validated, keyed by (type declaration, signature). Graph edges
+# are resolved against it. Every JApplication owns its registry, so nothing outlives the application.
+_CALLABLES_REGISTRY: ContextVar[Dict[Tuple[str, str], "JCallable"] | None] = ContextVar("callables_registry", default=None)
 
 
 class JComment(BaseModel):
@@ -254,6 +259,12 @@ class InitializationBlock(BaseModel):
     variable_declarations: List[JVariableDeclaration]
     cyclomatic_complexity: int
 
+    def __getattr__(self, item: str) -> Any:
+        # The code of an externalized block is read from its source file on access.
+        if item == "code" and self.__pydantic_private__ and "code_file" in self.__pydantic_private__:
+            return read_code_block(self.__pydantic_private__["code_file"], self.start_line, self.end_line)
+        return super().__getattr__(item)
+
 
 class JCallable(BaseModel):
     """Represents a callable entity such as a method or constructor in Java.
@@ -312,6 +323,12 @@ class JCallable(BaseModel):
         """
         return hash(self.declaration)
 
+    def __getattr__(self, item: str) -> Any:
+        # The code of an externalized callable is read from its source file on access.
+        if item == "code" and self.__pydantic_private__ and "code_file" in self.__pydantic_private__:
+            return read_code_block(self.__pydantic_private__["code_file"], self.code_start_line, self.end_line)
+        return super().__getattr__(item)
+
 
 class JType(BaseModel):
     """Represents a Java class or interface.
@@ -435,9 +452,13 @@ class JGraphEdges(BaseModel):
     @classmethod
     def validate_source(cls, value) -> JMethodDetail:
         _, type_declaration, signature = value["file_path"], value["type_declaration"], value["signature"]
-        j_callable: JCallable = _CALLABLES_LOOKUP_TABLE.get(
-            (type_declaration, signature),
-            JCallable(
+        callables = _CALLABLES_REGISTRY.get()
+        if callables is None:
+            # Edges validated outside of an application resolve to implicit callables only.
+            callables = {}
+        j_callable: JCallable | None = callables.get((type_declaration, signature))
+        if j_callable is None:
+            j_callable = JCallable(
                 signature=signature,
                 is_implicit=True,
                 is_constructor="<init>" in value["callable_declaration"],
@@ -463,9 +484,8 @@ class JGraphEdges(BaseModel):
                 crud_operations=[],
                 crud_queries=[],
                 cyclomatic_complexity=0,
-            ),
-        )
-        _CALLABLES_LOOKUP_TABLE[(type_declaration, signature)] = j_callable
+            )
+            callables[(type_declaration, signature)] = j_callable
         class_name = type_declaration
         method_decl = j_callable.declaration
         return JMethodDetail(method_declaration=method_decl, klass=class_name, method=j_callable)
@@ -490,13 +510,90 @@ class JApplication(BaseModel):
     call_graph: List[JGraphEdges] = None
     system_dependency_graph: List[JGraphEdges] = None
 
+    _callables: Dict[Tuple[str, str], JCallable] = PrivateAttr(default_factory=dict)
+
+    @model_validator(mode="wrap")
+    @classmethod
+    def scope_callables(cls, data, handler) -> "JApplication":
+        # The symbol table registers its callables in a fresh registry that the graph edges are then
+        # resolved against, and which is handed over to the validated application.
+        if isinstance(data, cls):
+            return handler(data)
+        callables: Dict[Tuple[str, str], JCallable] = {}
+        with callables_scope(callables):
+            application = handler(data)
+        application._callables = callables
+        return application
+
     @field_validator("symbol_table", mode="after")
     @classmethod
     def validate_source(cls, symbol_table) -> Dict[str, JCompilationUnit]:
-        # Populate the lookup table for callables
-        for _, j_compulation_unit in symbol_table.items():
-            for type_declaration, jtype in j_compulation_unit.type_declarations.items():
-                for __, j_callable in jtype.callable_declarations.items():
-                    _CALLABLES_LOOKUP_TABLE[(type_declaration, j_callable.signature)] = j_callable
+        # Populate the callable registry of the application
+        callables = _CALLABLES_REGISTRY.get()
+        if callables is not None:
+            for _, j_compulation_unit in symbol_table.items():
+                register_callables(j_compulation_unit, callables)
 
         return symbol_table
+
+    @property
+    def callables(self) -> Dict[Tuple[str, str], JCallable]:
+        """The callables of the application keyed by (type declaration, signature), used to resolve graph edges."""
+        return self._callables
+
+    def release_callables(self) -> None:
+        """Releases the callable registry of the application."""
+        self._callables.clear()
+
+
+@contextmanager
+def callables_scope(callables: Dict[Tuple[str, str], JCallable]) -> Iterator[Dict[Tuple[str, str], JCallable]]:
+    """Resolves the graph edges validated within the context against the given callables.
+
+    Args:
+        callables (Dict[Tuple[str, str], JCallable]): The callable registry, usually :attr:`JApplication.callables`.
+
+    Yields:
+        Dict[Tuple[str, str], JCallable]: The callable registry.
+    """
+    token = _CALLABLES_REGISTRY.set(callables)
+    try:
+        yield callables
+    finally:
+        _CALLABLES_REGISTRY.reset(token)
+
+
+def register_callables(compilation_unit: JCompilationUnit, callables: Dict[Tuple[str, str], JCallable]) -> None:
+    """Adds the callables of a compilation unit to a callable registry used to resolve graph edges.
+
+    Args:
+        compilation_unit (JCompilationUnit): The compilation unit whose callables are registered.
+        callables (Dict[Tuple[str, str], JCallable]): The callable registry, usually :attr:`JApplication.callables`.
+    """
+    for type_declaration, jtype in compilation_unit.type_declarations.items():
+        for _, j_callable in jtype.callable_declarations.items():
+            callables[(type_declaration, j_callable.signature)] = j_callable
+
+
+def externalize_code_bodies(compilation_unit: JCompilationUnit, file_path: str) -> None:
+    """Drops the code of the callables and initialization blocks of a compilation unit.
+
+    Only the line span of each body is kept; its ``code`` attribute then reads the body from the
+    source file when it is accessed. Serializing an externalized model (e.g., ``model_dump``)
+    omits the code.
+
+    Args:
+        compilation_unit (JCompilationUnit): The compilation unit.
+        file_path (str): The path of the source file of the compilation unit.
+    """
+
+    def drop_code(model: BaseModel, start_line: int) -> None:
+        if start_line > 0 and model.__dict__.get("code"):
+            del model.__dict__["code"]
+            object.__setattr__(model, "__pydantic_private__", {**(model.__pydantic_private__ or {}), "code_file": file_path})
+
+    for jtype in compilation_unit.type_declarations.values():
+        for j_callable in jtype.callable_declarations.values():
+            drop_code(j_callable, j_callable.code_start_line)
+        for initialization_block in jtype.initialization_blocks or []:
+            drop_code(initialization_block, initialization_block.start_line)
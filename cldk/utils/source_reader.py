@@ -0,0 +1,138 @@
+################################################################################
+# Copyright IBM Corporation 2024
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+################################################################################
+
+"""
+Source reader module
+
+Serves line spans of source files from memory maps. The most recently used
+files stay mapped, along with the offsets of their lines, so repeated reads
+from the same files neither re-open nor re-scan them.
+"""
+
+import logging
+import mmap
+import os
+import threading
+from array import array
+from collections import OrderedDict
+from typing import Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class SourceReader:
+    """A memory-mapped reader of source file line spans with an LRU of mapped files.
+
+    Args:
+        max_open_files (int): The number of files that are kept mapped. Defaults to 32.
+    """
+
+    def __init__(self, max_open_files: int = 32) -> None:
+        self.max_open_files = max_open_files
+        self._files: OrderedDict[str, Tuple[int, mmap.mmap | None, array]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _map(self, file_path: str) -> Tuple[mmap.mmap | None, array]:
+        """Return the memory map (None for an empty file) and the line start offsets of a file."""
+        mtime_ns = os.stat(file_path).st_mtime_ns
+        entry = self._files.get(file_path)
+        if entry is not None and entry[0] == mtime_ns:
+            self._files.move_to_end(file_path)
+            return entry[1], entry[2]
+        if entry is not None:
+            self._unmap(file_path)
+        with open(file_path, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if os.fstat(f.fileno()).st_size else None
+        line_starts = array("q", [0])
+        if mapped is not None:
+            position = mapped.find(b"\n")
+            while position != -1:
+                line_starts.append(position + 1)
+                position = mapped.find(b"\n", position + 1)
+        self._files[file_path] = (mtime_ns, mapped, line_starts)
+        while len(self._files) > self.max_open_files:
+            self._unmap(next(iter(self._files)))
+        return mapped, line_starts
+
+    def _unmap(self, file_path: str) -> None:
+        _, mapped, _ = self._files.pop(file_path)
+        if mapped is not None:
+            mapped.close()
+
+    def read_lines(self, file_path: str, start_line: int, end_line: int) -> str:
+        """Read a span of lines of a file.
+
+        Args:
+            file_path (str): The path of the file.
+            start_line (int): The first line of the span (1-based).
+            end_line (int): The last line of the span (inclusive).
+
+        Returns:
+            str: The text of the lines, with their original line endings.
+
+        Raises:
+            OSError: If the file cannot be read.
+        """
+        with self._lock:
+            mapped, line_starts = self._map(file_path)
+            if mapped is None or start_line < 1 or start_line > len(line_starts) or end_line < start_line:
+                return ""
+            end = line_starts[end_line] if end_line < len(line_starts) else len(mapped)
+            return mapped[line_starts[start_line - 1] : end].decode("utf-8", errors="replace")
+
+    def clear(self) -> None:
+        """Unmap all files."""
+        with self._lock:
+            while self._files:
+                self._unmap(next(iter(self._files)))
+
+
+# The reader shared by all externalized code blocks.
+source_reader = SourceReader()
+
+
+def read_code_block(file_path: str, start_line: int, end_line: int) -> str:
+    """Read the braced code block that opens on start_line and closes on end_line.
+
+    The block runs from the first opening brace on start_line that is not inside parentheses
+    (which skips annotation arguments) to the last closing brace on end_line. This matches the
+    code that codeanalyzer reports for callables and initialization blocks.
+
+    Args:
+        file_path (str): The path of the source file.
+        start_line (int): The line the block opens on.
+        end_line (int): The line the block closes on.
+
+    Returns:
+        str: The code block, or an empty string if the file cannot be read.
+    """
+    try:
+        lines = source_reader.read_lines(file_path, start_line, end_line)
+    except OSError as e:
+        logger.warning(f"Unable to read the code of {file_path}:{start_line}-{end_line}: {e}")
+        return ""
+    start, depth = 0, 0
+    for position, char in enumerate(lines):
+        if char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        elif char == "{" and depth <= 0:
+            start = position
+            break
+        elif char == "\n":
+            break
+    return lines[start : lines.rfind("}") + 1]
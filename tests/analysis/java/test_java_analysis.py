@@ -18,18 +18,23 @@
 Java Tests
 """
 
+import asyncio
 import os
 import json
+import threading
+import time
 from typing import Dict, List, Set, Tuple
 from unittest.mock import patch, MagicMock
 
 from tree_sitter import Tree
 import pytest
 import networkx as nx
+import pyarrow.compute as pc
 
 from cldk import CLDK
 from cldk.analysis import AnalysisLevel
 from cldk.analysis.java import JavaAnalysis
+from cldk.analysis.java.columnar import read_parquet
 from cldk.models.java.models import JCallable, JCallableParameter, JComment, JCompilationUnit, JField, JMethodDetail, JApplication, JType
 
 
@@ -50,6 +55,50 @@ def test_get_symbol_table_is_not_null(test_fixture, analysis_json):
         )
         assert analysis.get_symbol_table() is not None
 
+def test_analyses_async(test_fixture, analysis_json):
+    """Should build the analyses in a thread pool of max_concurrency threads without blocking the event loop"""
+    lock = threading.Lock()
+    running, max_running, threads = 0, 0, set()
+
+    def run(*args, **kwargs):
+        nonlocal running, max_running
+        with lock:
+            running += 1
+            max_running = max(max_running, running)
+            threads.add(threading.current_thread().name)
+        time.sleep(0.1)
+        with lock:
+            running -= 1
+        return MagicMock(stdout=analysis_json, returncode=0)
+
+    async def analyze():
+        ticks = 0
+
+        async def tick():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        ticker = asyncio.create_task(tick())
+        analyses = await CLDK(language="java").analyses_async([test_fixture] * 3, max_concurrency=2, analysis_level=AnalysisLevel.symbol_table)
+        ticker.cancel()
+        return analyses, ticks
+
+    with patch("cldk.analysis.java.codeanalyzer.codeanalyzer.subprocess.run", side_effect=run) as run_mock:
+        analyses, ticks = asyncio.run(analyze())
+
+    assert run_mock.call_count == 3
+    assert max_running == 2
+    assert all(thread.startswith("cldk-analysis") for thread in threads)
+    # The event loop kept running while the analyses were built
+    assert ticks > 0
+    assert len(analyses) == 3
+    for analysis in analyses:
+        assert isinstance(analysis, JavaAnalysis)
+        assert len(analysis.get_symbol_table()) > 0
+
+
 def test_get_symbol_table_source_code(java_code):
     """Should return a symbol table for source analysis with expected class/method count"""
 
@@ -210,6 +259,52 @@ def test_get_symbol_table(test_fixture, analysis_json):
             assert isinstance(compilation_unit, JCompilationUnit)
 
 
+def test_close(test_fixture, analysis_json):
+    """Should release the application view and its callables when used as a context manager"""
+
+    # Patch subprocess so that it does not run codeanalyzer
+    with patch("cldk.analysis.java.codeanalyzer.codeanalyzer.subprocess.run") as run_mock:
+        run_mock.return_value = MagicMock(stdout=analysis_json, returncode=0)
+        with CLDK(language="java").analysis(project_path=test_fixture, analysis_backend_path=None, eager=True, analysis_level=AnalysisLevel.call_graph) as java_analysis:
+            application = java_analysis.get_application_view()
+            assert len(application.callables) > 0
+
+        assert java_analysis.backend.application is None
+        assert len(application.callables) == 0
+
+
+def test_get_symbol_table_arrow(test_fixture, analysis_json, tmp_path):
+    """Should export the symbol table as Arrow tables and round-trip them through Parquet"""
+
+    # Patch subprocess so that it does not run codeanalyzer
+    with patch("cldk.analysis.java.codeanalyzer.codeanalyzer.subprocess.run") as run_mock:
+        run_mock.return_value = MagicMock(stdout=analysis_json, returncode=0)
+        java_analysis = JavaAnalysis(
+            project_dir=test_fixture,
+            source_code=None,
+            analysis_backend_path=None,
+            analysis_json_path=None,
+            analysis_level=AnalysisLevel.symbol_table,
+            target_files=None,
+            eager_analysis=False,
+        )
+
+        tables = java_analysis.get_symbol_table_arrow()
+        methods = java_analysis.get_methods()
+        assert tables["compilation_units"].num_rows == len(java_analysis.get_symbol_table())
+        assert tables["types"].num_rows == len(java_analysis.get_classes())
+        assert tables["callables"].num_rows == sum(len(callables) for callables in methods.values())
+        assert tables["call_sites"].num_rows == sum(len(c.call_sites) for callables in methods.values() for c in callables.values())
+        assert pc.max(tables["callables"]["cyclomatic_complexity"]).as_py() == max(c.cyclomatic_complexity for callables in methods.values() for c in callables.values())
+        assert tables["callables"]["code"].null_count == tables["callables"].num_rows
+
+        files = java_analysis.export_symbol_table_parquet(tmp_path / "parquet")
+        assert set(files) == set(tables)
+        loaded = read_parquet(tmp_path / "parquet")
+        for name, table in tables.items():
+            assert loaded[name].equals(table)
+
+
 def test_get_compilation_units(test_fixture, analysis_json):
     """Should return the compilation units"""
 
@@ -246,10 +341,14 @@ def test_get_class_hierarchy(test_fixture, analysis_json):
             eager_analysis=False,
         )
 
-        # When this is implemented please add a real test case
-        with pytest.raises(NotImplementedError) as except_info:
-            java_analysis.get_class_hierarchy()
-        assert except_info.type == NotImplementedError
+        class_hierarchy = java_analysis.get_class_hierarchy()
+        assert isinstance(class_hierarchy, nx.DiGraph)
+        assert class_hierarchy.has_edge("java.util.Properties", "com.ibm.websphere.samples.pbw.utils.ListProperties")
+        assert class_hierarchy.edges["java.util.Properties", "com.ibm.websphere.samples.pbw.utils.ListProperties"]["type"] == "EXTENDS"
+        assert isinstance(class_hierarchy.nodes["com.ibm.websphere.samples.pbw.utils.ListProperties"]["type_declaration"], JType)
+        assert "type_declaration" not in class_hierarchy.nodes["java.util.Properties"]
+        assert java_analysis.get_super_classes("com.ibm.websphere.samples.pbw.utils.ListProperties") == ["java.util.Properties"]
+        assert list(java_analysis.get_sub_classes("java.util.Properties", transitive=True)) == ["com.ibm.websphere.samples.pbw.utils.ListProperties"]
 
 
 def test_is_parsable(test_fixture, analysis_json):
@@ -884,6 +983,49 @@ def test_get_entry_point_methods(test_fixture, analysis_json):
                 assert isinstance(method, JCallable)
 
 
+def test_get_unreachable_methods(test_fixture, analysis_json):
+    """Should return the methods that no entry point method reaches"""
+
+    # Patch subprocess so that it does not run codeanalyzer
+    with patch("cldk.analysis.java.codeanalyzer.codeanalyzer.subprocess.run") as run_mock:
+        run_mock.return_value = MagicMock(stdout=analysis_json, returncode=0)
+        java_analysis = JavaAnalysis(
+            project_dir=test_fixture,
+            source_code=None,
+            analysis_backend_path=None,
+            analysis_json_path=None,
+            analysis_level=AnalysisLevel.call_graph,
+            target_files=None,
+            eager_analysis=False,
+        )
+
+        unreachable_methods = java_analysis.get_unreachable_methods()
+        assert isinstance(unreachable_methods, Dict)
+        assert len(unreachable_methods) > 0
+
+        # The entry point AdminServlet.performPopulate calls new Populate(...)
+        entry_point = ("com.ibm.websphere.samples.pbw.war.AdminServlet", "performPopulate(javax.servlet.http.HttpServletRequest, javax.servlet.http.HttpServletResponse)")
+        constructor = (
+            "com.ibm.websphere.samples.pbw.war.Populate",
+            "<init>(com.ibm.websphere.samples.pbw.bean.ResetDBBean, com.ibm.websphere.samples.pbw.bean.CatalogMgr, "
+            "com.ibm.websphere.samples.pbw.bean.CustomerMgr, com.ibm.websphere.samples.pbw.bean.BackOrderMgr, com.ibm.websphere.samples.pbw.bean.SuppliersBean)",
+        )
+        assert entry_point[1] in java_analysis.get_entry_point_methods()[entry_point[0]]
+        assert constructor[1] not in unreachable_methods.get(constructor[0], {})
+        # Constructors are found and returned under their symbol table signature
+        assert java_analysis.get_reachable_methods([entry_point])[constructor[0]][constructor[1]] is java_analysis.get_method(*constructor)
+        assert entry_point[1] in java_analysis.get_reaching_methods([constructor])[entry_point[0]]
+
+        entry_point_methods = java_analysis.get_entry_point_methods()
+        reachable_methods = java_analysis.get_reachable_methods([(typename, signature) for typename, methods in entry_point_methods.items() for signature in methods])
+        for typename, methods in java_analysis.get_methods().items():
+            for signature, method in methods.items():
+                if signature in entry_point_methods.get(typename, {}):
+                    continue
+                # Every method is either reachable from an entry point or unreachable
+                assert (signature in reachable_methods.get(typename, {})) != (signature in unreachable_methods.get(typename, {}))
+
+
 def test_remove_all_comments(test_fixture, analysis_json):
     """remove all comments"""
 
@@ -294,6 +294,26 @@ def test_get_calling_lines():
     assert len(calling_lines) == 0
 
 
+def test_get_calling_lines_by_name():
+    """get the calling lines of all calls in a single parse"""
+    java_sitter = TreesitterJava()
+
+    source_method_code = """
+    public void run() {
+        log("start");
+        Iterator<?> it = items.iterator();
+        while (it.hasNext()) {
+            log(it.next());
+        }
+    }
+"""
+    calling_lines = java_sitter.get_calling_lines_by_name(source_method_code)
+    assert calling_lines["log"] == [2, 5]
+    assert calling_lines["hasNext"] == [4]
+    assert calling_lines["log"] == java_sitter.get_calling_lines(source_method_code, "log(java.lang.String)")
+    assert java_sitter.get_calling_lines_by_name("") == {}
+
+
 def test_get_test_methods(test_fixture):
     """Should return the test methods"""
     java_sitter = TreesitterJava()
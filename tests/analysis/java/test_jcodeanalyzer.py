@@ -20,13 +20,30 @@ Test Cases for JCodeanalyzer
 
 import os
 import json
+import pickle
+import shutil
+import sys
+import threading
+from pathlib import Path
 from typing import Dict, List, Tuple
 from unittest.mock import patch, MagicMock
 import networkx as nx
 
 from cldk.analysis import AnalysisLevel
 from cldk.analysis.java.codeanalyzer import JCodeanalyzer
-from cldk.models.java.models import JApplication, JCRUDOperation, JType, JCallable, JCompilationUnit, JMethodDetail
+from cldk.analysis.java.codeanalyzer.call_site_index import CallSiteIndex
+from cldk.analysis.java.codeanalyzer.compact_call_graph import CompactCallGraphBuilder
+from cldk.analysis.java.codeanalyzer.daemon import WORKER_SOURCE, CodeanalyzerDaemon
+from cldk.analysis.java.codeanalyzer.dispatch_table import DispatchTable
+from cldk.analysis.java.codeanalyzer.incremental import merge_analysis
+from cldk.analysis.java.codeanalyzer.loader import LazySymbolTable, load_japplication
+from cldk.analysis.java.codeanalyzer.manifest import load_manifest
+from cldk.analysis.java.codeanalyzer.reachability import Reachability
+from cldk.analysis.java.codeanalyzer.sharding import discover_modules, merge_shards
+from cldk.analysis.java.codeanalyzer.signatures import symbol_table_signature
+from cldk.analysis.java.codeanalyzer.snapshot import file_sha256
+from cldk.analysis.java.codeanalyzer.type_hierarchy import TypeHierarchy
+from cldk.models.java.models import JApplication, JCRUDOperation, JType, JCallable, JCallSite, JCompilationUnit, JMethodDetail
 from cldk.models.java import JGraphEdges
 
 
@@ -50,6 +67,168 @@ def test_init_japplication(test_fixture, codeanalyzer_jar_path, analysis_json):
         assert isinstance(app, JApplication)
 
 
+def test_load_japplication_streaming(analysis_json, analysis_json_fixture):
+    """Should stream analysis.json into the same JApplication as a full parse"""
+    expected = JApplication(**json.loads(analysis_json)).model_dump()
+
+    # A tiny chunk size forces values to straddle buffer boundaries
+    with open(analysis_json_fixture / "analysis.json", encoding="utf-8") as f:
+        app = load_japplication(f, chunk_size=7)
+    assert app.model_dump() == expected
+    assert load_japplication(analysis_json).model_dump() == expected
+
+
+def test_load_japplication_interns_strings(analysis_json):
+    """Should share one string object between equal type names, modifiers and graph edge endpoints"""
+    app = load_japplication(analysis_json)
+    receiver_types, modifiers = {}, {}
+    for compilation_unit in app.symbol_table.values():
+        for jtype in compilation_unit.type_declarations.values():
+            for j_callable in jtype.callable_declarations.values():
+                for modifier in j_callable.modifiers:
+                    modifiers.setdefault(modifier, set()).add(id(modifier))
+                for call_site in j_callable.call_sites:
+                    receiver_types.setdefault(call_site.receiver_type, set()).add(id(call_site.receiver_type))
+    assert receiver_types and all(len(ids) == 1 for ids in receiver_types.values())
+    assert modifiers and all(len(ids) == 1 for ids in modifiers.values())
+
+    klasses = {}
+    for edge in app.call_graph:
+        for endpoint in (edge.source, edge.target):
+            klasses.setdefault(endpoint.klass, set()).add(id(endpoint.klass))
+    assert all(len(ids) == 1 for ids in klasses.values())
+
+
+def test_load_japplication_trusted(analysis_json, analysis_json_fixture):
+    """Should construct the output of a supported codeanalyzer version without validation into an equal JApplication"""
+    expected = load_japplication(analysis_json)
+
+    with patch("cldk.analysis.java.codeanalyzer.loader.JCompilationUnit.model_validate") as validate_mock:
+        with open(analysis_json_fixture / "analysis.json", encoding="utf-8") as f:
+            app = load_japplication(f, trusted=True)
+        validate_mock.assert_not_called()
+    assert app.model_dump() == expected.model_dump()
+    assert app.callables.keys() == expected.callables.keys()
+    edge = app.call_graph[0]
+    assert app.callables.get((edge.source.klass, edge.source.method.signature), edge.source.method) is edge.source.method
+    lazy_app = load_japplication(analysis_json, lazy=True, trusted=True)
+    assert {file_path: compilation_unit.model_dump() for file_path, compilation_unit in lazy_app.symbol_table.items()} == expected.model_dump()["symbol_table"]
+
+    # Output of another major version is validated
+    version = json.loads(analysis_json)["version"]
+    other_version = analysis_json.replace(f'"version": "{version}"', '"version": "99.0.0"')
+    with patch("cldk.analysis.java.codeanalyzer.loader.construct_model") as construct_mock:
+        assert load_japplication(other_version, trusted=True).model_dump() == expected.model_dump()
+        construct_mock.assert_not_called()
+
+
+def test_externalize_code(analysis_json, test_fixture_pbw):
+    """Should drop code bodies at load time and read them from the source files on access"""
+    analyzed_project_dir = "/Users/sinhas/workspace/codellm-devkit/tests/resources/java/application/plantsbywebsphere"
+    analysis_json = analysis_json.replace(analyzed_project_dir, str(Path(test_fixture_pbw).absolute()))
+    expected = load_japplication(analysis_json)
+    app = load_japplication(analysis_json, externalize_code=True)
+
+    num_externalized = 0
+    for file_path, compilation_unit in app.symbol_table.items():
+        for type_name, jtype in compilation_unit.type_declarations.items():
+            for signature, j_callable in jtype.callable_declarations.items():
+                expected_code = expected.symbol_table[file_path].type_declarations[type_name].callable_declarations[signature].code
+                if "code" not in j_callable.__dict__:
+                    num_externalized += 1
+                    assert "code" not in j_callable.model_dump()
+                assert j_callable.code.replace("\r\n", "\n") == expected_code.replace("\r\n", "\n")
+    assert num_externalized > 0
+
+    # Externalized callables stay externalized through pickling, e.g., in snapshots
+    unpickled = pickle.loads(pickle.dumps(app))
+    externalized = [c for cu in unpickled.symbol_table.values() for t in cu.type_declarations.values() for c in t.callable_declarations.values() if "code" not in c.__dict__]
+    assert len(externalized) == num_externalized and externalized[0].code.startswith("{")
+
+
+def test_lazy_symbol_table(test_fixture, analysis_json):
+    """Should validate only the compilation units that are queried in lazy mode"""
+
+    # Patch subprocess so that it does not run codeanalyzer
+    with patch("cldk.analysis.java.codeanalyzer.codeanalyzer.subprocess.run") as run_mock:
+        run_mock.return_value = MagicMock(stdout=analysis_json, returncode=0)
+        code_analyzer = JCodeanalyzer(
+            project_dir=test_fixture,
+            source_code=None,
+            analysis_backend_path=None,
+            analysis_json_path=None,
+            analysis_level=AnalysisLevel.symbol_table,
+            eager_analysis=False,
+            target_files=None,
+            lazy_symbol_table=True,
+        )
+        symbol_table = code_analyzer.get_symbol_table()
+        assert isinstance(symbol_table, LazySymbolTable)
+        assert len(symbol_table) > 1
+
+        # No compilation unit is validated before it is queried
+        assert not any(symbol_table.is_materialized(file_path) for file_path in symbol_table)
+
+        class_name = "com.ibm.websphere.samples.pbw.utils.ListProperties"
+        java_file = code_analyzer.get_java_file(class_name)
+        assert java_file is not None
+        klass = code_analyzer.get_class(class_name)
+        assert isinstance(klass, JType)
+        assert symbol_table.is_materialized(java_file)
+        assert isinstance(code_analyzer.get_method(class_name, "load(java.io.InputStream)"), JCallable)
+        assert code_analyzer.get_class("com.example.DoesNotExist") is None
+        assert {file_path for file_path in symbol_table if symbol_table.is_materialized(file_path)} == {java_file}
+
+
+def test_lazy_symbol_table_decodes_records_once(analysis_json):
+    """Should index the types of the raw compilation units without decoding them again"""
+
+    with patch("json.loads", wraps=json.loads) as loads_mock:
+        symbol_table = load_japplication(analysis_json, lazy=True).symbol_table
+        assert loads_mock.call_count == 0
+        java_file = symbol_table.file_of("com.ibm.websphere.samples.pbw.utils.ListProperties")
+        assert java_file is not None
+        # A compilation unit is decoded again once, when it is first validated
+        assert symbol_table[java_file] is symbol_table[java_file]
+    assert loads_mock.call_count == 1
+
+
+def test_lazy_call_graph(test_fixture, analysis_json):
+    """Should validate the call graph edges, and the compilation units of their endpoints, only when the call graph is queried in lazy mode"""
+    expected = load_japplication(analysis_json)
+    app = load_japplication(analysis_json, lazy=True)
+    symbol_table = app.symbol_table
+    assert not any(symbol_table.is_materialized(file_path) for file_path in symbol_table)
+    assert app.num_edges("call_graph") == len(expected.call_graph)
+    assert not any(symbol_table.is_materialized(file_path) for file_path in symbol_table)
+
+    assert [(edge.source.klass, edge.source.method.signature, edge.target.klass, edge.target.method.signature) for edge in app.call_graph] == [
+        (edge.source.klass, edge.source.method.signature, edge.target.klass, edge.target.method.signature) for edge in expected.call_graph
+    ]
+    endpoint_files = {endpoint["file_path"] for edge in json.loads(analysis_json)["call_graph"] for endpoint in (edge["source"], edge["target"])}
+    assert {file_path for file_path in symbol_table if symbol_table.is_materialized(file_path)} == endpoint_files & set(symbol_table)
+    assert [edge.model_dump() for edge in app.call_graph] == [edge.model_dump() for edge in expected.call_graph]
+
+    # A call graph analysis builds its call graph on the first call graph query
+    with patch("cldk.analysis.java.codeanalyzer.codeanalyzer.subprocess.run") as run_mock:
+        run_mock.return_value = MagicMock(stdout=analysis_json, returncode=0)
+        code_analyzer = JCodeanalyzer(
+            project_dir=test_fixture,
+            source_code=None,
+            analysis_backend_path=None,
+            analysis_json_path=None,
+            analysis_level=AnalysisLevel.call_graph,
+            eager_analysis=False,
+            target_files=None,
+            lazy_symbol_table=True,
+        )
+        symbol_table = code_analyzer.get_symbol_table()
+        assert not any(symbol_table.is_materialized(file_path) for file_path in symbol_table)
+        assert code_analyzer.get_call_graph().number_of_edges() > 0
+        symbol_table = code_analyzer.get_symbol_table()
+        assert any(symbol_table.is_materialized(file_path) for file_path in symbol_table)
+
+
 def test_init_codeanalyzer_no_json_path(test_fixture, analysis_json):
     """Should initialize the codeanalyzer without a json path"""
 
@@ -70,9 +249,12 @@ def test_init_codeanalyzer_no_json_path(test_fixture, analysis_json):
         assert isinstance(app, JApplication)
 
 
-def test_init_codeanalyzer_with_json_path(test_fixture, analysis_json, analysis_json_fixture):
+def test_init_codeanalyzer_with_json_path(test_fixture, analysis_json, analysis_json_fixture, tmp_path):
     """Should initialize the codeanalyzer with a json path"""
 
+    # Eager analysis writes analysis.json and its manifest, so it must not run in the fixture directory
+    shutil.copy(analysis_json_fixture / "analysis.json", tmp_path / "analysis.json")
+
     # Patch subprocess so that it does not run codeanalyzer
     with patch("cldk.analysis.java.codeanalyzer.codeanalyzer.subprocess.run") as run_mock:
         run_mock.return_value = MagicMock(stdout=analysis_json, returncode=0)
@@ -80,7 +262,7 @@ def test_init_codeanalyzer_with_json_path(test_fixture, analysis_json, analysis_
             project_dir=test_fixture,
             source_code=None,
             analysis_backend_path=None,
-            analysis_json_path=analysis_json_fixture,
+            analysis_json_path=tmp_path,
             analysis_level=AnalysisLevel.symbol_table,
             eager_analysis=False,
             target_files=None,
@@ -102,6 +284,605 @@ def test_init_codeanalyzer_with_json_path(test_fixture, analysis_json, analysis_
         assert isinstance(app, JApplication)
 
 
+def test_snapshot_cache(test_fixture, analysis_json_fixture, tmp_path):
+    """Should cache the validated application and reuse it while analysis.json is unchanged"""
+    shutil.copy(analysis_json_fixture / "analysis.json", tmp_path / "analysis.json")
+
+    def init_code_analyzer():
+        return JCodeanalyzer(
+            project_dir=test_fixture,
+            source_code=None,
+            analysis_backend_path=None,
+            analysis_json_path=tmp_path,
+            analysis_level=AnalysisLevel.symbol_table,
+            eager_analysis=False,
+            target_files=None,
+            snapshot_cache=True,
+        )
+
+    with patch("cldk.analysis.java.codeanalyzer.codeanalyzer.subprocess.run") as run_mock:
+        cold_app = init_code_analyzer().application
+        run_mock.assert_not_called()
+    assert (tmp_path / "analysis.snapshot.pkl").exists()
+
+    # A warm start is served from the snapshot without parsing analysis.json
+    with patch("cldk.analysis.java.codeanalyzer.codeanalyzer.load_japplication") as load_mock:
+        warm_app = init_code_analyzer().application
+        load_mock.assert_not_called()
+    assert warm_app.model_dump() == cold_app.model_dump()
+
+    # Changing analysis.json invalidates the snapshot
+    with open(tmp_path / "analysis.json", "a", encoding="utf-8") as f:
+        f.write("\n")
+    with patch("cldk.analysis.java.codeanalyzer.codeanalyzer.load_japplication", wraps=load_japplication) as load_mock:
+        init_code_analyzer()
+        load_mock.assert_called_once()
+
+
+def test_call_graph_snapshot(test_fixture, analysis_json_fixture, tmp_path):
+    """Should cache the built call graph next to analysis.json and load it while analysis.json is unchanged"""
+    shutil.copy(analysis_json_fixture / "analysis.json", tmp_path / "analysis.json")
+
+    def init_code_analyzer(analysis_level=AnalysisLevel.call_graph):
+        return JCodeanalyzer(
+            project_dir=test_fixture,
+            source_code=None,
+            analysis_backend_path=None,
+            analysis_json_path=tmp_path,
+            analysis_level=analysis_level,
+            eager_analysis=False,
+            target_files=None,
+            snapshot_cache=True,
+        )
+
+    def edges(graph):
+        return sorted((source, target, data["type"], data["weight"], data["calling_lines"]) for source, target, data in graph.edges(data=True))
+
+    with patch("cldk.analysis.java.codeanalyzer.codeanalyzer.subprocess.run") as run_mock:
+        cold_graph = init_code_analyzer().get_call_graph()
+        run_mock.assert_not_called()
+    assert (tmp_path / "call_graph.snapshot.pkl").exists()
+
+    # A warm start loads the call graph without building it, and resolves its methods against the application.
+    # analysis.json is hashed once for the application and the call graph snapshot keys.
+    with patch.object(JCodeanalyzer, "_build_compact_call_graph") as build_mock, patch(
+        "cldk.analysis.java.codeanalyzer.codeanalyzer.file_sha256", side_effect=file_sha256
+    ) as sha256_mock:
+        code_analyzer = init_code_analyzer()
+        warm_graph = code_analyzer.get_call_graph()
+        build_mock.assert_not_called()
+        sha256_mock.assert_called_once()
+    assert list(warm_graph.nodes) == list(cold_graph.nodes)
+    assert edges(warm_graph) == edges(cold_graph)
+    callables = code_analyzer.application.callables
+    for (method_signature, class_name), method_detail in warm_graph.nodes(data="method_detail"):
+        if (class_name, method_signature) in callables:
+            assert method_detail.method is callables[(class_name, method_signature)]
+
+    # A call graph built from the symbol table has a snapshot key of its own
+    with patch.object(JCodeanalyzer, "_build_compact_call_graph", autospec=True, side_effect=JCodeanalyzer._build_compact_call_graph) as build_mock:
+        init_code_analyzer(AnalysisLevel.symbol_table).get_call_graph()
+        init_code_analyzer(AnalysisLevel.symbol_table).get_call_graph()
+        assert build_mock.call_count == 1
+
+    # Changing analysis.json invalidates the snapshot
+    with open(tmp_path / "analysis.json", "a", encoding="utf-8") as f:
+        f.write("\n")
+    with patch.object(JCodeanalyzer, "_build_compact_call_graph", autospec=True, side_effect=JCodeanalyzer._build_compact_call_graph) as build_mock:
+        init_code_analyzer()
+        build_mock.assert_called_once()
+
+
+def test_callable_registry(test_fixture, analysis_json_fixture, tmp_path):
+    """Should resolve graph edges against a callable registry owned by each application and release it on close"""
+    shutil.copy(analysis_json_fixture / "analysis.json", tmp_path / "analysis.json")
+
+    def init_code_analyzer():
+        return JCodeanalyzer(
+            project_dir=test_fixture,
+            source_code=None,
+            analysis_backend_path=None,
+            analysis_json_path=tmp_path,
+            analysis_level=AnalysisLevel.call_graph,
+            eager_analysis=False,
+            target_files=None,
+        )
+
+    with patch("cldk.analysis.java.codeanalyzer.codeanalyzer.subprocess.run") as run_mock:
+        first, second = init_code_analyzer(), init_code_analyzer()
+        run_mock.assert_not_called()
+    first_app, second_app = first.application, second.application
+    assert first_app.callables and first_app.callables is not second_app.callables
+    for edge in first_app.call_graph:
+        assert first_app.callables[(edge.source.klass, edge.source.method.signature)] is edge.source.method
+        assert all(edge.source.method is not j_callable for j_callable in second_app.callables.values())
+        break
+
+    first.close()
+    assert first.application is None and first.call_graph is None
+    assert len(first_app.callables) == 0
+    assert len(second_app.callables) > 0
+
+
+def test_analysis_manifest(test_fixture, analysis_json, tmp_path):
+    """Should write a manifest next to analysis.json and answer reuse checks from it"""
+    analysis_json_file = tmp_path / "analysis.json"
+
+    def run(args, **kwargs):
+        analysis_json_file.write_text(analysis_json, encoding="utf-8")
+        return MagicMock(stdout="", returncode=0)
+
+    with patch("cldk.analysis.java.codeanalyzer.codeanalyzer.subprocess.run", side_effect=run):
+        app = JCodeanalyzer(
+            project_dir=test_fixture,
+            source_code=None,
+            analysis_backend_path=None,
+            analysis_json_path=tmp_path,
+            analysis_level=AnalysisLevel.symbol_table,
+            eager_analysis=False,
+            target_files=None,
+        ).application
+
+    manifest = load_manifest(tmp_path / "analysis.manifest.json")
+    assert manifest is not None
+    # analysis.json has a call graph, so the manifest records it as a call graph analysis
+    assert manifest.analysis_level == 2
+    assert manifest.num_compilation_units == len(app.symbol_table)
+    assert manifest.num_call_graph_edges == len(app.call_graph)
+    assert manifest.describes(analysis_json_file)
+
+    # The reuse check does not parse analysis.json while the manifest describes it
+    with patch("cldk.analysis.java.codeanalyzer.codeanalyzer.json.load") as json_load_mock:
+        assert JCodeanalyzer.check_exisiting_analysis_file_level(analysis_json_file, 1)
+        assert JCodeanalyzer.check_exisiting_analysis_file_level(analysis_json_file, 2)
+        json_load_mock.assert_not_called()
+
+    # Once analysis.json changes, the manifest no longer describes it and the check falls back to parsing it
+    analysis_json_file.write_text(json.dumps({"symbol_table": {}}), encoding="utf-8")
+    assert not manifest.describes(analysis_json_file)
+    assert JCodeanalyzer.check_exisiting_analysis_file_level(analysis_json_file, 1)
+    assert not JCodeanalyzer.check_exisiting_analysis_file_level(analysis_json_file, 2)
+
+
+def test_incremental_analysis(analysis_json, tmp_path):
+    """Should re-analyze only changed files and merge them into analysis.json"""
+    # Rebase the analysis onto a project in tmp_path that has a placeholder file for every compilation unit
+    original_project = os.path.commonpath(list(json.loads(analysis_json)["symbol_table"]))
+    project_dir = tmp_path / "project"
+    analysis = json.loads(analysis_json.replace(original_project, str(project_dir)))
+    for file_path in analysis["symbol_table"]:
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        with open(file_path, "w", encoding="utf-8") as f:
+            f.write(file_path)
+    util_file = next(file_path for file_path in analysis["symbol_table"] if file_path.endswith("/Util.java"))
+    deleted_file = next(file_path for file_path in analysis["symbol_table"] if file_path.endswith("/ShoppingItem.java"))
+    analysis_dir = tmp_path / "build"
+
+    def run_codeanalyzer(output: dict):
+        def run(args, **kwargs):
+            output_dir = args[args.index("-o") + 1]
+            os.makedirs(output_dir, exist_ok=True)
+            with open(os.path.join(output_dir, "analysis.json"), "w", encoding="utf-8") as f:
+                json.dump(output, f)
+            return MagicMock(stdout="", returncode=0)
+
+        return run
+
+    def init_code_analyzer():
+        return JCodeanalyzer(
+            project_dir=project_dir,
+            source_code=None,
+            analysis_backend_path=None,
+            analysis_json_path=analysis_dir,
+            analysis_level=AnalysisLevel.symbol_table,
+            eager_analysis=False,
+            target_files=None,
+            incremental=True,
+        )
+
+    # The first run is a full analysis that records the file hashes
+    with patch("cldk.analysis.java.codeanalyzer.codeanalyzer.subprocess.run", side_effect=run_codeanalyzer(analysis)) as run_mock:
+        init_code_analyzer()
+        assert "-t" not in run_mock.call_args.args[0]
+    assert load_manifest(analysis_dir / "analysis.manifest.json").file_hashes is not None
+
+    # Nothing changed, so codeanalyzer does not run
+    with patch("cldk.analysis.java.codeanalyzer.codeanalyzer.subprocess.run") as run_mock:
+        init_code_analyzer()
+        run_mock.assert_not_called()
+
+    # Only the changed file is re-analyzed
+    with open(util_file, "a", encoding="utf-8") as f:
+        f.write("// changed")
+    util_unit = dict(analysis["symbol_table"][util_file], imports=["java.util.changed"])
+    delta = {
+        "symbol_table": {util_file: util_unit},
+        "call_graph": [edge for edge in analysis["call_graph"] if edge["source"]["file_path"] == util_file],
+        "version": analysis["version"],
+    }
+    with patch("cldk.analysis.java.codeanalyzer.codeanalyzer.subprocess.run", side_effect=run_codeanalyzer(delta)) as run_mock:
+        app = init_code_analyzer().application
+        args = run_mock.call_args.args[0]
+        assert [args[i + 1] for i, arg in enumerate(args) if arg == "-t"] == [util_file]
+
+    assert set(app.symbol_table) == set(analysis["symbol_table"])
+    assert app.symbol_table[util_file].imports == ["java.util.changed"]
+    assert len(app.call_graph) == len(analysis["call_graph"])
+
+    # A new callable or a deleted type may change the call edges of unchanged files, so the whole project is analyzed again
+    with open(util_file, "a", encoding="utf-8") as f:
+        f.write("// new method")
+    os.remove(deleted_file)
+    util_type = next(iter(util_unit["type_declarations"]))
+    callable_declarations = util_unit["type_declarations"][util_type]["callable_declarations"]
+    util_unit = dict(util_unit, type_declarations={util_type: dict(util_unit["type_declarations"][util_type], callable_declarations=dict(callable_declarations, **{"added()": next(iter(callable_declarations.values()))}))})
+    full_analysis = dict(
+        analysis,
+        symbol_table={file_path: unit for file_path, unit in analysis["symbol_table"].items() if file_path != deleted_file} | {util_file: util_unit},
+        call_graph=[edge for edge in analysis["call_graph"] if deleted_file not in (edge["source"]["file_path"], edge["target"]["file_path"])],
+    )
+    outputs = iter([dict(delta, symbol_table={util_file: util_unit}), full_analysis])
+
+    def run(args, **kwargs):
+        return run_codeanalyzer(next(outputs))(args, **kwargs)
+
+    with patch("cldk.analysis.java.codeanalyzer.codeanalyzer.subprocess.run", side_effect=run) as run_mock:
+        app = init_code_analyzer().application
+        assert run_mock.call_count == 2
+        assert "-t" not in run_mock.call_args.args[0]
+    assert set(app.symbol_table) == set(analysis["symbol_table"]) - {deleted_file}
+    assert "added()" in app.symbol_table[util_file].type_declarations[util_type].callable_declarations
+    assert len(app.call_graph) == len(full_analysis["call_graph"])
+
+    # The full run records the new file hashes
+    with patch("cldk.analysis.java.codeanalyzer.codeanalyzer.subprocess.run") as run_mock:
+        init_code_analyzer()
+        run_mock.assert_not_called()
+
+
+def test_merge_analysis_constructor_edges(analysis_json_fixture, tmp_path):
+    """Should keep the edges into the constructors of a re-analyzed file that still declares them"""
+    with open(analysis_json_fixture / "analysis.json", encoding="utf-8") as f:
+        analysis = json.load(f)
+    populate_file = next(file_path for file_path in analysis["symbol_table"] if file_path.endswith("/Populate.java"))
+    delta = {
+        "symbol_table": {populate_file: analysis["symbol_table"][populate_file]},
+        "call_graph": [edge for edge in analysis["call_graph"] if edge["source"]["file_path"] == populate_file],
+    }
+    (tmp_path / "delta.json").write_text(json.dumps(delta), encoding="utf-8")
+    merge_analysis(analysis_json_fixture / "analysis.json", tmp_path / "delta.json", [populate_file], [], tmp_path / "analysis.json")
+
+    with open(tmp_path / "analysis.json", encoding="utf-8") as f:
+        merged = json.load(f)
+    # Edges name constructors after their type, e.g. Populate(...), and the symbol table declares them as <init>(...)
+    constructor_edges = [edge for edge in analysis["call_graph"] if edge["target"]["file_path"] == populate_file and edge["target"]["callable_declaration"].startswith("<init>(")]
+    assert constructor_edges
+    assert all(edge in merged["call_graph"] for edge in constructor_edges)
+    assert len(merged["call_graph"]) == len(analysis["call_graph"])
+
+
+def test_sharded_analysis(analysis_json, tmp_path):
+    """Should analyze each module of a multi-module build separately and merge the shards with their cross-shard call edges"""
+    analysis = json.loads(analysis_json)
+    project_dir = tmp_path / "project"
+    (project_dir / "pom.xml").parent.mkdir()
+    (project_dir / "pom.xml").write_text("<project/>")
+    for module in ("app", "utils"):
+        (project_dir / module / "src" / "main" / "java").mkdir(parents=True)
+        (project_dir / module / "pom.xml").write_text("<project/>")
+    assert discover_modules(project_dir) == [project_dir / "app", project_dir / "utils"]
+
+    # The utils package is its own module; each shard only knows the call edges within itself
+    def module_of(file_path):
+        return "utils" if "/pbw/utils/" in file_path else "app"
+
+    shards = {
+        module: {
+            "symbol_table": {file_path: unit for file_path, unit in analysis["symbol_table"].items() if module_of(file_path) == module},
+            "call_graph": [edge for edge in analysis["call_graph"] if module_of(edge["source"]["file_path"]) == module_of(edge["target"]["file_path"]) == module],
+            "version": analysis["version"],
+        }
+        for module in ("app", "utils")
+    }
+
+    def run(args, **kwargs):
+        output_dir = args[args.index("-o") + 1]
+        os.makedirs(output_dir, exist_ok=True)
+        with open(os.path.join(output_dir, "analysis.json"), "w", encoding="utf-8") as f:
+            json.dump(shards[os.path.basename(args[args.index("-i") + 1])], f)
+        return MagicMock(stdout="", returncode=0)
+
+    with patch("cldk.analysis.java.codeanalyzer.codeanalyzer.subprocess.run", side_effect=run) as run_mock:
+        app = JCodeanalyzer(
+            project_dir=project_dir,
+            source_code=None,
+            analysis_backend_path=None,
+            analysis_json_path=None,
+            analysis_level=AnalysisLevel.symbol_table,
+            eager_analysis=False,
+            target_files=None,
+            shard_modules=True,
+            max_shard_workers=2,
+        ).application
+        assert run_mock.call_count == 2
+
+    assert set(app.symbol_table) == set(analysis["symbol_table"])
+    within_shard_edges = sum(len(shard["call_graph"]) for shard in shards.values())
+    cross_shard_edges = [edge for edge in app.call_graph if module_of(edge.source.klass.replace(".", "/") + "/") != module_of(edge.target.klass.replace(".", "/") + "/")]
+    assert len(app.call_graph) == within_shard_edges + len(cross_shard_edges)
+    assert any(edge.target.klass == "com.ibm.websphere.samples.pbw.utils.Util" and edge.target.method.signature == "debug(java.lang.String)" for edge in cross_shard_edges)
+
+    # Nested modules cannot be sharded
+    (project_dir / "src" / "main" / "java").mkdir(parents=True)
+    assert discover_modules(project_dir) == []
+
+
+def test_merge_shards_dispatch(tmp_path):
+    """Should add the cross-shard edges of a call through an interface to its implementations in other shards"""
+
+    def callable_declaration(*call_sites, modifiers=("public",)):
+        return {"modifiers": list(modifiers), "is_constructor": False, "call_sites": [{"receiver_type": receiver_type, "callee_signature": callee, "is_constructor_call": False} for receiver_type, callee in call_sites]}
+
+    def type_declaration(callable_declarations, is_interface=False, implements_list=()):
+        return {"is_interface": is_interface, "extends_list": [], "implements_list": list(implements_list), "callable_declarations": callable_declarations}
+
+    shards = [
+        {
+            "call_graph": [],
+            "symbol_table": {
+                "/api/Greeter.java": {"type_declarations": {"api.Greeter": type_declaration({"greet()": callable_declaration(modifiers=("abstract",))}, is_interface=True)}},
+                "/api/App.java": {"type_declarations": {"api.App": type_declaration({"run()": callable_declaration(("api.Greeter", "greet()"))})}},
+            },
+            "version": "2.3.0",
+        },
+        {
+            "call_graph": [],
+            "symbol_table": {"/impl/English.java": {"type_declarations": {"impl.English": type_declaration({"greet()": callable_declaration()}, implements_list=["api.Greeter"])}}},
+            "version": "2.3.0",
+        },
+    ]
+    shard_files = []
+    for index, shard in enumerate(shards):
+        shard_files.append(tmp_path / f"shard{index}.json")
+        shard_files[-1].write_text(json.dumps(shard), encoding="utf-8")
+    merge_shards(shard_files, tmp_path / "analysis.json")
+
+    merged = json.loads((tmp_path / "analysis.json").read_text(encoding="utf-8"))
+    assert set(merged["symbol_table"]) == {"/api/Greeter.java", "/api/App.java", "/impl/English.java"}
+    assert merged["version"] == "2.3.0"
+    assert [(edge["source"]["type_declaration"], edge["source"]["signature"], edge["target"]["type_declaration"], edge["target"]["signature"]) for edge in merged["call_graph"]] == [
+        ("api.App", "run()", "impl.English", "greet()")
+    ]
+
+
+def test_sharded_analysis_with_daemon(analysis_json, tmp_path):
+    """Should run the shards of a sharded analysis in parallel, each in a codeanalyzer worker of its own"""
+    version = json.loads(analysis_json)["version"]
+    project_dir = tmp_path / "project"
+    (project_dir / "pom.xml").parent.mkdir()
+    (project_dir / "pom.xml").write_text("<project/>")
+    for module in ("app", "utils"):
+        (project_dir / module / "src" / "main" / "java").mkdir(parents=True)
+        (project_dir / module / "pom.xml").write_text("<project/>")
+
+    # Both shards must be running at the same time to pass the barrier
+    barrier = threading.Barrier(2, timeout=10)
+
+    class ShardDaemon(CodeanalyzerDaemon):
+        def _ping(self):
+            return True
+
+        def _run(self, args):
+            barrier.wait()
+            output_dir = args[args.index("-o") + 1]
+            os.makedirs(output_dir, exist_ok=True)
+            with open(os.path.join(output_dir, "analysis.json"), "w", encoding="utf-8") as f:
+                json.dump({"symbol_table": {}, "call_graph": [], "version": version}, f)
+            return MagicMock(stdout="", returncode=0)
+
+    daemons = {}
+
+    def get_daemon(codeanalyzer_jar, worker=0):
+        return daemons.setdefault(worker, ShardDaemon([]))
+
+    with patch("cldk.analysis.java.codeanalyzer.codeanalyzer.get_daemon", side_effect=get_daemon), patch("cldk.analysis.java.codeanalyzer.codeanalyzer.subprocess.run") as run_mock:
+        app = JCodeanalyzer(
+            project_dir=project_dir,
+            source_code=None,
+            analysis_backend_path=None,
+            analysis_json_path=None,
+            analysis_level=AnalysisLevel.symbol_table,
+            eager_analysis=False,
+            target_files=None,
+            use_daemon=True,
+            shard_modules=True,
+            max_shard_workers=2,
+        ).application
+        run_mock.assert_not_called()
+    assert isinstance(app, JApplication)
+    assert sorted(daemons) == [0, 1]
+
+
+FAKE_CODEANALYZER_WORKER = """
+import base64, sys
+from pathlib import Path
+
+payload = Path(sys.argv[1]).read_bytes()
+crash_marker = Path(sys.argv[2])
+out = sys.stdout.buffer
+out.write(b"READY\\n")
+out.flush()
+for line in sys.stdin.buffer:
+    request = line.strip().decode()
+    if request == "PING":
+        out.write(b"PONG\\n")
+    elif request == "EXIT":
+        break
+    elif request.startswith("RUN "):
+        args = [base64.b64decode(sys.stdin.buffer.readline()).decode() for _ in range(int(request[4:]))]
+        if crash_marker.exists():
+            crash_marker.unlink()
+            sys.exit(1)
+        out.write(f"OK 0 {len(payload)}\\n".encode() + payload)
+    out.flush()
+"""
+
+
+def test_codeanalyzer_daemon(test_fixture, analysis_json_fixture, tmp_path):
+    """Should serve analyses from a persistent worker and restart it when it crashes"""
+    worker = tmp_path / "worker.py"
+    worker.write_text(FAKE_CODEANALYZER_WORKER)
+    crash_marker = tmp_path / "crash"
+    daemon = CodeanalyzerDaemon([sys.executable, str(worker), str(analysis_json_fixture / "analysis.json"), str(crash_marker)])
+
+    with daemon, patch("cldk.analysis.java.codeanalyzer.codeanalyzer.get_daemon", return_value=daemon), patch(
+        "cldk.analysis.java.codeanalyzer.codeanalyzer.subprocess.run"
+    ) as run_mock:
+        assert daemon.ping()
+
+        def init_code_analyzer():
+            return JCodeanalyzer(
+                project_dir=test_fixture,
+                source_code=None,
+                analysis_backend_path=None,
+                analysis_json_path=None,
+                analysis_level=AnalysisLevel.symbol_table,
+                eager_analysis=False,
+                target_files=None,
+                use_daemon=True,
+            )
+
+        first_app = init_code_analyzer().application
+        worker_pid = daemon._process.pid
+        assert isinstance(first_app, JApplication)
+
+        # The worker is reused by the next analysis
+        init_code_analyzer()
+        assert daemon._process.pid == worker_pid
+
+        # A worker that dies during a request is restarted and the request retried
+        crash_marker.touch()
+        crashed_app = init_code_analyzer().application
+        assert daemon._process.pid != worker_pid
+        assert crashed_app.model_dump() == first_app.model_dump()
+        run_mock.assert_not_called()
+    assert daemon._process is None
+
+
+PROJECT_CODEANALYZER_WORKER = """
+import base64, json, sys
+from pathlib import Path
+
+payloads = json.loads(Path(sys.argv[1]).read_text())
+out = sys.stdout.buffer
+out.write(b"READY\\n")
+out.flush()
+for line in sys.stdin.buffer:
+    request = line.strip().decode()
+    if request == "PING":
+        out.write(b"PONG\\n")
+    elif request == "EXIT":
+        break
+    elif request.startswith("RUN "):
+        args = [base64.b64decode(sys.stdin.buffer.readline()).decode() for _ in range(int(request[4:]))]
+        payload = Path(payloads[args[args.index("-i") + 1]]).read_bytes()
+        out.write(f"OK 0 {len(payload)}\\n".encode() + payload)
+    out.flush()
+"""
+
+
+def test_codeanalyzer_daemon_projects(test_fixture, test_fixture_pbw, analysis_json, tmp_path):
+    """Should serve analyses of different projects from one worker, each with the result of its own project"""
+    analysis = json.loads(analysis_json)
+    first_unit = next(iter(analysis["symbol_table"]))
+    (tmp_path / "first.json").write_text(json.dumps(analysis), encoding="utf-8")
+    (tmp_path / "second.json").write_text(json.dumps({**analysis, "call_graph": [], "symbol_table": {first_unit: analysis["symbol_table"][first_unit]}}), encoding="utf-8")
+    payloads = {str(test_fixture): str(tmp_path / "first.json"), str(test_fixture_pbw): str(tmp_path / "second.json")}
+    (tmp_path / "payloads.json").write_text(json.dumps(payloads), encoding="utf-8")
+    worker = tmp_path / "worker.py"
+    worker.write_text(PROJECT_CODEANALYZER_WORKER)
+    daemon = CodeanalyzerDaemon([sys.executable, str(worker), str(tmp_path / "payloads.json")])
+
+    def analyze(project_dir):
+        return JCodeanalyzer(
+            project_dir=project_dir,
+            source_code=None,
+            analysis_backend_path=None,
+            analysis_json_path=None,
+            analysis_level=AnalysisLevel.symbol_table,
+            eager_analysis=False,
+            target_files=None,
+            use_daemon=True,
+        ).application
+
+    with daemon, patch("cldk.analysis.java.codeanalyzer.codeanalyzer.get_daemon", return_value=daemon):
+        worker_pid = daemon._process.pid
+        assert set(analyze(test_fixture).symbol_table) == set(analysis["symbol_table"])
+        assert set(analyze(test_fixture_pbw).symbol_table) == {first_unit}
+        assert set(analyze(test_fixture).symbol_table) == set(analysis["symbol_table"])
+        assert daemon._process.pid == worker_pid
+
+
+def test_codeanalyzer_daemon_command(tmp_path, monkeypatch):
+    """Should start the worker from the bundled worker jar, or else from classes compiled once into the cache"""
+    codeanalyzer_jar = tmp_path / "jar" / "codeanalyzer-2.3.3.jar"
+    codeanalyzer_jar.parent.mkdir()
+    codeanalyzer_jar.touch()
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+
+    def javac(args, **kwargs):
+        Path(args[args.index("-d") + 1], "CodeanalyzerWorker.class").touch()
+        return MagicMock(returncode=0)
+
+    with patch("cldk.analysis.java.codeanalyzer.daemon.shutil.which", side_effect=lambda name, path=None: f"/jdk/bin/{name}"), patch(
+        "cldk.analysis.java.codeanalyzer.daemon.subprocess.run", side_effect=javac
+    ) as run_mock:
+        command = CodeanalyzerDaemon.for_jar(codeanalyzer_jar).command
+        assert CodeanalyzerDaemon.for_jar(codeanalyzer_jar).command == command
+    assert run_mock.call_count == 1
+    assert run_mock.call_args.args[0][0] == "/jdk/bin/javac"
+    assert command[:2] == ["java", "-cp"] and command[3:] == ["CodeanalyzerWorker", str(codeanalyzer_jar)]
+    assert (Path(command[2]) / "CodeanalyzerWorker.class").is_file()
+
+    # A worker jar shipped next to the codeanalyzer jar is used as is
+    (codeanalyzer_jar.parent / "cldk-worker.jar").touch()
+    assert CodeanalyzerDaemon.for_jar(codeanalyzer_jar).command == ["java", "-cp", str(codeanalyzer_jar.parent / "cldk-worker.jar"), "CodeanalyzerWorker", str(codeanalyzer_jar)]
+
+    # Without either, and without javac, the worker is run from source
+    (codeanalyzer_jar.parent / "cldk-worker.jar").unlink()
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "empty-cache"))
+    with patch("cldk.analysis.java.codeanalyzer.daemon.shutil.which", return_value=None):
+        assert CodeanalyzerDaemon.for_jar(codeanalyzer_jar).command[1:] == [str(WORKER_SOURCE), str(codeanalyzer_jar)]
+
+
+def test_analyze_snippets(analysis_json):
+    """Should analyze many snippets with one codeanalyzer run and return one application per snippet"""
+    compilation_unit = next(iter(json.loads(analysis_json)["symbol_table"].values()))
+    snippets = ["public class First {}", "class Second {}", "public final class Broken {"]
+
+    def run(args, **kwargs):
+        # Sources are written to a workspace rather than passed on the command line
+        assert not any(snippet in args for snippet in snippets)
+        workspace = args[args.index("-i") + 1]
+        symbol_table = {}
+        for root, _, files in os.walk(workspace):
+            for file_name in files:
+                if file_name != "Broken.java":
+                    file_path = os.path.join(root, file_name)
+                    symbol_table[file_path] = dict(compilation_unit, file_path=file_path)
+        return MagicMock(stdout=json.dumps({"symbol_table": symbol_table}), returncode=0)
+
+    with patch("cldk.analysis.java.codeanalyzer.codeanalyzer.subprocess.run", side_effect=run) as run_mock:
+        apps = JCodeanalyzer.analyze_snippets(snippets)
+        run_mock.assert_called_once()
+
+    assert len(apps) == len(snippets)
+    assert [os.path.basename(file_path) for file_path in apps[0].symbol_table] == ["First.java"]
+    assert [os.path.basename(file_path) for file_path in apps[1].symbol_table] == ["Snippet.java"]
+    assert apps[2].symbol_table == {}
+    assert all(isinstance(unit, JCompilationUnit) for app in apps for unit in app.symbol_table.values())
+
+
 def test_get_codeanalyzer_exec(test_fixture, codeanalyzer_jar_path, analysis_json):
     """Should return the correct codeanalyzer location"""
 
@@ -302,6 +1083,61 @@ def test_get_call_graph(test_fixture, analysis_json):
         assert isinstance(graph, nx.DiGraph)
 
 
+def test_get_call_graph_using_symbol_table(test_fixture, analysis_json):
+    """Should build the call graph from the symbol table at the symbol table analysis level"""
+
+    # Patch subprocess so that it does not run codeanalyzer
+    with patch("cldk.analysis.java.codeanalyzer.codeanalyzer.subprocess.run") as run_mock:
+        run_mock.return_value = MagicMock(stdout=analysis_json, returncode=0)
+        code_analyzer = JCodeanalyzer(
+            project_dir=test_fixture,
+            source_code=None,
+            analysis_backend_path=None,
+            analysis_json_path=None,
+            analysis_level=AnalysisLevel.symbol_table,
+            eager_analysis=False,
+            target_files=None,
+        )
+        graph = code_analyzer.get_call_graph()
+        assert isinstance(graph, nx.DiGraph)
+        assert graph.number_of_edges() > 0
+        # The graph is built once and reused
+        assert code_analyzer.get_call_graph() is graph
+
+        # Every method has the callees that the symbol table resolves for it alone
+        for method_signature, class_name in graph.nodes:
+            callee_details = code_analyzer.get_all_callees(class_name, method_signature, using_symbol_table=True)
+            callees = {(callee["callee_method"].method.signature, callee["callee_method"].klass) for callee in callee_details.get("callee_details", [])}
+            assert callees == set(graph.successors((method_signature, class_name)))
+        for _, _, calling_lines in graph.edges.data("calling_lines"):
+            assert isinstance(calling_lines, list)
+
+
+def test_get_call_graph_using_symbol_table_constructor_calls(test_fixture, analysis_json):
+    """Should add an edge from a new X(...) expression to the constructor X.<init>(...)"""
+
+    # Patch subprocess so that it does not run codeanalyzer
+    with patch("cldk.analysis.java.codeanalyzer.codeanalyzer.subprocess.run") as run_mock:
+        run_mock.return_value = MagicMock(stdout=analysis_json, returncode=0)
+        code_analyzer = JCodeanalyzer(
+            project_dir=test_fixture,
+            source_code=None,
+            analysis_backend_path=None,
+            analysis_json_path=None,
+            analysis_level=AnalysisLevel.symbol_table,
+            eager_analysis=False,
+            target_files=None,
+        )
+        # AdminServlet.getBackOrders calls new BackOrderItem(backOrder)
+        source = ("getBackOrders(javax.servlet.http.HttpSession)", "com.ibm.websphere.samples.pbw.war.AdminServlet")
+        target = ("<init>(com.ibm.websphere.samples.pbw.jpa.BackOrder)", "com.ibm.websphere.samples.pbw.war.BackOrderItem")
+        graph = code_analyzer.get_call_graph()
+        assert graph.has_edge(source, target)
+        assert len(graph.edges[source, target]["calling_lines"]) > 0
+        class_call_graph = code_analyzer.get_class_call_graph_using_symbol_table("com.ibm.websphere.samples.pbw.war.AdminServlet")
+        assert (source, target) in {((caller.method.signature, caller.klass), (callee.method.signature, callee.klass)) for caller, callee in class_call_graph}
+
+
 def test_get_call_graph_json(test_fixture, analysis_json):
     """Should return the call graph as json"""
 
@@ -325,6 +1161,43 @@ def test_get_call_graph_json(test_fixture, analysis_json):
         assert isinstance(graph, list)
 
 
+def test_export_call_graph_ndjson(test_fixture, analysis_json, tmp_path):
+    """Should write every method of the call graph once and the edges as node ID references"""
+
+    # Patch subprocess so that it does not run codeanalyzer
+    with patch("cldk.analysis.java.codeanalyzer.codeanalyzer.subprocess.run") as run_mock:
+        run_mock.return_value = MagicMock(stdout=analysis_json, returncode=0)
+        code_analyzer = JCodeanalyzer(
+            project_dir=test_fixture,
+            source_code=None,
+            analysis_backend_path=None,
+            analysis_json_path=None,
+            analysis_level=AnalysisLevel.call_graph,
+            eager_analysis=False,
+            target_files=None,
+        )
+        ndjson_file = code_analyzer.export_call_graph_ndjson(tmp_path / "call_graph" / "call_graph.ndjson")
+        records = [json.loads(line) for line in ndjson_file.read_text(encoding="utf-8").splitlines()]
+        nodes = {record["id"]: record for record in records if record["kind"] == "node"}
+        edges = [record for record in records if record["kind"] == "edge"]
+        # Node records come before edge records
+        assert [record["kind"] for record in records] == ["node"] * len(nodes) + ["edge"] * len(edges)
+
+        graph = code_analyzer.get_call_graph()
+        assert len(nodes) == graph.number_of_nodes()
+        assert len(edges) == graph.number_of_edges()
+        for edge in edges:
+            source, target = nodes[edge["source"]], nodes[edge["target"]]
+            source_node, target_node = (source["method_signature"], source["class"]), (target["method_signature"], target["class"])
+            assert edge["calling_lines"] == graph.edges[source_node, target_node]["calling_lines"]
+            assert source["method_body"] == graph.nodes[source_node]["method_detail"].method.code
+
+        # The same records are streamed without a file, here without method bodies
+        lines = list(code_analyzer.iter_call_graph_ndjson(include_code=False))
+        assert len(lines) == len(records)
+        assert all(line.endswith("\n") and "method_body" not in json.loads(line) for line in lines)
+
+
 def test_get_all_callers(test_fixture, analysis_json):
     """Should return all of the callers"""
 
@@ -491,6 +1364,51 @@ def test_get_java_file(test_fixture, analysis_json):
         assert isinstance(comp_unit, JCompilationUnit)
 
 
+def test_symbol_index(test_fixture, analysis_json):
+    """Should answer class, method and file lookups from an index that follows reloads of the application"""
+
+    # Patch subprocess so that it does not run codeanalyzer
+    with patch("cldk.analysis.java.codeanalyzer.codeanalyzer.subprocess.run") as run_mock:
+        run_mock.return_value = MagicMock(stdout=analysis_json, returncode=0)
+        code_analyzer = JCodeanalyzer(
+            project_dir=test_fixture,
+            source_code=None,
+            analysis_backend_path=None,
+            analysis_json_path=None,
+            analysis_level=AnalysisLevel.symbol_table,
+            eager_analysis=False,
+            target_files=None,
+        )
+
+        all_classes = code_analyzer.get_all_classes()
+        assert code_analyzer.get_all_classes() is all_classes
+        for file_path, compilation_unit in code_analyzer.get_symbol_table().items():
+            for class_name, class_info in compilation_unit.type_declarations.items():
+                assert code_analyzer.get_class(class_name) is class_info
+                assert code_analyzer.get_java_file(class_name) == file_path
+                for signature, callable in class_info.callable_declarations.items():
+                    assert code_analyzer.get_method(class_name, signature) is callable
+        assert code_analyzer.get_class("com.example.Missing") is None
+        assert code_analyzer.get_java_file("com.example.Missing") is None
+        class_name, class_info = next(iter(all_classes.items()))
+        assert code_analyzer.get_method(class_name, "missing()") is None
+
+        # A reloaded application gets a new index
+        code_analyzer.application = JCodeanalyzer._init_japplication(analysis_json)
+        assert code_analyzer.get_class(class_name) is not class_info
+        assert code_analyzer.get_class(class_name) is code_analyzer.get_all_classes()[class_name]
+
+        # A lazy symbol table is indexed without validating the compilation units up front
+        code_analyzer.application = JCodeanalyzer._init_japplication(analysis_json, lazy=True)
+        symbol_table = code_analyzer.get_symbol_table()
+        # Compilation units that hold call graph endpoints are validated at load
+        class_name, class_info = next((k, v) for k, v in all_classes.items() if v.callable_declarations and not symbol_table.is_materialized(symbol_table.file_of(k)))
+        java_file = code_analyzer.get_java_file(class_name)
+        assert not symbol_table.is_materialized(java_file)
+        assert code_analyzer.get_method(class_name, next(iter(class_info.callable_declarations))) is not None
+        assert symbol_table.is_materialized(java_file)
+
+
 def test_get_all_methods_in_class(test_fixture, analysis_json):
     """Should return all of the methods for a class"""
 
@@ -573,6 +1491,224 @@ def test_get_all_sub_classes(test_fixture, analysis_json):
         assert "com.ibm.websphere.samples.daytrader.jaxrs.JAXRSApplication" in all_subclasses
 
 
+def test_type_hierarchy():
+    """Should answer direct and transitive subtype and supertype queries"""
+
+    types = {
+        "A": JType.model_construct(extends_list=[], implements_list=["I"]),
+        "B": JType.model_construct(extends_list=["A"], implements_list=["J"]),
+        "C": JType.model_construct(extends_list=["B"], implements_list=[]),
+        "D": JType.model_construct(extends_list=["A"], implements_list=[]),
+        "J": JType.model_construct(extends_list=["I"], implements_list=[]),
+    }
+    type_hierarchy = TypeHierarchy(types)
+    assert type_hierarchy.subtypes("A") == ("B", "D")
+    assert type_hierarchy.supertypes("B") == ("A", "J")
+    assert type_hierarchy.all_subtypes("I") == {"A", "B", "C", "D", "J"}
+    assert type_hierarchy.all_subtypes("A") == {"B", "C", "D"}
+    assert type_hierarchy.all_supertypes("C") == {"A", "B", "I", "J"}
+    assert type_hierarchy.all_subtypes("C") == frozenset()
+    assert type_hierarchy.all_supertypes("Missing") == frozenset()
+    assert type_hierarchy.all_subtypes("A") is type_hierarchy.all_subtypes("A")
+
+    graph = type_hierarchy.graph()
+    assert set(graph.successors("A")) == {"B", "D"}
+    assert graph.edges["I", "A"]["type"] == "IMPLEMENTS"
+    assert graph.edges["A", "B"]["type"] == "EXTENDS"
+    assert "type_declaration" not in graph.nodes["I"]
+
+
+def test_dispatch_table():
+    """Should resolve calls to the implementations they may dispatch to"""
+
+    def method(*modifiers, is_constructor=False):
+        return JCallable.model_construct(modifiers=list(modifiers), is_constructor=is_constructor)
+
+    types = {
+        "Shape": JType.model_construct(is_interface=True, extends_list=[], implements_list=[], callable_declarations={"area()": method("abstract"), "name()": method("default")}),
+        "Base": JType.model_construct(extends_list=[], implements_list=["Shape"], callable_declarations={"area()": method("abstract"), "Base()": method("public", is_constructor=True)}),
+        "Square": JType.model_construct(extends_list=["Base"], implements_list=[], callable_declarations={"area()": method("public"), "helper()": method("private")}),
+        "Circle": JType.model_construct(extends_list=["Base"], implements_list=[], callable_declarations={"area()": method("public"), "name()": method("public")}),
+        "Unit": JType.model_construct(extends_list=["Square"], implements_list=[], callable_declarations={"area()": method("public", "final")}),
+    }
+    dispatch_table = DispatchTable(types, TypeHierarchy(types))
+
+    def targets(receiver_type, signature):
+        return [type_name for type_name, _ in dispatch_table.targets(receiver_type, signature)]
+
+    assert sorted(targets("Shape", "area()")) == ["Circle", "Square", "Unit"]
+    assert sorted(targets("Base", "area()")) == ["Circle", "Square", "Unit"]
+    assert targets("Square", "area()") == ["Square", "Unit"]
+    assert targets("Shape", "name()") == ["Shape", "Circle"]
+    # Inherited implementations are resolved to the nearest supertype that declares them
+    assert targets("Unit", "name()") == ["Shape"]
+    # Constructors and private methods are not dispatched dynamically
+    assert targets("Base", "Base()") == ["Base"]
+    assert targets("Square", "helper()") == ["Square"]
+    assert targets("Unit", "helper()") == []
+    assert targets("Shape", "missing()") == []
+    assert dispatch_table.targets("Shape", "area()") is dispatch_table.targets("Shape", "area()")
+
+
+def test_call_site_index():
+    """Should find the callers of a method from the calls that may dispatch to it"""
+
+    def method(*call_sites, modifiers=("public",)):
+        return JCallable.model_construct(
+            modifiers=list(modifiers),
+            is_constructor=False,
+            call_sites=[JCallSite.model_construct(receiver_type=receiver_type, callee_signature=callee_signature, is_constructor_call=False) for receiver_type, callee_signature in call_sites],
+        )
+
+    types = {
+        "Shape": JType.model_construct(is_interface=True, extends_list=[], implements_list=[], callable_declarations={"area()": method(modifiers=("abstract",))}),
+        "Square": JType.model_construct(extends_list=[], implements_list=["Shape"], callable_declarations={"area()": method(("", "side()")), "side()": method()}),
+        "Circle": JType.model_construct(extends_list=[], implements_list=["Shape"], callable_declarations={"area()": method()}),
+        "Report": JType.model_construct(
+            extends_list=[],
+            implements_list=[],
+            callable_declarations={"print()": method(("Shape", "area()"), ("Shape", "area()")), "printSquare()": method(("Square", "area()")), "skip()": method(("", ""))},
+        ),
+    }
+    type_hierarchy = TypeHierarchy(types)
+    call_site_index = CallSiteIndex(types, type_hierarchy, DispatchTable(types, type_hierarchy))
+
+    assert call_site_index.callers("Shape", "area()") == [("Report", "print()")]
+    # Calls without a receiver type are indexed under the calling type
+    assert call_site_index.callers("Square", "side()") == [("Square", "area()")]
+    assert sorted(call_site_index.dispatching_callers("Square", "area()")) == [("Report", "print()"), ("Report", "printSquare()")]
+    assert call_site_index.dispatching_callers("Circle", "area()") == [("Report", "print()")]
+    assert call_site_index.dispatching_callers("Report", "skip()") == []
+
+
+def test_compact_call_graph():
+    """Should store a call graph in CSR arrays and convert it to networkx"""
+
+    def method(klass, signature):
+        return JMethodDetail.model_construct(method_declaration=signature, klass=klass, method=JCallable.model_construct(signature=signature))
+
+    builder = CompactCallGraphBuilder()
+    main, area, side = (builder.add_method(method(klass, signature)) for klass, signature in [("App", "main()"), ("Square", "area()"), ("Square", "side()")])
+    builder.add_edge(main, side, "CALL_DEP", "1", [3])
+    builder.add_edge(main, area, "CALL_DEP", "1", [1])
+    builder.add_edge(area, side, "CALL_DEP", "2", [7, 8])
+    # An edge added again replaces the attributes, like in a networkx graph
+    builder.add_edge(main, area, "CALL_DEP", "1", [1, 2])
+    call_graph = builder.build()
+
+    assert call_graph.number_of_methods() == 3 and call_graph.number_of_edges() == 3
+    assert call_graph.method_id("area()", "Square") == area
+    assert call_graph.method_id("area()", "Circle") is None
+    assert call_graph.class_methods("Square") == [area, side]
+    assert call_graph.class_methods("Circle") == []
+    assert call_graph.successors(main).tolist() == [area, side]
+    assert call_graph.predecessors(side).tolist() == [main, area]
+    assert call_graph.predecessors(main).tolist() == []
+    assert [call_graph.calling_lines(edge) for edge in call_graph.out_edges(main)] == [[1, 2], [3]]
+    assert [call_graph.calling_lines(edge) for edge in call_graph.in_edges(side).tolist()] == [[3], [7, 8]]
+    assert [call_graph.edge_source(edge) for edge in call_graph.in_edges(side).tolist()] == [main, area]
+    assert call_graph.edge_weight(next(iter(call_graph.out_edges(area)))) == "2"
+
+    graph = call_graph.to_networkx()
+    assert list(graph.nodes) == [("main()", "App"), ("area()", "Square"), ("side()", "Square")]
+    assert graph.nodes[("area()", "Square")]["method_detail"].klass == "Square"
+    assert graph.edges[("area()", "Square"), ("side()", "Square")] == {"type": "CALL_DEP", "weight": "2", "calling_lines": [7, 8]}
+    assert graph.number_of_edges() == 3
+
+
+def test_reachability():
+    """Should compute cached forward and backward closures over the call graph"""
+
+    builder = CompactCallGraphBuilder()
+    # main -> a -> b -> c -> b (a cycle), and d -> c
+    main, a, b, c, d = (builder.add_method(JMethodDetail.model_construct(klass="App", method=JCallable.model_construct(signature=f"{name}()"))) for name in "main a b c d".split())
+    for source, target in [(main, a), (a, b), (b, c), (c, b), (d, c)]:
+        builder.add_edge(source, target, "CALL_DEP", "1", [])
+    reachability = Reachability(builder.build())
+
+    assert reachability.reachable_from([b]).nonzero()[0].tolist() == [b, c]
+    # The closure of b is reused when searching from main
+    assert reachability.reachable_from([main]).nonzero()[0].tolist() == [main, a, b, c]
+    assert reachability.reachable_from([a, d]).nonzero()[0].tolist() == [a, b, c, d]
+    assert reachability.reaching([c]).nonzero()[0].tolist() == [main, a, b, c, d]
+    assert reachability.reaching([main]).nonzero()[0].tolist() == [main]
+    assert reachability.reachable_from([]).nonzero()[0].tolist() == []
+
+
+def test_get_reachable_methods(test_fixture, analysis_json):
+    """Should return the methods reachable from, and reaching, a set of methods like a traversal of the networkx graph"""
+
+    # Patch subprocess so that it does not run codeanalyzer
+    with patch("cldk.analysis.java.codeanalyzer.codeanalyzer.subprocess.run") as run_mock:
+        run_mock.return_value = MagicMock(stdout=analysis_json, returncode=0)
+        code_analyzer = JCodeanalyzer(
+            project_dir=test_fixture,
+            source_code=None,
+            analysis_backend_path=None,
+            analysis_json_path=None,
+            analysis_level=AnalysisLevel.call_graph,
+            eager_analysis=False,
+            target_files=None,
+        )
+        graph = code_analyzer.get_call_graph()
+
+        # Constructors are returned under their symbol table signature
+        def symbol_table_keys(nodes):
+            return {(symbol_table_signature(typename, signature), typename) for signature, typename in nodes}
+
+        entry_point_methods = [(typename, signature) for typename, methods in code_analyzer.get_all_entry_point_methods().items() for signature in methods]
+        expected = set()
+        for qualified_class_name, method_signature in entry_point_methods:
+            if (method_signature, qualified_class_name) in graph:
+                expected |= {(method_signature, qualified_class_name)} | nx.descendants(graph, (method_signature, qualified_class_name))
+        reachable_methods = code_analyzer.get_reachable_methods(entry_point_methods)
+        assert {(signature, typename) for typename, methods in reachable_methods.items() for signature in methods} == symbol_table_keys(expected)
+
+        method_signature, qualified_class_name = next(node for node in graph.nodes if graph.in_degree(node) > 1)
+        reaching_methods = code_analyzer.get_reaching_methods([(qualified_class_name, method_signature)])
+        expected = {(method_signature, qualified_class_name)} | nx.ancestors(graph, (method_signature, qualified_class_name))
+        assert {(signature, typename) for typename, methods in reaching_methods.items() for signature in methods} == symbol_table_keys(expected)
+
+        # Dead code candidates are the methods that no entry point reaches
+        unreachable_methods = code_analyzer.get_unreachable_methods()
+        for typename, methods in unreachable_methods.items():
+            for signature in methods:
+                assert signature not in reachable_methods.get(typename, {})
+                assert not code_analyzer.get_reaching_entry_point_methods([(typename, signature)])
+
+
+def test_compact_call_graph_queries(test_fixture, analysis_json):
+    """Should answer callers, callees and class call graphs from the compact call graph like from the networkx graph"""
+
+    # Patch subprocess so that it does not run codeanalyzer
+    with patch("cldk.analysis.java.codeanalyzer.codeanalyzer.subprocess.run") as run_mock:
+        run_mock.return_value = MagicMock(stdout=analysis_json, returncode=0)
+        code_analyzer = JCodeanalyzer(
+            project_dir=test_fixture,
+            source_code=None,
+            analysis_backend_path=None,
+            analysis_json_path=None,
+            analysis_level=AnalysisLevel.call_graph,
+            eager_analysis=False,
+            target_files=None,
+        )
+        # The networkx graph is only built on request
+        assert code_analyzer.call_graph is None
+        graph = code_analyzer.get_call_graph()
+        for method_signature, class_name in graph.nodes:
+            callers = code_analyzer.get_all_callers(class_name, method_signature, using_symbol_table=False)
+            assert [caller["caller_method"] for caller in callers["caller_details"]] == [
+                graph.nodes[source]["method_detail"] for source in sorted(graph.predecessors((method_signature, class_name)), key=list(graph.nodes).index)
+            ]
+            assert [caller["calling_lines"] for caller in callers["caller_details"]] == [
+                graph.edges[source, (method_signature, class_name)]["calling_lines"] for source in sorted(graph.predecessors((method_signature, class_name)), key=list(graph.nodes).index)
+            ]
+            callees = code_analyzer.get_all_callees(class_name, method_signature, using_symbol_table=False)
+            assert {(callee["callee_method"].method.signature, callee["callee_method"].klass) for callee in callees["callee_details"]} == set(graph.successors((method_signature, class_name)))
+            assert len(code_analyzer.get_class_call_graph(class_name, method_signature)) == graph.out_degree((method_signature, class_name))
+        assert code_analyzer.get_all_callers("com.example.Missing", "missing()", using_symbol_table=False) == {}
+
+
 def test_get_all_fields(test_fixture, analysis_json):
     """Should return all of the fields for a class"""
 
@@ -712,6 +1848,33 @@ def test_get_class_call_graph_using_symbol_table(test_fixture, analysis_json):
         # TODO: test with method signature
 
 
+def test_get_class_call_graph_of_every_method(test_fixture, analysis_json):
+    """Should return the call graph of a class as the call graphs of the methods it declares"""
+
+    # Patch subprocess so that it does not run codeanalyzer
+    with patch("cldk.analysis.java.codeanalyzer.codeanalyzer.subprocess.run") as run_mock:
+        run_mock.return_value = MagicMock(stdout=analysis_json, returncode=0)
+        code_analyzer = JCodeanalyzer(
+            project_dir=test_fixture,
+            source_code=None,
+            analysis_backend_path=None,
+            analysis_json_path=None,
+            analysis_level=AnalysisLevel.call_graph,
+            eager_analysis=False,
+            target_files=None,
+        )
+        graph = code_analyzer.get_call_graph()
+        for qualified_class_name, class_details in code_analyzer.get_all_classes().items():
+            class_call_graph = code_analyzer.get_class_call_graph(qualified_class_name)
+            assert len(class_call_graph) == sum(graph.out_degree(node) for node in graph.nodes if node[1] == qualified_class_name)
+            assert all(source.klass == qualified_class_name for source, _ in class_call_graph)
+
+            method_call_graphs = [code_analyzer.get_class_call_graph_using_symbol_table(qualified_class_name, signature) for signature in class_details.callable_declarations]
+            assert code_analyzer.get_class_call_graph_using_symbol_table(qualified_class_name) == [edge for edges in method_call_graphs for edge in edges]
+        assert code_analyzer.get_class_call_graph("com.example.Missing") == []
+        assert code_analyzer.get_class_call_graph_using_symbol_table("com.example.Missing") == []
+
+
 def test_get_class_call_graph(test_fixture, analysis_json):
     """Should return the call graph"""
 